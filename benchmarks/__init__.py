@@ -0,0 +1,4 @@
+"""Benchmark suite for the engine, ingest and traversal hot paths."""
+from .suite import BenchmarkConfig, Comparison, compare_results, run_suite
+
+__all__ = ["BenchmarkConfig", "Comparison", "compare_results", "run_suite"]
@@ -0,0 +1,116 @@
+"""Command line entry point: ``python -m benchmarks run|compare|loadtest``."""
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import tempfile
+from dataclasses import replace
+from pathlib import Path
+from typing import List
+
+from controls.input_profiles import InputRecording
+
+from .loadtest import MOVEMENT_PATTERNS, LoadTestConfig, format_report, run_load_test, synthesize_recording
+from .suite import CASES, PRESETS, compare_results, format_comparisons, run_suite
+
+
+def _load(path: str) -> dict:
+    with Path(path).open("r", encoding="utf-8") as handle:
+        return json.load(handle)
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Run or compare benchmarks.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="Run the suite and write JSON results.")
+    run.add_argument("--size", default="medium", choices=sorted(PRESETS), help="Problem size preset.")
+    run.add_argument("--repeat", type=int, help="Timed repetitions per benchmark (overrides the preset).")
+    run.add_argument("--warmup", type=int, help="Untimed warmup runs per benchmark (overrides the preset).")
+    run.add_argument("--only", action="append", choices=sorted(CASES), help="Run only this benchmark; repeatable.")
+    run.add_argument("--output", help="Write results here instead of stdout.")
+    run.add_argument("--baseline", help="Compare against this results file and fail on regressions.")
+    run.add_argument("--threshold", type=float, default=0.10, help="Allowed slowdown fraction (default 0.10).")
+
+    compare = commands.add_parser("compare", help="Compare two results files.")
+    compare.add_argument("baseline")
+    compare.add_argument("current")
+    compare.add_argument("--threshold", type=float, default=0.10, help="Allowed slowdown fraction (default 0.10).")
+
+    loadtest = commands.add_parser("loadtest", help="Replay many players against one shared service.")
+    loadtest.add_argument("--players", type=int, default=8, help="Simulated players (default 8).")
+    loadtest.add_argument("--frames", type=int, default=600, help="Frames to simulate (default 600).")
+    loadtest.add_argument("--fps", type=float, default=60.0, help="Frame rate; 0 runs frames back to back.")
+    loadtest.add_argument(
+        "--pattern", default="mixed", choices=["mixed", *MOVEMENT_PATTERNS], help="Movement pattern for every player."
+    )
+    loadtest.add_argument("--move-every", type=int, default=6, help="Frames between moves (default 6).")
+    loadtest.add_argument("--seed", type=int, default=0, help="Seed for random walks.")
+    loadtest.add_argument("--cache-dir", help="Shared cache directory (default: a fresh temporary one).")
+    loadtest.add_argument("--max-workers", type=int, help="Generation worker threads.")
+    loadtest.add_argument("--max-resident", type=int, help="Bound the chunks held in memory.")
+    loadtest.add_argument("--budget-ms", type=float, help="Run streaming work through a scheduler with this budget.")
+    loadtest.add_argument("--record", help="Save the synthesized input to this file.")
+    loadtest.add_argument("--replay", help="Replay input from this file instead of synthesizing it.")
+    loadtest.add_argument("--output", help="Write the JSON report here.")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "loadtest":
+        return _loadtest(args)
+    if args.command == "compare":
+        baseline, current = _load(args.baseline), _load(args.current)
+    else:
+        config = PRESETS[args.size]
+        if args.repeat is not None:
+            config = replace(config, repeat=args.repeat)
+        if args.warmup is not None:
+            config = replace(config, warmup=args.warmup)
+        current = run_suite(config, only=args.only)
+        document = json.dumps(current, indent=2, sort_keys=True)
+        if args.output:
+            Path(args.output).write_text(document + "\n", encoding="utf-8")
+        else:
+            print(document)
+        if not args.baseline:
+            return 0
+        baseline = _load(args.baseline)
+
+    comparisons = compare_results(baseline, current, threshold=args.threshold)
+    print(format_comparisons(comparisons), file=sys.stderr if args.command == "run" and not args.output else sys.stdout)
+    return 1 if any(item.regressed for item in comparisons) else 0
+
+
+def _loadtest(args: argparse.Namespace) -> int:
+    config = LoadTestConfig(
+        players=args.players,
+        frames=args.frames,
+        fps=args.fps,
+        pattern=args.pattern,
+        move_every=args.move_every,
+        seed=args.seed,
+        max_workers=args.max_workers,
+        max_resident=args.max_resident,
+        scheduler_budget=args.budget_ms / 1e3 if args.budget_ms else None,
+    )
+    if args.replay:
+        recording = InputRecording.load(args.replay)
+        config = replace(config, players=len(recording.tracks), frames=recording.frame_count)
+    else:
+        recording = synthesize_recording(config)
+    if args.record:
+        recording.save(args.record)
+    if args.cache_dir:
+        report = run_load_test(config, args.cache_dir, recording)
+    else:
+        with tempfile.TemporaryDirectory(prefix="owg-loadtest-") as scratch:
+            report = run_load_test(config, scratch, recording)
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+    print(format_report(report))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,361 @@
+"""Multi-player traversal load test against one shared streaming service."""
+from __future__ import annotations
+
+import math
+import os
+import threading
+import time
+from concurrent.futures import CancelledError, Future, wait
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from controls.input_profiles import (
+    InputEvent,
+    InputProfile,
+    InputRecording,
+    InputTrack,
+    StreamingTraversalController,
+    WorkingSetPolicy,
+)
+from controls.input_profiles.profiles import MOVE_STEPS
+from controls.input_profiles.recording import PROFILES
+from engine.streaming import ChunkCache, ChunkKey, ChunkResidencyManager, ChunkStreamingService, StreamingScheduler
+from engine.streaming.rng import CounterRNG
+from engine.telemetry import MetricsRegistry
+
+LOADTEST_VERSION = 1
+
+# Headings in the order a spiral turns through them.
+_HEADINGS = ("move_east", "move_north", "move_west", "move_south")
+
+MOVEMENT_PATTERNS = ("line", "spiral", "random_walk", "patrol")
+
+
+@dataclass(frozen=True)
+class LoadTestConfig:
+    """How many simulated players to run and how they move.
+
+    Each player makes one move every ``move_every`` frames following
+    ``pattern`` (``"mixed"`` cycles through ``MOVEMENT_PATTERNS``), starting
+    ``spread`` tiles from its neighbours so working sets partly overlap.
+    Frames are paced at ``fps``; ``0`` runs them back to back. With a
+    ``scheduler_budget`` (seconds) streaming work, including cache writes,
+    goes through a ``StreamingScheduler`` ticked once per frame.
+    """
+
+    players: int = 8
+    frames: int = 600
+    fps: float = 60.0
+    pattern: str = "mixed"
+    move_every: int = 6
+    spread: int = 4
+    radius: int = 1
+    lookahead: int = 2
+    hysteresis: int = 1
+    seed: int = 0
+    sample_every: int = 60
+    max_workers: Optional[int] = None
+    max_resident: Optional[int] = None
+    scheduler_budget: Optional[float] = None
+
+    def __post_init__(self) -> None:
+        if self.players < 1:
+            raise ValueError("players must be at least 1")
+        if self.frames < 0:
+            raise ValueError("frames must be non-negative")
+        if self.fps < 0:
+            raise ValueError("fps must be non-negative")
+        if self.move_every < 1 or self.sample_every < 1:
+            raise ValueError("move_every and sample_every must be at least 1")
+        if self.pattern != "mixed" and self.pattern not in MOVEMENT_PATTERNS:
+            raise ValueError(f"Unknown movement pattern {self.pattern!r}")
+
+
+def synthesize_recording(config: LoadTestConfig) -> InputRecording:
+    """Input for ``config.players`` players, alternating keyboard and Xbox profiles."""
+
+    side = math.isqrt(config.players - 1) + 1
+    profiles = sorted(PROFILES)
+    tracks: List[InputTrack] = []
+    for player in range(config.players):
+        pattern = config.pattern
+        if pattern == "mixed":
+            pattern = MOVEMENT_PATTERNS[player % len(MOVEMENT_PATTERNS)]
+        origin = ChunkKey(
+            latitude=(player // side) * config.spread,
+            longitude=(player % side) * config.spread,
+            level_of_detail=0,
+        )
+        track = InputTrack(profile=profiles[player % len(profiles)], origin=origin)
+        controls = _controls_for(track.make_profile())
+        moves = _moves(pattern, player, CounterRNG(config.seed * 1_000_003 + player))
+        for frame in range(config.frames):
+            if frame % config.move_every == config.move_every - 1:
+                track.record([controls[next(moves)]])
+            else:
+                track.record([])
+        tracks.append(track)
+    return InputRecording(tracks)
+
+
+def run_load_test(
+    config: LoadTestConfig,
+    cache_dir: Path | str,
+    recording: Optional[InputRecording] = None,
+) -> Dict[str, object]:
+    """Replay ``recording`` (synthesized from ``config`` if omitted) and report.
+
+    Every player drives its own ``StreamingTraversalController`` against one
+    ``ChunkStreamingService`` backed by a write-behind cache in ``cache_dir``.
+    Availability latency runs from the frame a player crosses onto a tile to
+    the moment that tile's chunk is ready; tiles already resident count as
+    zero. Crossings abandoned before their chunk loaded (the player moved
+    on and the request was cancelled) are counted as ``cancelled``.
+    ``timeline`` samples loads, resident chunks, process RSS and cache
+    size every ``sample_every`` frames.
+    """
+
+    if recording is None:
+        recording = synthesize_recording(config)
+    cache_dir = Path(cache_dir)
+    cache = ChunkCache(cache_dir, write_behind=True)
+    metrics = MetricsRegistry()
+    residency = ChunkResidencyManager(max_chunks=config.max_resident) if config.max_resident else None
+    scheduler = None
+    if config.scheduler_budget is not None:
+        scheduler = StreamingScheduler(budget=config.scheduler_budget, metrics=metrics)
+    service = ChunkStreamingService(
+        cache=cache,
+        read_through=True,
+        residency=residency,
+        max_workers=config.max_workers,
+        metrics=metrics,
+        scheduler=scheduler,
+    )
+    players: List[Tuple[StreamingTraversalController, InputProfile]] = [
+        (
+            StreamingTraversalController(
+                service,
+                track.origin,
+                working_set=WorkingSetPolicy(
+                    radius=config.radius, lookahead=config.lookahead, hysteresis=config.hysteresis
+                ),
+                scheduler=scheduler,
+            ),
+            track.make_profile(),
+        )
+        for track in recording.tracks
+    ]
+
+    availability = _AvailabilityTimer()
+    timeline: List[Dict[str, object]] = []
+    start_bytes = _directory_bytes(cache_dir)
+    start = time.perf_counter()
+
+    def sample(frame: int) -> None:
+        timeline.append(
+            {
+                "frame": frame,
+                "seconds": time.perf_counter() - start,
+                "chunks_loaded": metrics.counter_value("chunk_requests_total", outcome="load"),
+                "resident_chunks": sum(1 for key in service.get_loaded_chunks() if service.is_loaded(key)),
+                "rss_bytes": _rss_bytes(),
+                "cache_bytes": _directory_bytes(cache_dir),
+            }
+        )
+
+    try:
+        sample(0)
+        for frame in range(recording.frame_count):
+            for (controller, profile), events in zip(players, recording.frame(frame)):
+                if events:
+                    before = controller.pending
+                    controller.apply_events(profile, events)
+                    if controller.pending is not None and controller.pending is not before:
+                        availability.track(controller.pending)
+                controller.end_frame()
+            if scheduler is not None:
+                scheduler.tick()
+            if (frame + 1) % config.sample_every == 0:
+                sample(frame + 1)
+            if config.fps:
+                delay = start + (frame + 1) / config.fps - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+        if scheduler is not None:
+            scheduler.drain()
+        wait([controller.pending for controller, _profile in players if controller.pending is not None])
+        elapsed = time.perf_counter() - start
+        cache.flush()
+        sample(recording.frame_count)
+    finally:
+        service.shutdown()
+        cache.close()
+
+    loaded = metrics.counter_value("chunk_requests_total", outcome="load")
+    rss = [point["rss_bytes"] for point in timeline if point["rss_bytes"] is not None]
+    end_bytes = _directory_bytes(cache_dir)
+    report: Dict[str, object] = {
+        "version": LOADTEST_VERSION,
+        "config": asdict(config),
+        "players": len(players),
+        "frames": recording.frame_count,
+        "seconds": elapsed,
+        "latency_ms": availability.summary(),
+        "chunks_loaded": loaded,
+        "chunks_per_second": loaded / elapsed if elapsed else math.inf,
+        "warm_ratio": _warm_ratio(controller for controller, _profile in players),
+        "final_positions": [
+            [key.latitude, key.longitude, key.level_of_detail]
+            for key in (controller.current_key for controller, _profile in players)
+        ],
+        "rss_bytes": {"start": rss[0], "peak": max(rss), "end": rss[-1]} if rss else None,
+        "cache_bytes": {"start": start_bytes, "end": end_bytes, "growth": end_bytes - start_bytes},
+        "timeline": timeline,
+    }
+    if scheduler is not None:
+        report["scheduler"] = asdict(scheduler.stats)
+    return report
+
+
+def format_report(report: Dict[str, object]) -> str:
+    latency: Dict[str, float] = report["latency_ms"]  # type: ignore[assignment]
+    cache_bytes: Dict[str, int] = report["cache_bytes"]  # type: ignore[assignment]
+    rss: Optional[Dict[str, int]] = report["rss_bytes"]  # type: ignore[assignment]
+    lines = [
+        f"{report['players']} players, {report['frames']} frames in {report['seconds']:.2f}s",
+        f"availability p50 {latency['p50']:.2f} ms  p95 {latency['p95']:.2f} ms  "
+        f"p99 {latency['p99']:.2f} ms  ({latency['count']} crossings, {latency['cancelled']} cancelled)",
+        f"chunks loaded {report['chunks_loaded']:.0f} ({report['chunks_per_second']:.1f}/s)",
+        f"cache growth {cache_bytes['growth'] / 1e6:.2f} MB",
+    ]
+    if rss is not None:
+        lines.append(f"rss peak {rss['peak'] / 1e6:.1f} MB (start {rss['start'] / 1e6:.1f} MB)")
+    return "\n".join(lines)
+
+
+def _controls_for(profile: InputProfile) -> Dict[str, InputEvent]:
+    """The event that triggers each movement action under ``profile``."""
+
+    controls: Dict[str, InputEvent] = {}
+    for (device, control), action in profile.bindings.items():
+        if action in MOVE_STEPS:
+            controls.setdefault(action, InputEvent(device, control))
+    return controls
+
+
+def _moves(pattern: str, player: int, rng: CounterRNG) -> Iterator[str]:
+    """Endless movement actions for one player."""
+
+    heading = player % len(_HEADINGS)
+    if pattern == "line":
+        while True:
+            yield _HEADINGS[heading]
+    elif pattern == "spiral":
+        leg = 1
+        while True:
+            for turn in range(4):
+                for _ in range(leg + turn // 2):
+                    yield _HEADINGS[(heading + turn) % 4]
+            leg += 2
+    elif pattern == "random_walk":
+        while True:
+            # Mostly keep going, sometimes turn: closer to how people move.
+            if rng.random() < 0.25:
+                heading = int(rng.random() * 4)
+            yield _HEADINGS[heading]
+    else:  # patrol
+        reverse = (heading + 2) % 4
+        while True:
+            for action in [_HEADINGS[heading]] * 6 + [_HEADINGS[reverse]] * 6:
+                yield action
+
+
+class _AvailabilityTimer:
+    """Times crossings until the tile's chunk resolves; completes on worker threads."""
+
+    def __init__(self) -> None:
+        self.latencies: List[float] = []
+        self.cancelled = 0
+        self.failed = 0
+        self._lock = threading.Lock()
+
+    def track(self, future: "Future[Any]") -> None:
+        requested = time.perf_counter()
+
+        def done(completed: "Future[Any]") -> None:
+            with self._lock:
+                # Running loads that get cancelled finish with ``CancelledError``.
+                if completed.cancelled() or isinstance(completed.exception(), CancelledError):
+                    self.cancelled += 1
+                elif completed.exception() is None:
+                    self.latencies.append(time.perf_counter() - requested)
+                else:
+                    self.failed += 1
+
+        future.add_done_callback(done)
+
+    def summary(self) -> Dict[str, float]:
+        with self._lock:
+            ordered = sorted(self.latencies)
+            counts = {"count": len(ordered), "cancelled": self.cancelled, "failed": self.failed}
+        summary: Dict[str, float] = dict(counts)
+        for name, fraction in (("p50", 0.50), ("p95", 0.95), ("p99", 0.99)):
+            summary[name] = _percentile(ordered, fraction) * 1e3
+        summary["max"] = ordered[-1] * 1e3 if ordered else 0.0
+        return summary
+
+
+def _percentile(ordered: Sequence[float], fraction: float) -> float:
+    """Nearest-rank percentile of sorted samples."""
+
+    if not ordered:
+        return 0.0
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+
+def _warm_ratio(controllers: Iterable[StreamingTraversalController]) -> float:
+    crossings = warm = 0
+    for controller in controllers:
+        crossings += controller.metrics.crossings
+        warm += controller.metrics.warm_crossings
+    return warm / crossings if crossings else 0.0
+
+
+def _rss_bytes() -> Optional[int]:
+    """Current resident set size, where the platform exposes it."""
+
+    try:
+        with open("/proc/self/statm", "r", encoding="ascii") as handle:
+            return int(handle.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes; without /proc this is the peak, not current.
+    return peak if os.uname().sysname == "Darwin" else peak * 1024
+
+
+def _directory_bytes(path: Path) -> int:
+    total = 0
+    for root, _dirs, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                continue  # Removed by compaction or an atomic rename mid-walk.
+    return total
+
+
+__all__ = [
+    "LOADTEST_VERSION",
+    "LoadTestConfig",
+    "MOVEMENT_PATTERNS",
+    "format_report",
+    "run_load_test",
+    "synthesize_recording",
+]
@@ -0,0 +1,393 @@
+"""Benchmarks for the streaming, cache, extrusion and ingest hot paths."""
+from __future__ import annotations
+
+import math
+import platform
+import shutil
+import statistics
+import tempfile
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+from controls.input_profiles import InputEvent, MouseKeyboardProfile, StreamingTraversalController, WorkingSetPolicy
+from data_ingest.open_maps import DataIngestPipeline, RegionRequest
+from engine.streaming import Chunk, ChunkCache, ChunkKey, ChunkState, ChunkStreamingService, FeatureColumns
+from engine.streaming.rng import CounterRNG
+from procedural.buildings import BuildingExtruder, LODPolicy
+
+RESULTS_VERSION = 1
+
+
+@dataclass(frozen=True)
+class BenchmarkConfig:
+    """Problem sizes and repetition counts for one suite run."""
+
+    chunks: int = 256
+    footprints: int = 500
+    ingest_chunks: int = 16
+    traversal_steps: int = 200
+    repeat: int = 5
+    warmup: int = 1
+
+    def __post_init__(self) -> None:
+        if self.repeat < 1:
+            raise ValueError("repeat must be at least 1")
+        if self.warmup < 0:
+            raise ValueError("warmup must be non-negative")
+
+
+PRESETS: Dict[str, BenchmarkConfig] = {
+    "small": BenchmarkConfig(chunks=64, footprints=100, ingest_chunks=4, traversal_steps=50, repeat=3),
+    "medium": BenchmarkConfig(),
+    "large": BenchmarkConfig(chunks=1024, footprints=2000, ingest_chunks=64, traversal_steps=1000, repeat=7),
+}
+
+
+@dataclass
+class Comparison:
+    """Median timing of one benchmark against a baseline."""
+
+    name: str
+    baseline: float
+    current: float
+    regressed: bool
+
+    @property
+    def ratio(self) -> float:
+        return self.current / self.baseline if self.baseline else math.inf
+
+
+class _Workspace:
+    """Hands out a fresh scratch directory per repetition."""
+
+    def __init__(self, root: Path) -> None:
+        self.root = root
+        self._count = 0
+
+    def fresh(self) -> Path:
+        self._count += 1
+        path = self.root / f"run_{self._count}"
+        path.mkdir(parents=True)
+        return path
+
+
+BenchmarkCase = Callable[[BenchmarkConfig, _Workspace], Dict[str, object]]
+
+
+def _grid(count: int) -> List[ChunkKey]:
+    side = max(1, math.isqrt(max(count - 1, 0)) + 1)
+    return [
+        ChunkKey(latitude=index // side, longitude=index % side, level_of_detail=0) for index in range(count)
+    ]
+
+
+def _measure(
+    config: BenchmarkConfig,
+    operations: int,
+    body: Callable[[], object],
+    setup: Optional[Callable[[], None]] = None,
+) -> Dict[str, object]:
+    """Time ``body`` over warmup plus ``repeat`` runs; ``setup`` is untimed.
+
+    A dict returned by the last run is merged into the result.
+    """
+
+    samples: List[float] = []
+    extra: Dict[str, object] = {}
+    for iteration in range(config.warmup + config.repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        outcome = body()
+        elapsed = time.perf_counter() - start
+        extra = outcome if isinstance(outcome, dict) else {}
+        if iteration >= config.warmup:
+            samples.append(elapsed)
+    median = statistics.median(samples)
+    result: Dict[str, object] = {
+        "operations": operations,
+        "seconds": {
+            "min": min(samples),
+            "median": median,
+            "mean": statistics.fmean(samples),
+            "max": max(samples),
+        },
+        "per_op_us": median / operations * 1e6 if operations else 0.0,
+        "ops_per_second": operations / median if median else math.inf,
+    }
+    result.update(extra)
+    return result
+
+
+def bench_request_chunk(config: BenchmarkConfig, workspace: _Workspace) -> Dict[str, object]:
+    keys = _grid(config.chunks)
+
+    def body() -> None:
+        service = ChunkStreamingService()
+        for key in keys:
+            service.request_chunk(key)
+
+    return _measure(config, len(keys), body)
+
+
+def bench_request_many(config: BenchmarkConfig, workspace: _Workspace) -> Dict[str, object]:
+    keys = _grid(config.chunks)
+
+    def body() -> None:
+        service = ChunkStreamingService()
+        try:
+            service.request_many(keys)
+        finally:
+            service.shutdown()
+
+    return _measure(config, len(keys), body)
+
+
+def bench_cache(config: BenchmarkConfig, workspace: _Workspace) -> Dict[str, Dict[str, object]]:
+    chunks = ChunkStreamingService().generate_chunks(_grid(config.chunks))
+    state: Dict[str, ChunkCache] = {}
+
+    def setup_store() -> None:
+        state["cache"] = ChunkCache(workspace.fresh())
+
+    def store() -> Dict[str, object]:
+        cache = state["cache"]
+        for chunk in chunks:
+            cache.store(chunk)
+        return {"bytes_on_disk": sum(path.stat().st_size for path in cache.root.rglob("*.chunk"))}
+
+    def load() -> None:
+        cache = state["cache"]
+        for chunk in chunks:
+            cache.load(chunk.key)
+
+    stored = _measure(config, len(chunks), store, setup=setup_store)
+    loaded = _measure(config, len(chunks), load)
+    return {"cache_store": stored, "cache_load": loaded}
+
+
+@dataclass(frozen=True)
+class _LegacyKey:
+    """``ChunkKey`` as it was laid out before slots: one ``__dict__`` per key."""
+
+    latitude: int
+    longitude: int
+    level_of_detail: int
+
+
+@dataclass
+class _LegacyChunk:
+    key: _LegacyKey
+    state: ChunkState = ChunkState.REQUESTED
+    metadata: Dict[str, Any] = field(default_factory=dict)
+    payload: Dict[str, Any] = field(default_factory=dict)
+
+
+def _allocated(build: Callable[[], object]) -> int:
+    """Bytes still allocated by ``build``'s result, per tracemalloc."""
+
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        result = build()
+        allocated = tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+    del result
+    return allocated
+
+
+def bench_memory(config: BenchmarkConfig, workspace: _Workspace) -> Dict[str, object]:
+    """Heap bytes per key and per chunk for the legacy and compact layouts.
+
+    Timing covers building the compact layout; the memory figures are the
+    published comparison.
+    """
+
+    keys = _grid(config.chunks)
+    rows = [
+        (key.latitude, key.longitude, key.level_of_detail, chunk.metadata, chunk.payload)
+        for key, chunk in zip(keys, ChunkStreamingService().generate_chunks(keys))
+    ]
+    biomes = ChunkStreamingService.BIOME_OPTIONS
+
+    def payload(source: Dict[str, Any], features: object) -> Dict[str, Any]:
+        return {"features": features, "seed": source["seed"], "generator_version": source["generator_version"]}
+
+    def legacy_chunks() -> List[_LegacyChunk]:
+        return [
+            _LegacyChunk(
+                key=_LegacyKey(lat, lon, lod),
+                state=ChunkState.LOADED,
+                metadata=dict(metadata),
+                payload=payload(source, [dict(feature) for feature in source["features"]]),
+            )
+            for lat, lon, lod, metadata, source in rows
+        ]
+
+    def compact_chunks() -> List[Chunk]:
+        return [
+            Chunk(
+                key=ChunkKey(lat, lon, lod),
+                state=ChunkState.LOADED,
+                metadata=dict(metadata),
+                payload=payload(source, FeatureColumns.from_records(source["features"], biomes)),
+            )
+            for lat, lon, lod, metadata, source in rows
+        ]
+
+    count = len(rows)
+    per_key = {
+        "legacy": _allocated(lambda: [_LegacyKey(lat, lon, lod) for lat, lon, lod, _m, _p in rows]) / count,
+        "slotted": _allocated(lambda: [ChunkKey(lat, lon, lod) for lat, lon, lod, _m, _p in rows]) / count,
+        "packed": _allocated(lambda: [ChunkKey(lat, lon, lod).pack() for lat, lon, lod, _m, _p in rows]) / count,
+    }
+    per_chunk = {"legacy": _allocated(legacy_chunks) / count, "compact": _allocated(compact_chunks) / count}
+    result = _measure(config, count, compact_chunks)
+    result["bytes_per_key"] = per_key
+    result["bytes_per_chunk"] = per_chunk
+    result["chunk_reduction"] = 1.0 - per_chunk["compact"] / per_chunk["legacy"]
+    return result
+
+
+def bench_extrude(config: BenchmarkConfig, workspace: _Workspace) -> Dict[str, object]:
+    generator = CounterRNG(0xBE7C4)
+    footprints = []
+    for _ in range(config.footprints):
+        x, y = generator.uniform(0.0, 100.0), generator.uniform(0.0, 100.0)
+        width, depth = generator.uniform(4.0, 30.0), generator.uniform(4.0, 30.0)
+        footprints.append([(x, y), (x + width, y), (x + width, y + depth), (x, y + depth)])
+    extruder = BuildingExtruder()
+
+    def body() -> None:
+        for footprint in footprints:
+            extruder.extrude(footprint, "mixed_use", LODPolicy.HIGH)
+
+    return _measure(config, len(footprints), body)
+
+
+def bench_pipeline(config: BenchmarkConfig, workspace: _Workspace) -> Dict[str, object]:
+    request = RegionRequest(name="bench_region", chunk_keys=_grid(config.ingest_chunks))
+    state: Dict[str, DataIngestPipeline] = {}
+
+    def setup() -> None:
+        root = workspace.fresh()
+        state["pipeline"] = DataIngestPipeline(cache_dir=root / "chunks", package_dir=root / "packages")
+
+    def body() -> None:
+        state["pipeline"].run(request, resume=False)
+
+    return _measure(config, len(request.chunk_keys), body, setup=setup)
+
+
+def bench_traversal(config: BenchmarkConfig, workspace: _Workspace) -> Dict[str, object]:
+    keyboard = MouseKeyboardProfile()
+    # A square spiral: long straight runs with regular turns.
+    events: List[InputEvent] = []
+    controls = ("d", "w", "a", "s")
+    leg = 1
+    while len(events) < config.traversal_steps:
+        for turn in range(4):
+            events.extend([InputEvent("keyboard", controls[turn])] * (leg + turn // 2))
+        leg += 2
+    events = events[: config.traversal_steps]
+
+    def body() -> Dict[str, object]:
+        service = ChunkStreamingService()
+        controller = StreamingTraversalController(
+            service,
+            ChunkKey(latitude=0, longitude=0, level_of_detail=0),
+            working_set=WorkingSetPolicy(radius=1, lookahead=2, hysteresis=1),
+        )
+        try:
+            for event in events:
+                controller.apply_event(keyboard, event)
+            if controller.pending is not None:
+                controller.pending.result()
+        finally:
+            service.shutdown()
+        return {"warm_ratio": controller.metrics.warm_ratio}
+
+    return _measure(config, len(events), body)
+
+
+CASES: Dict[str, BenchmarkCase] = {
+    "request_chunk": bench_request_chunk,
+    "request_many": bench_request_many,
+    "cache": bench_cache,
+    "extrude": bench_extrude,
+    "pipeline": bench_pipeline,
+    "traversal": bench_traversal,
+    "memory": bench_memory,
+}
+
+
+def run_suite(config: BenchmarkConfig, only: Optional[Iterable[str]] = None) -> Dict[str, object]:
+    """Run the selected cases (all by default) and return a results document."""
+
+    selected = list(only) if only else list(CASES)
+    unknown = [name for name in selected if name not in CASES]
+    if unknown:
+        raise ValueError(f"Unknown benchmarks: {', '.join(unknown)}")
+
+    results: Dict[str, object] = {}
+    scratch = Path(tempfile.mkdtemp(prefix="owg-bench-"))
+    try:
+        for name in selected:
+            outcome = CASES[name](config, _Workspace(scratch / name))
+            if name == "cache":
+                results.update(outcome)
+            else:
+                results[name] = outcome
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+    return {
+        "version": RESULTS_VERSION,
+        "config": asdict(config),
+        "environment": {"python": platform.python_version(), "platform": platform.platform()},
+        "benchmarks": results,
+    }
+
+
+def compare_results(baseline: Dict[str, object], current: Dict[str, object], threshold: float = 0.10) -> List[Comparison]:
+    """Compare median timings of benchmarks present in both documents.
+
+    A benchmark regresses when its median is more than ``threshold`` (a
+    fraction) slower than the baseline. Cases with no operations are skipped.
+    """
+
+    if baseline.get("version") != RESULTS_VERSION or current.get("version") != RESULTS_VERSION:
+        raise ValueError("Benchmark results use an unsupported format version")
+    comparisons: List[Comparison] = []
+    old: Dict[str, dict] = baseline["benchmarks"]  # type: ignore[assignment]
+    new: Dict[str, dict] = current["benchmarks"]  # type: ignore[assignment]
+    for name in sorted(set(old) & set(new)):
+        if not old[name]["operations"] or not new[name]["operations"]:
+            continue  # Nothing was timed per operation.
+        before = old[name]["seconds"]["median"] / old[name]["operations"]
+        after = new[name]["seconds"]["median"] / new[name]["operations"]
+        comparisons.append(Comparison(name, before, after, regressed=after > before * (1.0 + threshold)))
+    return comparisons
+
+
+def format_comparisons(comparisons: Sequence[Comparison]) -> str:
+    lines = [f"{'benchmark':<16}{'baseline us/op':>16}{'current us/op':>16}{'change':>10}"]
+    for item in comparisons:
+        change = f"{(item.ratio - 1.0) * 100:+.1f}%"
+        marker = "  REGRESSION" if item.regressed else ""
+        lines.append(f"{item.name:<16}{item.baseline * 1e6:>16.2f}{item.current * 1e6:>16.2f}{change:>10}{marker}")
+    return "\n".join(lines)
+
+
+__all__ = [
+    "BenchmarkConfig",
+    "CASES",
+    "Comparison",
+    "PRESETS",
+    "compare_results",
+    "format_comparisons",
+    "run_suite",
+]
@@ -6,11 +6,17 @@ from .profiles import (
     StreamingTraversalController,
     XboxControllerProfile,
 )
+from .recording import InputRecording, InputTrack
+from .working_set import TraversalMetrics, WorkingSetPolicy
 
 __all__ = [
     "InputEvent",
     "InputProfile",
+    "InputRecording",
+    "InputTrack",
     "MouseKeyboardProfile",
     "StreamingTraversalController",
+    "TraversalMetrics",
+    "WorkingSetPolicy",
     "XboxControllerProfile",
 ]
@@ -1,10 +1,27 @@
 """Input profile mapping for streaming traversal."""
 from __future__ import annotations
 
+from collections import deque
+from concurrent.futures import Future
 from dataclasses import dataclass
-from typing import Dict, Tuple
+from functools import partial
+from typing import Deque, Dict, Iterable, List, Optional, Set, Tuple
 
-from engine.streaming import ChunkKey, ChunkStreamingService
+from engine.streaming import Chunk, ChunkKey, ChunkLifecycleError, ChunkStreamingService, StreamingScheduler
+from engine.streaming.scheduler import WORK_LOAD, WORK_UNLOAD
+from engine.telemetry import COUNT_BUCKETS, MetricsRegistry
+
+from .working_set import Step, TraversalMetrics, WorkingSetPolicy
+
+Binding = Tuple[str, str]
+
+# Tile displacement of each movement action as ``(dlat, dlon)``.
+MOVE_STEPS: Dict[str, Step] = {
+    "move_north": (1, 0),
+    "move_south": (-1, 0),
+    "move_east": (0, 1),
+    "move_west": (0, -1),
+}
 
 
 @dataclass(frozen=True)
@@ -50,36 +67,221 @@ class MouseKeyboardProfile(InputProfile):
 
 
 class StreamingTraversalController:
-    """Maps input actions into streaming traversal updates."""
+    """Maps input actions into streaming traversal updates.
+
+    Chunk loads are scheduled asynchronously so input handling never waits on
+    generation or disk writes; the most recent request is kept in ``pending``.
+
+    With a ``working_set`` policy the controller also prefetches a ring and a
+    velocity-scaled lookahead around the player and unloads chunks that fall
+    behind the hysteresis band.
+
+    ``apply_events`` handles a whole frame of input at once: only the tile the
+    player ends up on (and its working set) is requested, so bursts of stick
+    input do not load every tile passed through.
+
+    An optional ``telemetry`` registry counts input events and the chunk
+    requests they trigger; call ``end_frame`` once per frame to record the
+    per-frame event and request histograms.
 
-    def __init__(self, streaming_service: ChunkStreamingService, origin: ChunkKey) -> None:
+    With a ``scheduler`` loads and unloads are queued on it instead of being
+    issued immediately, prioritized by distance from the player, and run
+    synchronously within its per-tick budget; the game loop calls
+    ``scheduler.tick()`` once per frame. Queued loads that fall out of the
+    working set are cancelled, and loads the scheduler drops as stale are
+    requested again if the player returns.
+
+    Controllers sharing a service claim every key in their working set and
+    only cancel or unload one when no other controller still claims it.
+    """
+
+    def __init__(
+        self,
+        streaming_service: ChunkStreamingService,
+        origin: ChunkKey,
+        working_set: Optional[WorkingSetPolicy] = None,
+        telemetry: Optional[MetricsRegistry] = None,
+        scheduler: Optional[StreamingScheduler] = None,
+    ) -> None:
         self.streaming_service = streaming_service
+        self.scheduler = scheduler
         self.current_key = origin
+        self.pending: Optional["Future[Chunk]"] = None
+        self.working_set = working_set
+        self.metrics = TraversalMetrics()
+        self._history: Deque[Step] = deque(maxlen=working_set.velocity_window if working_set else 1)
+        self._requested: Set[ChunkKey] = set()
+        self.telemetry = telemetry
+        self._frame_events = 0
+        self._frame_requests = 0
+        self._step_lookups: Dict[int, Tuple[Dict[Binding, str], Dict[Binding, Step]]] = {}
+        if scheduler is not None:
+            scheduler.set_focus(origin, owner=self)
+        if working_set is not None:
+            self._refresh_working_set(include_center=False)
 
     def apply_event(self, profile: InputProfile, event: InputEvent) -> ChunkKey:
+        if self.telemetry is not None:
+            self._frame_events += 1
+            self.telemetry.increment("traversal_events_total", profile=profile.name)
         action = profile.translate(event)
         if action is None:
             return self.current_key
         if action.startswith("move_"):
-            self.current_key = self._shift(action)
-            self.streaming_service.request_chunk(self.current_key)
+            step = MOVE_STEPS.get(action, (0, 0))
+            self._history.append(step)
+            self._arrive(self._offset(step))
+        return self.current_key
+
+    def apply_events(self, profile: InputProfile, events: Iterable[InputEvent]) -> ChunkKey:
+        """Apply one frame of input and request chunks for the final position only.
+
+        Movement is accumulated into a net displacement; the chunk under the
+        player and its working set go out as a single prioritized batch, so
+        intermediate tiles are skipped unless the working set still covers
+        them. Every individual move still feeds the velocity history.
+        """
+
+        lookup = self._step_lookup(profile)
+        steps: List[Step] = []
+        count = 0
+        for event in events:
+            count += 1
+            step = lookup.get((event.device, event.control))
+            if step is not None:
+                steps.append(step)
+        if self.telemetry is not None:
+            self._frame_events += count
+            self.telemetry.increment("traversal_events_total", count, profile=profile.name)
+        if not steps:
+            return self.current_key
+        self._history.extend(steps)
+        net = (sum(step[0] for step in steps), sum(step[1] for step in steps))
+        if net != (0, 0):
+            self._arrive(self._offset(net))
         return self.current_key
 
-    def _shift(self, action: str) -> ChunkKey:
-        lat, lon, lod = (
-            self.current_key.latitude,
-            self.current_key.longitude,
-            self.current_key.level_of_detail,
+    def end_frame(self) -> None:
+        """Close the current frame, recording its event and request counts."""
+
+        if self.telemetry is not None:
+            self.telemetry.observe("traversal_events_per_frame", self._frame_events, buckets=COUNT_BUCKETS)
+            self.telemetry.observe("traversal_requests_per_frame", self._frame_requests, buckets=COUNT_BUCKETS)
+        self._frame_events = 0
+        self._frame_requests = 0
+
+    def _count_request(self, kind: str) -> None:
+        if self.telemetry is not None:
+            self._frame_requests += 1
+            self.telemetry.increment("traversal_chunk_requests_total", kind=kind)
+
+    def _arrive(self, key: ChunkKey) -> None:
+        """Move the player onto ``key`` and request what it needs."""
+
+        self.current_key = key
+        self.metrics.crossings += 1
+        if self.streaming_service.is_loaded(key):
+            self.metrics.warm_crossings += 1
+        if self.scheduler is not None:
+            self.scheduler.set_focus(key, owner=self)
+        if self.working_set is None:
+            if self.scheduler is None:
+                self.pending = self.streaming_service.request_chunk_async(key)
+            else:
+                self.pending = self._schedule_loads([key])[0]
+            self._count_request("crossing")
+        else:
+            self._refresh_working_set(include_center=True)
+
+    def _step_lookup(self, profile: InputProfile) -> Dict[Binding, Step]:
+        """Movement steps keyed by ``(device, control)``, built once per profile."""
+
+        cached = self._step_lookups.get(id(profile))
+        if cached is None or cached[0] is not profile.bindings:
+            table = {
+                binding: MOVE_STEPS[action] for binding, action in profile.bindings.items() if action in MOVE_STEPS
+            }
+            # Holding the bindings dict keeps ``id(profile)`` from being reused unnoticed.
+            cached = self._step_lookups[id(profile)] = (profile.bindings, table)
+        return cached[1]
+
+    def _refresh_working_set(self, include_center: bool) -> None:
+        """Prefetch ahead of the player and release chunks left behind.
+
+        The working set is requested as one batch in priority order; with
+        ``include_center`` the player's own tile leads the batch and becomes
+        ``pending``.
+        """
+
+        wanted = self.working_set.keys_around(self.current_key, self._history)
+        batch: List[ChunkKey] = [self.current_key] if include_center else []
+        for key in wanted:
+            if key in self._requested:
+                continue
+            self._requested.add(key)
+            self.streaming_service.claim(key)
+            if key != self.current_key:
+                batch.append(key)
+        if batch:
+            if self.scheduler is None:
+                futures = self.streaming_service.request_many_async(batch)
+            else:
+                futures = self._schedule_loads(batch)
+            if include_center:
+                self.pending = futures[0]
+                self._count_request("crossing")
+            prefetched = len(batch) - int(include_center)
+            self.metrics.prefetch_requests += prefetched
+            for _ in range(prefetched):
+                self._count_request("prefetch")
+
+        for key in [key for key in self._requested if self.working_set.should_unload(self.current_key, key)]:
+            self._requested.discard(key)
+            if not self.streaming_service.release(key):
+                continue  # Another controller sharing the service still wants it.
+            if self.scheduler is not None and self.scheduler.cancel(WORK_LOAD, key):
+                self.metrics.cancellations += 1
+                continue
+            if self.streaming_service.cancel_request(key):
+                self.metrics.cancellations += 1
+                continue
+            if self.scheduler is not None:
+                self.scheduler.submit(WORK_UNLOAD, key, partial(self._unload, key))
+                continue
+            self._unload(key)
+
+    def _schedule_loads(self, keys: List[ChunkKey]) -> List["Future[Chunk]"]:
+        futures = []
+        for key in keys:
+            if self.streaming_service.is_loaded(key):
+                # Resident chunks resolve at once (queuing them would let a
+                # later cancel strand the chunk); just keep them resident.
+                self.scheduler.cancel(WORK_UNLOAD, key)
+                futures.append(self.streaming_service.request_chunk_async(key))
+                continue
+            future = self.scheduler.submit(WORK_LOAD, key, partial(self.streaming_service.request_chunk, key))
+            future.add_done_callback(partial(self._forget_dropped, key))
+            futures.append(future)
+        return futures
+
+    def _forget_dropped(self, key: ChunkKey, future: "Future[Chunk]") -> None:
+        if future.cancelled() and key in self._requested:
+            self._requested.discard(key)
+            self.streaming_service.release(key)
+
+    def _unload(self, key: ChunkKey) -> None:
+        try:
+            self.streaming_service.unload_chunk(key)
+        except ChunkLifecycleError:
+            return
+        self.metrics.unloads += 1
+
+    def _offset(self, step: Step) -> ChunkKey:
+        return ChunkKey(
+            latitude=self.current_key.latitude + step[0],
+            longitude=self.current_key.longitude + step[1],
+            level_of_detail=self.current_key.level_of_detail,
         )
-        if action == "move_north":
-            lat += 1
-        elif action == "move_south":
-            lat -= 1
-        elif action == "move_east":
-            lon += 1
-        elif action == "move_west":
-            lon -= 1
-        return ChunkKey(latitude=lat, longitude=lon, level_of_detail=lod)
 
 
 __all__ = [
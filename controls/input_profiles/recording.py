@@ -0,0 +1,114 @@
+"""Recording and replay of per-player input streams."""
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List
+
+from engine.streaming import ChunkKey
+
+from .profiles import InputEvent, InputProfile, MouseKeyboardProfile, XboxControllerProfile
+
+RECORDING_VERSION = 1
+
+# Profile names used in recordings.
+PROFILES: Dict[str, Callable[[], InputProfile]] = {
+    "keyboard": MouseKeyboardProfile,
+    "xbox": XboxControllerProfile,
+}
+
+
+@dataclass
+class InputTrack:
+    """One player's input grouped into frames, plus where the player started."""
+
+    profile: str
+    origin: ChunkKey
+    frames: List[List[InputEvent]] = field(default_factory=list)
+
+    def __post_init__(self) -> None:
+        if self.profile not in PROFILES:
+            raise ValueError(f"Unknown input profile {self.profile!r}")
+
+    def record(self, events: Iterable[InputEvent]) -> None:
+        """Append one frame of input (possibly empty)."""
+
+        self.frames.append(list(events))
+
+    def make_profile(self) -> InputProfile:
+        return PROFILES[self.profile]()
+
+
+@dataclass
+class InputRecording:
+    """Input of several players, frame-aligned so it replays deterministically.
+
+    Saved as JSON lines: a header naming each player's profile and origin,
+    then one line per frame that has input, listing
+    ``[player, device, control, value]`` events.
+    """
+
+    tracks: List[InputTrack] = field(default_factory=list)
+
+    @property
+    def frame_count(self) -> int:
+        return max((len(track.frames) for track in self.tracks), default=0)
+
+    def frame(self, index: int) -> List[List[InputEvent]]:
+        """Each track's events for frame ``index``; empty once a track has ended."""
+
+        return [track.frames[index] if index < len(track.frames) else [] for track in self.tracks]
+
+    def save(self, path: Path | str) -> None:
+        header = {
+            "version": RECORDING_VERSION,
+            "frames": self.frame_count,
+            "players": [
+                {
+                    "profile": track.profile,
+                    "origin": [track.origin.latitude, track.origin.longitude, track.origin.level_of_detail],
+                }
+                for track in self.tracks
+            ],
+        }
+        with Path(path).open("w", encoding="utf-8") as handle:
+            handle.write(json.dumps(header) + "\n")
+            for index in range(self.frame_count):
+                events = [
+                    [player, event.device, event.control, event.value]
+                    for player, frame in enumerate(self.frame(index))
+                    for event in frame
+                ]
+                if events:
+                    handle.write(json.dumps({"frame": index, "events": events}) + "\n")
+
+    @classmethod
+    def load(cls, path: Path | str) -> "InputRecording":
+        with Path(path).open("r", encoding="utf-8") as handle:
+            header = json.loads(handle.readline())
+            if header.get("version") != RECORDING_VERSION:
+                raise ValueError(f"Unsupported recording version {header.get('version')!r}")
+            frames = header["frames"]
+            tracks = [
+                InputTrack(
+                    profile=player["profile"],
+                    origin=ChunkKey(
+                        latitude=player["origin"][0],
+                        longitude=player["origin"][1],
+                        level_of_detail=player["origin"][2],
+                    ),
+                    frames=[[] for _ in range(frames)],
+                )
+                for player in header["players"]
+            ]
+            for line in handle:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                for player, device, control, value in record["events"]:
+                    tracks[player].frames[record["frame"]].append(InputEvent(device, control, value))
+        return cls(tracks)
+
+
+__all__ = ["InputRecording", "InputTrack", "PROFILES", "RECORDING_VERSION"]
@@ -0,0 +1,125 @@
+"""Working-set policy used to prefetch chunks around a traversing player."""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Iterable, List, Tuple
+
+from engine.streaming import ChunkKey
+
+Step = Tuple[int, int]
+
+
+@dataclass(frozen=True)
+class WorkingSetPolicy:
+    """Describes which chunks around ``current_key`` should stay resident.
+
+    ``radius`` is the square ring loaded around the player. ``lookahead`` is
+    the number of extra tiles requested along the recent movement direction
+    when the player moves steadily; it is scaled by how consistent the last
+    ``velocity_window`` moves were. Chunks are only unloaded once they are
+    more than ``radius + hysteresis`` tiles away, so walking back and forth
+    across a boundary does not thrash.
+    """
+
+    radius: int = 1
+    lookahead: int = 2
+    hysteresis: int = 1
+    velocity_window: int = 4
+
+    def __post_init__(self) -> None:
+        if self.radius < 0 or self.lookahead < 0 or self.hysteresis < 0:
+            raise ValueError("Working set distances must be non-negative")
+        if self.velocity_window < 1:
+            raise ValueError("velocity_window must be at least 1")
+
+    def velocity(self, history: Iterable[Step]) -> Tuple[float, float]:
+        """Average per-move displacement over the recent movement history."""
+
+        steps = list(history)[-self.velocity_window :]
+        if not steps:
+            return 0.0, 0.0
+        return (
+            sum(step[0] for step in steps) / len(steps),
+            sum(step[1] for step in steps) / len(steps),
+        )
+
+    def keys_around(self, center: ChunkKey, history: Iterable[Step] = ()) -> List[ChunkKey]:
+        """Return the working set ordered by load priority.
+
+        The center comes first, then lookahead tiles nearest-first, then the
+        remaining ring tiles by distance.
+        """
+
+        ordered: List[ChunkKey] = [center]
+        seen = {center}
+        for key in self._lookahead(center, history):
+            if key not in seen:
+                seen.add(key)
+                ordered.append(key)
+        ring = [
+            _offset(center, dlat, dlon)
+            for dlat in range(-self.radius, self.radius + 1)
+            for dlon in range(-self.radius, self.radius + 1)
+        ]
+        ring.sort(key=lambda key: (chebyshev(center, key), _manhattan(center, key)))
+        for key in ring:
+            if key not in seen:
+                seen.add(key)
+                ordered.append(key)
+        return ordered
+
+    def should_unload(self, center: ChunkKey, key: ChunkKey) -> bool:
+        if key.level_of_detail != center.level_of_detail:
+            return False
+        return chebyshev(center, key) > self.radius + self.hysteresis
+
+    def _lookahead(self, center: ChunkKey, history: Iterable[Step]) -> List[ChunkKey]:
+        vel_lat, vel_lon = self.velocity(history)
+        speed = max(abs(vel_lat), abs(vel_lon))
+        tiles = round(self.lookahead * speed)
+        if tiles == 0:
+            return []
+        step_lat = _sign(vel_lat) if abs(vel_lat) >= 0.5 * speed else 0
+        step_lon = _sign(vel_lon) if abs(vel_lon) >= 0.5 * speed else 0
+        return [
+            _offset(center, step_lat * (self.radius + idx), step_lon * (self.radius + idx))
+            for idx in range(1, tiles + 1)
+        ]
+
+
+@dataclass
+class TraversalMetrics:
+    """Counters describing how well prefetching keeps ahead of the player."""
+
+    crossings: int = 0
+    warm_crossings: int = 0
+    prefetch_requests: int = 0
+    unloads: int = 0
+    cancellations: int = 0
+
+    @property
+    def warm_ratio(self) -> float:
+        return self.warm_crossings / self.crossings if self.crossings else 0.0
+
+
+def chebyshev(a: ChunkKey, b: ChunkKey) -> int:
+    return max(abs(a.latitude - b.latitude), abs(a.longitude - b.longitude))
+
+
+def _manhattan(a: ChunkKey, b: ChunkKey) -> int:
+    return abs(a.latitude - b.latitude) + abs(a.longitude - b.longitude)
+
+
+def _offset(key: ChunkKey, dlat: int, dlon: int) -> ChunkKey:
+    return ChunkKey(
+        latitude=key.latitude + dlat,
+        longitude=key.longitude + dlon,
+        level_of_detail=key.level_of_detail,
+    )
+
+
+def _sign(value: float) -> int:
+    return (value > 0) - (value < 0)
+
+
+__all__ = ["TraversalMetrics", "WorkingSetPolicy", "chebyshev"]
@@ -1,4 +1,5 @@
 """Open Maps ingestion package exports."""
 from .pipeline import DataIngestPipeline, RegionRequest
+from .stages import StageConfig
 
-__all__ = ["DataIngestPipeline", "RegionRequest"]
+__all__ = ["DataIngestPipeline", "RegionRequest", "StageConfig"]
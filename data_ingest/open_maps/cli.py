@@ -18,15 +18,51 @@ def parse_chunk_keys(raw_keys: List[str]) -> List[ChunkKey]:
     return keys
 
 
+def parse_chunk_range(raw: str) -> List[ChunkKey]:
+    """Expand ``lat0:lat1,lon0:lon1,lod`` (inclusive bounds) into chunk keys."""
+
+    try:
+        lat_part, lon_part, lod_part = raw.split(",")
+        lat0, lat1 = map(int, lat_part.split(":"))
+        lon0, lon1 = map(int, lon_part.split(":"))
+        lod = int(lod_part)
+    except ValueError as exc:
+        raise argparse.ArgumentTypeError(f"Invalid range {raw!r}; expected lat0:lat1,lon0:lon1,lod") from exc
+    return [
+        ChunkKey(latitude=lat, longitude=lon, level_of_detail=lod)
+        for lat in range(min(lat0, lat1), max(lat0, lat1) + 1)
+        for lon in range(min(lon0, lon1), max(lon0, lon1) + 1)
+    ]
+
+
 def main(argv: List[str] | None = None) -> None:
     parser = argparse.ArgumentParser(description="Run the Open Maps data ingest pipeline.")
     parser.add_argument("name", help="Region name used for packaging")
     parser.add_argument(
         "--chunk",
         action="append",
-        default=["0:0:0"],
+        default=[],
         help="Chunk key in the form lat:lon:lod. Provide multiple times for more chunks.",
     )
+    parser.add_argument(
+        "--range",
+        action="append",
+        default=[],
+        dest="ranges",
+        type=parse_chunk_range,
+        help="Inclusive chunk range in the form lat0:lat1,lon0:lon1,lod. May be repeated.",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of worker processes used to generate chunks.",
+    )
+    parser.add_argument(
+        "--no-resume",
+        action="store_true",
+        help="Ignore any progress journal left by an interrupted run.",
+    )
     parser.add_argument(
         "--lod",
         default="medium",
@@ -40,14 +76,22 @@ def main(argv: List[str] | None = None) -> None:
     )
     args = parser.parse_args(argv)
 
+    chunk_keys = parse_chunk_keys(args.chunk)
+    for expanded in args.ranges:
+        chunk_keys.extend(expanded)
+    if not chunk_keys:
+        chunk_keys = parse_chunk_keys(["0:0:0"])
+    # Keep the first occurrence of each key so overlapping ranges are ingested once.
+    chunk_keys = list(dict.fromkeys(chunk_keys))
+
     request = RegionRequest(
         name=args.name,
-        chunk_keys=parse_chunk_keys(args.chunk),
+        chunk_keys=chunk_keys,
         zoning_policy=args.zoning,
         lod_policy=LODPolicy(args.lod),
     )
     pipeline = DataIngestPipeline()
-    report = pipeline.run(request)
+    report = pipeline.run(request, workers=args.workers, resume=not args.no_resume)
     print(f"Ingested {len(report['chunks'])} chunks for region {request.name}.")
 
 
@@ -0,0 +1,102 @@
+"""Append-only progress journal that lets interrupted ingests resume."""
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Dict, TextIO
+
+from engine.streaming import ChunkKey
+
+
+class IngestJournal:
+    """Records finished chunks as JSON lines under a request fingerprint.
+
+    The first line holds the fingerprint of the inputs the run was started
+    with. A journal written for different inputs is discarded on open so a
+    resumed run never mixes chunks from two configurations. Without
+    ``resume`` the previous journal is ignored and truncated on first write.
+    """
+
+    def __init__(self, path: Path | str, fingerprint: str, resume: bool = True) -> None:
+        self.path = Path(path)
+        self.fingerprint = fingerprint
+        self._completed: Dict[ChunkKey, int] = self._read_existing() if resume else {}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._handle: TextIO | None = None
+
+    @property
+    def completed(self) -> Dict[ChunkKey, int]:
+        """Finished chunks mapped to the mesh count recorded for them."""
+
+        return dict(self._completed)
+
+    def record(self, key: ChunkKey, mesh_count: int) -> None:
+        handle = self._open()
+        handle.write(json.dumps(self._entry(key, mesh_count)) + "\n")
+        handle.flush()
+        self._completed[key] = mesh_count
+
+    def close(self) -> None:
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+
+    def __enter__(self) -> "IngestJournal":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def finish(self) -> None:
+        """Close and delete the journal once the run has completed."""
+
+        self.close()
+        if self.path.exists():
+            self.path.unlink()
+
+    def _open(self) -> TextIO:
+        if self._handle is None:
+            # Rewrite what survived from a previous run so a torn trailing line
+            # is dropped instead of being glued onto the next entry.
+            self._handle = self.path.open("w", encoding="utf-8")
+            self._handle.write(json.dumps({"fingerprint": self.fingerprint}) + "\n")
+            for key, mesh_count in self._completed.items():
+                self._handle.write(json.dumps(self._entry(key, mesh_count)) + "\n")
+            self._handle.flush()
+        return self._handle
+
+    @staticmethod
+    def _entry(key: ChunkKey, mesh_count: int) -> dict:
+        return {
+            "latitude": key.latitude,
+            "longitude": key.longitude,
+            "lod": key.level_of_detail,
+            "mesh_count": mesh_count,
+        }
+
+    def _read_existing(self) -> Dict[ChunkKey, int]:
+        if not self.path.exists():
+            return {}
+        completed: Dict[ChunkKey, int] = {}
+        with self.path.open("r", encoding="utf-8") as handle:
+            lines = handle.read().splitlines()
+        if not lines:
+            return {}
+        try:
+            header = json.loads(lines[0])
+        except ValueError:
+            return {}
+        if header.get("fingerprint") != self.fingerprint:
+            return {}
+        for line in lines[1:]:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                # A crash can leave a torn final line; everything before it is valid.
+                break
+            key = ChunkKey(latitude=entry["latitude"], longitude=entry["longitude"], level_of_detail=entry["lod"])
+            completed[key] = entry["mesh_count"]
+        return completed
+
+
+__all__ = ["IngestJournal"]
@@ -0,0 +1,77 @@
+"""Content-hash manifests that let re-ingests skip unchanged chunks."""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Dict, Iterable
+
+from engine.streaming import ChunkKey
+
+MANIFEST_VERSION = 1
+
+
+def chunk_input_hash(key: ChunkKey, mesh_ids: Iterable[str], *components: object) -> str:
+    """Hash everything that determines the bytes written for ``key``.
+
+    Mesh IDs are content hashes of the extruded meshes, so they already cover
+    the source records, zoning and LOD policy of every intersecting building.
+    ``components`` carries the remaining request-wide inputs (policies,
+    generator and format versions).
+    """
+
+    digest = hashlib.sha256()
+    digest.update(f"{key.latitude}:{key.longitude}:{key.level_of_detail}".encode("ascii"))
+    for component in components:
+        digest.update(b"\0")
+        digest.update(str(component).encode("utf-8"))
+    digest.update(b"\0")
+    for identifier in mesh_ids:
+        digest.update(identifier.encode("ascii"))
+    return digest.hexdigest()
+
+
+class IngestManifest:
+    """Per-region map from chunk key to the input hash it was written with."""
+
+    def __init__(self, path: Path | str) -> None:
+        self.path = Path(path)
+        self._hashes: Dict[str, str] = self._read()
+
+    def matches(self, key: ChunkKey, input_hash: str) -> bool:
+        return self._hashes.get(_slot(key)) == input_hash
+
+    def update(self, key: ChunkKey, input_hash: str) -> None:
+        self._hashes[_slot(key)] = input_hash
+
+    def __len__(self) -> int:
+        return len(self._hashes)
+
+    def save(self) -> None:
+        """Write the manifest atomically so a crash never leaves it torn."""
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+        with temp_path.open("w", encoding="utf-8") as handle:
+            json.dump({"version": MANIFEST_VERSION, "chunks": self._hashes}, handle, indent=2, sort_keys=True)
+        os.replace(temp_path, self.path)
+
+    def _read(self) -> Dict[str, str]:
+        if not self.path.exists():
+            return {}
+        try:
+            with self.path.open("r", encoding="utf-8") as handle:
+                document = json.load(handle)
+        except ValueError:
+            return {}
+        if document.get("version") != MANIFEST_VERSION:
+            return {}
+        return dict(document.get("chunks", {}))
+
+
+def _slot(key: ChunkKey) -> str:
+    return f"{key.latitude}:{key.longitude}:{key.level_of_detail}"
+
+
+__all__ = ["IngestManifest", "chunk_input_hash"]
@@ -1,15 +1,32 @@
 """Open data ingestion pipeline for preparing engine-ready meshes."""
 from __future__ import annotations
 
+import hashlib
 import json
-import random
+import math
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, Iterable, List, Sequence
+from typing import Dict, Iterable, Iterator, List, Sequence, Tuple, TypeVar
 
-from engine.streaming import ChunkCache, ChunkKey, ChunkStreamingService
+from engine.streaming import Chunk, ChunkCache, ChunkKey, ChunkStreamingService, GeneratorConfig, MeshPool
+from engine.streaming.mesh_pool import MeshPoolWriter, footprint_bounds, footprint_intersects
+from engine.streaming.region_pack import write_region_pack
+from engine.streaming.rng import CounterRNG, stable_seed
+from engine.telemetry import MetricsRegistry
 from procedural.buildings import BuildingExtruder, LODPolicy
 
+from .journal import IngestJournal
+from .manifest import IngestManifest, chunk_input_hash
+from .stages import StageConfig, batched, chain_stages
+
+# Number of chunk keys handed to a worker process at a time. Small enough
+# that the journal advances steadily, large enough to amortize IPC.
+SHARD_SIZE = 64
+
+T = TypeVar("T")
+
 
 @dataclass(frozen=True)
 class RegionRequest:
@@ -22,27 +39,65 @@ class RegionRequest:
 
 
 class DataIngestPipeline:
-    """End-to-end data pipeline that prepares data for the streaming engine."""
+    """End-to-end data pipeline that prepares data for the streaming engine.
+
+    With a ``metrics`` registry, time spent and records handled are recorded
+    per stage (download, normalize, populate, package) and shared with the
+    default cache and streaming service.
+
+    ``cache_max_bytes`` puts the chunk cache under a disk quota; chunks it
+    evicts before the region is packaged are regenerated for the pack.
+    """
 
     def __init__(
         self,
         cache_dir: Path | str = Path("artifacts/chunks"),
         extruder: BuildingExtruder | None = None,
         streaming_service: ChunkStreamingService | None = None,
+        package_dir: Path | str = Path("artifacts/packages"),
+        stage_config: StageConfig | None = None,
+        metrics: MetricsRegistry | None = None,
+        cache_max_bytes: int | None = None,
     ) -> None:
-        self.cache = ChunkCache(cache_dir)
-        self.streaming_service = streaming_service or ChunkStreamingService(cache=self.cache)
+        self.metrics = metrics
+        self.cache = ChunkCache(cache_dir, metrics=metrics, max_bytes=cache_max_bytes)
+        self.streaming_service = streaming_service or ChunkStreamingService(cache=self.cache, metrics=metrics)
         self.extruder = extruder or BuildingExtruder()
+        self.package_dir = Path(package_dir)
+        self.stage_config = stage_config or StageConfig()
+        self.written_chunks: List[ChunkKey] = []
+
+    def run(self, request: RegionRequest, workers: int = 1, resume: bool = True) -> Dict[str, List[dict]]:
+        """Execute the pipeline for the provided region request.
 
-    def run(self, request: RegionRequest) -> Dict[str, List[dict]]:
-        """Execute the pipeline for the provided region request."""
+        Records stream through download -> normalize -> assign stages joined
+        by bounded queues (see ``StageConfig``), and meshes are written to the
+        region pool as they arrive, so memory does not grow with region size.
+        With ``workers > 1`` chunk keys are sharded across a process pool
+        whose workers rebuild the streaming service from its
+        ``generator_config``.
+        With ``resume`` enabled, finished chunks are journaled so a rerun after
+        an interruption skips them. Output is identical either way.
+        """
 
-        datasets = self._download_datasets(request)
-        meshes = self._normalize_to_meshes(datasets, request)
-        return self._populate_chunks(meshes, request)
+        records = self._download_datasets(request)
+        if self.metrics is not None:
+            records = _metered(records, self.metrics, "download")
+        batches = chain_stages(
+            records,
+            [_passthrough, lambda stream: self._normalize_to_meshes(stream, request)],
+            self.stage_config.queue_size,
+        )
+        meshes = (mesh for batch in batches for mesh in batch)
+        with MeshPoolWriter(self.mesh_pool_path(request.name)) as writer:
+            assignments = self._assign_meshes(meshes, request.chunk_keys, writer)
+        if self.extruder.cache is not None:
+            # Persist memoized extrusions (when the cache has a path) for the next run.
+            self.extruder.cache.save()
+        return self._populate_chunks(assignments, writer.ids, request, workers=workers, resume=resume)
 
-    def _download_datasets(self, request: RegionRequest) -> List[dict]:
-        """Fetch datasets for the region. Uses deterministic synthetic data for tests."""
+    def _download_datasets(self, request: RegionRequest) -> Iterator[Tuple[dict, dict]]:
+        """Yield ``(spec, record)`` pairs lazily. Uses deterministic synthetic data for tests."""
 
         dataset_specs = [
             {
@@ -56,28 +111,27 @@ class DataIngestPipeline:
                 "license": "CC-BY",
             },
         ]
-        datasets: List[dict] = []
         for spec in dataset_specs:
-            rng = random.Random(hash((spec["name"], request.name)))
-            records = []
+            rng = CounterRNG(stable_seed(spec["name"], request.name))
             for idx in range(3):
-                records.append(
-                    {
-                        "id": f"{spec['name']}-{idx}",
-                        "footprint": [
-                            (round(rng.uniform(-0.5, 0.5), 3), round(rng.uniform(-0.5, 0.5), 3))
-                            for _ in range(4)
-                        ],
-                        "zoning": request.zoning_policy,
-                    }
-                )
-            datasets.append({"spec": spec, "records": records})
-        return datasets
+                yield spec, {
+                    "id": f"{spec['name']}-{idx}",
+                    "footprint": [
+                        (round(rng.uniform(-0.5, 0.5), 3), round(rng.uniform(-0.5, 0.5), 3))
+                        for _ in range(4)
+                    ],
+                    "zoning": request.zoning_policy,
+                }
+
+    def _normalize_to_meshes(
+        self, records: Iterable[Tuple[dict, dict]], request: RegionRequest
+    ) -> Iterator[List[dict]]:
+        """Extrude records into meshes, yielding them in batches."""
 
-    def _normalize_to_meshes(self, datasets: Iterable[dict], request: RegionRequest) -> List[dict]:
-        meshes: List[dict] = []
-        for dataset in datasets:
-            for record in dataset["records"]:
+        for batch in batched(records, self.stage_config.batch_size):
+            start = time.perf_counter()
+            meshes: List[dict] = []
+            for spec, record in batch:
                 mesh = self.extruder.extrude(
                     footprint=record["footprint"],
                     zoning=record["zoning"],
@@ -85,21 +139,107 @@ class DataIngestPipeline:
                 )
                 mesh.update(
                     {
-                        "dataset": dataset["spec"]["name"],
-                        "source_license": dataset["spec"]["license"],
+                        "dataset": spec["name"],
+                        "source_license": spec["license"],
                         "record_id": record["id"],
                     }
                 )
                 meshes.append(mesh)
-        return meshes
+            self._record_stage("normalize", start, len(batch))
+            yield meshes
+
+    def mesh_pool_path(self, region_name: str) -> Path:
+        """Location of the shared mesh pool written for ``region_name``."""
+
+        return self.cache.root / "mesh_pools" / f"{region_name}.json"
+
+    def manifest_path(self, region_name: str) -> Path:
+        """Per-chunk input hashes used to skip unchanged chunks on re-runs."""
+
+        return self.package_dir / f"{region_name}_manifest.json"
+
+    def pack_path(self, region_name: str) -> Path:
+        """Single-file region pack that ``ChunkStreamingService.mount_pack`` serves from."""
+
+        return self.package_dir / f"{region_name}.owrp"
+
+    def journal_path(self, region_name: str) -> Path:
+        return self.package_dir / f"{region_name}_journal.jsonl"
+
+    def _populate_chunks(
+        self,
+        assignments: Dict[ChunkKey, List[str]],
+        mesh_ids: Iterable[str],
+        request: RegionRequest,
+        workers: int = 1,
+        resume: bool = True,
+    ) -> Dict[str, List[dict]]:
+        start = time.perf_counter()
+        self.streaming_service.mesh_pool = MeshPool.lazy(self.mesh_pool_path(request.name))
+
+        journal = IngestJournal(self.journal_path(request.name), self._fingerprint(request, mesh_ids), resume=resume)
+        completed = journal.completed
+
+        manifest = IngestManifest(self.manifest_path(request.name))
+        input_hashes = {
+            key: chunk_input_hash(
+                key,
+                assignments.get(key, []),
+                request.zoning_policy,
+                request.lod_policy.value,
+                self.streaming_service.GENERATOR_VERSION,
+                self.cache.codec,
+                self.cache.FORMAT_VERSION,
+            )
+            for key in request.chunk_keys
+        }
+        pending: List[ChunkKey] = []
+        for key in dict.fromkeys(request.chunk_keys):
+            if key in completed:
+                continue
+            if manifest.matches(key, input_hashes[key]) and self.cache.contains(key):
+                completed[key] = len(assignments.get(key, []))
+                continue
+            pending.append(key)
+        self.written_chunks = pending
+
+        # Closes the journal if generation fails; ``finish`` removes it on success.
+        # Workers rebuild the service from its generator config; services
+        # they cannot reproduce (subclasses, custom generators) run serially.
+        config = self.streaming_service.generator_config()
+        with journal:
+            if workers > 1 and len(pending) > 1 and config is not None:
+                shards = [pending[idx : idx + SHARD_SIZE] for idx in range(0, len(pending), SHARD_SIZE)]
+                with ProcessPoolExecutor(max_workers=workers) as executor:
+                    futures = [
+                        executor.submit(
+                            _ingest_shard,
+                            str(self.cache.root),
+                            self.cache.codec,
+                            self.cache.compress,
+                            config,
+                            shard,
+                            {key: assignments.get(key, []) for key in shard},
+                        )
+                        for shard in shards
+                    ]
+                    for future in as_completed(futures):
+                        for key, mesh_count in future.result():
+                            journal.record(key, mesh_count)
+                            completed[key] = mesh_count
+            else:
+                for start in range(0, len(pending), SHARD_SIZE):
+                    for chunk in self.streaming_service.generate_chunks(pending[start : start + SHARD_SIZE]):
+                        key = chunk.key
+                        chunk.payload["mesh_ids"] = assignments.get(key, [])
+                        self.streaming_service.publish_chunk(chunk)
+                        if self.streaming_service.cache is not self.cache:
+                            self.cache.store(chunk)
+                        journal.record(key, len(chunk.payload["mesh_ids"]))
+                        completed[key] = len(chunk.payload["mesh_ids"])
 
-    def _populate_chunks(self, meshes: List[dict], request: RegionRequest) -> Dict[str, List[dict]]:
         results: Dict[str, List[dict]] = {"chunks": []}
         for key in request.chunk_keys:
-            chunk = self.streaming_service.request_chunk(key)
-            chunk.payload.setdefault("meshes", [])
-            chunk.payload["meshes"].extend(meshes)
-            self.cache.store(chunk)
             results["chunks"].append(
                 {
                     "key": {
@@ -107,18 +247,129 @@ class DataIngestPipeline:
                         "longitude": key.longitude,
                         "lod": key.level_of_detail,
                     },
-                    "mesh_count": len(chunk.payload["meshes"]),
+                    "mesh_count": completed[key],
                 }
             )
-        self._package_region(results, request)
+        for key, input_hash in input_hashes.items():
+            manifest.update(key, input_hash)
+        manifest.save()
+        self._record_stage("populate", start, len(pending))
+        start = time.perf_counter()
+        self._package_region(results, request, assignments)
+        self._record_stage("package", start, len(results["chunks"]))
+        journal.finish()
         return results
 
-    def _package_region(self, results: Dict[str, List[dict]], request: RegionRequest) -> None:
-        package_dir = Path("artifacts/packages")
-        package_dir.mkdir(parents=True, exist_ok=True)
-        package_path = package_dir / f"{request.name}_package.json"
+    def _record_stage(self, stage: str, start: float, records: int) -> None:
+        if self.metrics is not None:
+            self.metrics.record_span("pipeline_stage_seconds", start, time.perf_counter() - start, stage=stage)
+            self.metrics.increment("pipeline_stage_records_total", records, stage=stage)
+
+    @staticmethod
+    def _fingerprint(request: RegionRequest, mesh_ids: Iterable[str]) -> str:
+        """Hash of the inputs that determine chunk output for ``request``."""
+
+        digest = hashlib.sha256()
+        digest.update(request.zoning_policy.encode("utf-8"))
+        digest.update(request.lod_policy.value.encode("utf-8"))
+        digest.update(str(ChunkStreamingService.GENERATOR_VERSION).encode("utf-8"))
+        for identifier in sorted(mesh_ids):
+            digest.update(identifier.encode("ascii"))
+        return digest.hexdigest()
+
+    @staticmethod
+    def _assign_meshes(
+        meshes: Iterable[dict], chunk_keys: Sequence[ChunkKey], pool: MeshPoolWriter
+    ) -> Dict[ChunkKey, List[str]]:
+        """Stream meshes into the pool and map each chunk to the meshes its tile intersects."""
+
+        keys_by_tile: Dict[tuple, List[ChunkKey]] = {}
+        for key in chunk_keys:
+            keys_by_tile.setdefault((key.latitude, key.longitude, key.level_of_detail), []).append(key)
+        levels = sorted({key.level_of_detail for key in chunk_keys})
+
+        assignments: Dict[ChunkKey, List[str]] = {}
+        for mesh in meshes:
+            identifier = pool.add(mesh)
+            footprint = mesh["footprint"]
+            min_x, min_y, max_x, max_y = footprint_bounds(footprint)
+            # Level-0 tiles are centred on integer coordinates; a level ``L``
+            # tile covers the level-0 tiles whose index shifted by ``L`` matches.
+            lat_min, lat_max = math.floor(min_y + 0.5), math.floor(max_y + 0.5)
+            lon_min, lon_max = math.floor(min_x + 0.5), math.floor(max_x + 0.5)
+            for lod in levels:
+                for lat in range(lat_min >> lod, (lat_max >> lod) + 1):
+                    for lon in range(lon_min >> lod, (lon_max >> lod) + 1):
+                        for key in keys_by_tile.get((lat, lon, lod), ()):
+                            if not footprint_intersects(footprint, key.bounds()):
+                                continue
+                            mesh_ids = assignments.setdefault(key, [])
+                            if identifier not in mesh_ids:
+                                mesh_ids.append(identifier)
+        return assignments
+
+    def _package_region(
+        self, results: Dict[str, List[dict]], request: RegionRequest, assignments: Dict[ChunkKey, List[str]]
+    ) -> None:
+        self.package_dir.mkdir(parents=True, exist_ok=True)
+        package_path = self.package_dir / f"{request.name}_package.json"
         with package_path.open("w", encoding="utf-8") as handle:
             json.dump(results, handle, indent=2)
+        write_region_pack(
+            self.pack_path(request.name),
+            self.cache,
+            request.chunk_keys,
+            rebuild=lambda key: self._rebuild_chunk(key, assignments),
+        )
+
+    def _rebuild_chunk(self, key: ChunkKey, assignments: Dict[ChunkKey, List[str]]) -> Chunk:
+        """Regenerate a chunk the cache quota evicted before it was packed."""
+
+        chunk = self.streaming_service.generate_chunk(key)
+        chunk.payload["mesh_ids"] = assignments.get(key, [])
+        return chunk
+
+
+def _metered(items: Iterable[T], metrics: MetricsRegistry, stage: str) -> Iterator[T]:
+    """Attribute the time spent producing each item of ``items`` to ``stage``."""
+
+    iterator = iter(items)
+    while True:
+        start = time.perf_counter()
+        try:
+            item = next(iterator)
+        except StopIteration:
+            return
+        metrics.record_span("pipeline_stage_seconds", start, time.perf_counter() - start, stage=stage)
+        metrics.increment("pipeline_stage_records_total", stage=stage)
+        yield item
+
+
+def _passthrough(items: Iterable) -> Iterable:
+    """Identity stage that gives the download step its own thread."""
+
+    return items
+
+
+def _ingest_shard(
+    cache_root: str,
+    codec: str,
+    compress: bool | Iterable[str],
+    config: GeneratorConfig,
+    keys: List[ChunkKey],
+    assignments: Dict[ChunkKey, List[str]],
+) -> List[Tuple[ChunkKey, int]]:
+    """Worker-process entry point: generate and store one shard of chunks."""
+
+    cache = ChunkCache(cache_root, codec=codec, compress=compress)
+    service = config.build_service()
+    finished: List[Tuple[ChunkKey, int]] = []
+    for chunk in service.generate_chunks(keys):
+        key = chunk.key
+        chunk.payload["mesh_ids"] = assignments.get(key, [])
+        cache.store(chunk)
+        finished.append((key, len(chunk.payload["mesh_ids"])))
+    return finished
 
 
 __all__ = ["DataIngestPipeline", "RegionRequest"]
@@ -0,0 +1,119 @@
+"""Bounded, lazily chained pipeline stages for streaming ingest."""
+from __future__ import annotations
+
+import queue
+import threading
+from dataclasses import dataclass
+from typing import Callable, Iterable, Iterator, List, TypeVar
+
+T = TypeVar("T")
+
+Stage = Callable[[Iterable], Iterable]
+
+_DONE = object()
+
+
+@dataclass(frozen=True)
+class StageConfig:
+    """Sizing for the streaming ingest stages.
+
+    ``queue_size`` bounds how many items may wait between two stages; a full
+    queue blocks the producer, which is what keeps memory flat. ``0`` runs
+    the stages as plain chained generators on the caller's thread.
+    ``batch_size`` is the number of records extruded per normalize batch.
+    """
+
+    queue_size: int = 256
+    batch_size: int = 64
+
+    def __post_init__(self) -> None:
+        if self.queue_size < 0:
+            raise ValueError("queue_size must be non-negative")
+        if self.batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+
+
+class _StageFailure:
+    def __init__(self, error: BaseException) -> None:
+        self.error = error
+
+
+def chain_stages(source: Iterable, stages: List[Stage], queue_size: int) -> Iterator:
+    """Connect ``source`` through ``stages`` and iterate the final output.
+
+    With a positive ``queue_size`` every stage runs in its own daemon thread
+    and hands items to the next one through a bounded queue. Exceptions raised
+    in any stage are re-raised in the consumer.
+    """
+
+    stream: Iterable = source
+    if queue_size == 0:
+        for stage in stages:
+            stream = stage(stream)
+        yield from stream
+        return
+
+    stop = threading.Event()
+    for stage in stages:
+        stream = _threaded(stage(stream), queue_size, stop)
+    try:
+        yield from stream
+    finally:
+        stop.set()
+
+
+def _threaded(upstream: Iterable[T], queue_size: int, stop: threading.Event) -> Iterator[T]:
+    buffer: "queue.Queue[object]" = queue.Queue(maxsize=queue_size)
+
+    def put(item: object) -> bool:
+        while not stop.is_set():
+            try:
+                buffer.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def pump() -> None:
+        try:
+            for item in upstream:
+                if not put(item):
+                    return
+        except BaseException as exc:  # Propagate to the consuming thread.
+            put(_StageFailure(exc))
+            return
+        put(_DONE)
+
+    thread = threading.Thread(target=pump, name="ingest-stage", daemon=True)
+    thread.start()
+    return _drain(buffer, stop)
+
+
+def _drain(buffer: "queue.Queue[object]", stop: threading.Event) -> Iterator:
+    while True:
+        try:
+            item = buffer.get(timeout=0.1)
+        except queue.Empty:
+            # A stopped producer never sends ``_DONE``; stop waiting with it.
+            if stop.is_set():
+                return
+            continue
+        if item is _DONE:
+            return
+        if isinstance(item, _StageFailure):
+            raise item.error
+        yield item
+
+
+def batched(items: Iterable[T], size: int) -> Iterator[List[T]]:
+    batch: List[T] = []
+    for item in items:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+__all__ = ["StageConfig", "batched", "chain_stages"]
@@ -1,13 +1,45 @@
 """Streaming engine package exports."""
 from .chunk import Chunk, ChunkKey, ChunkState
-from .chunk_service import ChunkLifecycleError, ChunkStreamingService
-from .cache import ChunkCache
+from .chunk_format import ChunkFile, ChunkFormatError
+from .chunk_service import ChunkLifecycleError, ChunkStreamingService, GeneratorConfig
+from .cache import ChunkCache, convert_cache_tree
+from .chunk_server import ChunkServer, ChunkServerError, ChunkServerThread, ChunkServiceClient
+from .features import FeatureColumns
+from .heightfield import HeightfieldGenerator, heightfield_mip, heightfield_mips
+from .lod import LODRing, LODSelector
+from .mesh_pool import MeshPool
+from .region_pack import RegionPack, RegionPackWriter
+from .residency import ChunkResidencyManager, ResidencyStats
+from .scheduler import SchedulerStats, StreamingScheduler
+from .spatial_index import ChunkSpatialIndex
 
 __all__ = [
     "Chunk",
+    "ChunkFile",
+    "ChunkFormatError",
     "ChunkKey",
     "ChunkState",
     "ChunkLifecycleError",
+    "ChunkResidencyManager",
+    "ChunkSpatialIndex",
     "ChunkStreamingService",
     "ChunkCache",
+    "FeatureColumns",
+    "GeneratorConfig",
+    "HeightfieldGenerator",
+    "ChunkServer",
+    "ChunkServerError",
+    "ChunkServerThread",
+    "ChunkServiceClient",
+    "LODRing",
+    "LODSelector",
+    "MeshPool",
+    "RegionPack",
+    "RegionPackWriter",
+    "ResidencyStats",
+    "SchedulerStats",
+    "StreamingScheduler",
+    "convert_cache_tree",
+    "heightfield_mip",
+    "heightfield_mips",
 ]
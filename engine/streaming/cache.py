@@ -2,49 +2,413 @@
 from __future__ import annotations
 
 import json
+import threading
 from pathlib import Path
-from typing import Any
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Tuple
 
+from engine.telemetry import MetricsRegistry
+
+from .cache_index import EVICTION_LRU, EVICTION_POLICIES, CacheIndex, IndexEntry
 from .chunk import Chunk, ChunkKey
+from .chunk_format import FORMAT_VERSION, ChunkFile, encode_chunk
+from .features import json_default
+from .region_pack import RegionPack, RegionPackWriter
+from .write_behind import WriteBehindQueue, write_atomic
+
+CODEC_BINARY = "binary"
+CODEC_JSON = "json"
+
+_EXTENSIONS = {CODEC_BINARY: ".chunk", CODEC_JSON: ".json"}
 
 
 class ChunkCache:
-    """Simple JSON cache that persists chunk payloads on disk."""
+    """Disk cache that persists chunks as binary containers or debug JSON.
+
+    The binary codec writes the sectioned format from ``chunk_format`` and
+    lets callers decode metadata without parsing features or meshes. The
+    JSON codec keeps the original indented documents for debugging.
+
+    Every write goes through a temporary file and a rename, so a crash never
+    leaves a torn entry behind. With ``write_behind`` enabled, ``store`` only
+    encodes the chunk and queues it; a background writer commits batches of
+    up to ``batch_size`` entries, coalescing repeated stores of one key, and
+    ``store`` blocks once ``max_pending`` keys are waiting. Pending entries
+    are served by ``load``/``contains`` until committed. Call ``flush`` (or
+    use the cache as a context manager) before relying on the files.
+
+    ``max_bytes`` puts the cache under a disk quota. Sizes and accesses are
+    tracked in a persistent index (``cache_index.json``); once a commit
+    pushes usage over the quota, entries are evicted by ``eviction`` policy
+    (``"lru"`` or ``"lfu"``) down to ``LOW_WATER`` of the budget. ``compact``
+    moves every entry out of the ``lat_/lon_`` tree into one segment file,
+    which also reclaims space left by entries evicted from older segments.
+    The quota counts only live bytes; eviction compacts once more than
+    ``COMPACT_DEAD_FRACTION`` of the segment bytes are dead, so disk use can
+    briefly exceed ``max_bytes`` by that much.
+
+    With a ``metrics`` registry attached, bytes written and read are counted
+    per codec.
+    """
 
-    def __init__(self, root: Path | str) -> None:
+    FORMAT_VERSION = FORMAT_VERSION
+    INDEX_NAME = "cache_index.json"
+    SEGMENT_DIR = "segments"
+    # Fraction of ``max_bytes`` that eviction brings usage back down to, so
+    # the quota is not enforced again on every single store.
+    LOW_WATER = 0.9
+    # Share of segment bytes left dead by evictions before eviction compacts;
+    # compaction rewrites every entry, so it must not run on every store.
+    COMPACT_DEAD_FRACTION = 0.25
+    # Index mutations between automatic saves.
+    INDEX_SAVE_INTERVAL = 256
+
+    def __init__(
+        self,
+        root: Path | str,
+        codec: str = CODEC_BINARY,
+        compress: bool | Iterable[str] = False,
+        metrics: Optional[MetricsRegistry] = None,
+        write_behind: bool = False,
+        max_pending: int = 256,
+        batch_size: int = 32,
+        max_bytes: Optional[int] = None,
+        eviction: str = EVICTION_LRU,
+    ) -> None:
+        if codec not in _EXTENSIONS:
+            raise ValueError(f"Unknown chunk cache codec {codec!r}")
+        if eviction not in EVICTION_POLICIES:
+            raise ValueError(f"Unknown eviction policy {eviction!r}")
+        if max_bytes is not None and max_bytes < 1:
+            raise ValueError("max_bytes must be positive")
         self.root = Path(root)
         self.root.mkdir(parents=True, exist_ok=True)
+        self.codec = codec
+        self.compress = compress
+        self.metrics = metrics
+        self.max_bytes = max_bytes
+        self.eviction = eviction
+        self.evictions = 0
+        self._lock = threading.RLock()
+        self._segments: Dict[str, RegionPack] = {}
+        self._index: Optional[CacheIndex] = None
+        index_path = self.root / self.INDEX_NAME
+        if max_bytes is not None or index_path.exists():
+            self._index = self._open_index(index_path)
+        self._writer: Optional[WriteBehindQueue] = None
+        if write_behind:
+            self._writer = WriteBehindQueue(self._commit, max_pending=max_pending, batch_size=batch_size)
+
+    @property
+    def write_behind(self) -> bool:
+        return self._writer is not None
 
     def store(self, chunk: Chunk) -> None:
-        path = self._path_for(chunk.key)
-        path.parent.mkdir(parents=True, exist_ok=True)
-        with path.open("w", encoding="utf-8") as handle:
-            json.dump(
-                {
-                    "key": {
-                        "latitude": chunk.key.latitude,
-                        "longitude": chunk.key.longitude,
-                        "level_of_detail": chunk.key.level_of_detail,
-                    },
-                    "metadata": chunk.metadata,
-                    "payload": chunk.payload,
-                },
-                handle,
-                indent=2,
-            )
+        if self.codec == CODEC_BINARY:
+            data = encode_chunk(chunk, compress=self.compress)
+        else:
+            data = json.dumps(_document_for(chunk), indent=2, default=json_default).encode("utf-8")
+        if self._writer is not None:
+            self._writer.submit(chunk.key, data)
+            return
+        self._commit([(chunk.key, data)])
+
+    def flush(self) -> None:
+        """Wait until every queued write has been committed to disk."""
+
+        if self._writer is not None:
+            self._writer.flush()
+        with self._lock:
+            if self._index is not None and self._index.dirty:
+                self._index.save()
+
+    def close(self) -> None:
+        """Commit outstanding writes, stop the background writer and save the index."""
+
+        if self._writer is not None:
+            self._writer.close()
+        with self._lock:
+            if self._index is not None and self._index.dirty:
+                self._index.save()
+            for segment in self._segments.values():
+                segment.close()
+            self._segments.clear()
+
+    def __enter__(self) -> "ChunkCache":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
 
     def load(self, key: ChunkKey) -> dict[str, Any]:
-        path = self._path_for(key)
-        with path.open("r", encoding="utf-8") as handle:
-            return json.load(handle)
+        if self.codec == CODEC_BINARY:
+            with self._open_binary(key, touch=True) as chunk_file:
+                if self.metrics is not None:
+                    self.metrics.increment("chunk_cache_bytes_read_total", chunk_file.nbytes, codec=self.codec)
+                return chunk_file.to_document()
+        data = self._read_json(key)
+        if self.metrics is not None:
+            self.metrics.increment("chunk_cache_bytes_read_total", len(data), codec=self.codec)
+        return json.loads(data)
+
+    def encoded(self, key: ChunkKey) -> bytes:
+        """Return the entry for ``key`` as a binary chunk container."""
+
+        if self.codec == CODEC_BINARY:
+            return self._blob(key)
+        document = json.loads(self._read_json(key, touch=False))
+        return encode_chunk(Chunk(key=key, metadata=document["metadata"], payload=document["payload"]))
+
+    def load_metadata(self, key: ChunkKey) -> dict[str, Any]:
+        """Return only the chunk metadata, skipping feature and mesh sections."""
+
+        if self.codec == CODEC_BINARY:
+            with self._open_binary(key, touch=True) as chunk_file:
+                return chunk_file.metadata
+        return self.load(key)["metadata"]
+
+    def open(self, key: ChunkKey) -> ChunkFile:
+        """Memory-map a binary chunk for lazy, per-section access."""
+
+        if self.codec != CODEC_BINARY:
+            raise ValueError("Lazy section access requires the binary codec")
+        return self._open_binary(key, touch=True)
+
+    def contains(self, key: ChunkKey) -> bool:
+        if self._pending(key) is not None:
+            return True
+        with self._lock:
+            entry = self._index.get(key) if self._index is not None else None
+            if entry is not None and entry.segment:
+                return True
+        return self._path_for(key).exists()
 
     def evict(self, key: ChunkKey) -> None:
-        path = self._path_for(key)
-        if path.exists():
-            path.unlink()
+        if self._writer is not None:
+            self._writer.discard(key)
+        with self._lock:
+            self._remove(key)
+
+    def disk_usage(self) -> int:
+        """Bytes used by loose entries plus compacted segments (requires the index).
+
+        Includes dead segment space not yet reclaimed by ``compact``.
+        """
+
+        if self._index is None:
+            raise ValueError("Disk usage is only tracked for caches with an index")
+        with self._lock:
+            return self._index.loose_bytes() + self._segment_bytes()
+
+    def compact(self) -> int:
+        """Rewrite every live entry into a single new segment file.
+
+        Loose files and older segments are removed afterwards, along with the
+        emptied ``lat_/lon_`` directories. Returns the number of entries
+        moved. Only the binary codec can be compacted.
+        """
+
+        if self.codec != CODEC_BINARY:
+            raise ValueError("Compaction requires the binary codec")
+        with self._lock:
+            if self._index is None:
+                self._index = self._open_index(self.root / self.INDEX_NAME)
+            index = self._index
+            keys = sorted(index.entries, key=lambda key: (key.latitude, key.longitude, key.level_of_detail))
+            name = f"segment_{index.next_segment:06d}.owrp"
+            index.next_segment += 1
+            sizes: Dict[ChunkKey, int] = {}
+            with RegionPackWriter(self.root / self.SEGMENT_DIR / name) as writer:
+                for key in keys:
+                    blob = self._blob(key)
+                    writer.add_blob(key, blob)
+                    sizes[key] = len(blob)
+            for key in keys:
+                entry = index.entries[key]
+                if not entry.segment:
+                    self._path_for(key).unlink(missing_ok=True)
+                entry.segment = name
+                entry.size = sizes[key]
+            index.dead_bytes = 0
+            index.dirty += 1
+            for segment_name in list(self._segments):
+                self._segments.pop(segment_name).close()
+            segment_dir = self.root / self.SEGMENT_DIR
+            for path in segment_dir.glob("segment_*.owrp"):
+                if path.name != name:
+                    path.unlink()
+            _prune_empty_dirs(self.root)
+            index.save()
+            return len(keys)
+
+    def _open_index(self, path: Path) -> CacheIndex:
+        index = CacheIndex(path)
+        if not index.loaded:
+            # First use on an existing tree: seed the index from the loose
+            # files, treating older files as less recently used.
+            extension = _EXTENSIONS[self.codec]
+            files = sorted(self.root.glob(f"lat_*/lon_*/lod_*{extension}"), key=lambda item: item.stat().st_mtime)
+            for path_item in files:
+                index.record_store(_key_from_path(path_item), path_item.stat().st_size)
+            index.save()
+        return index
+
+    def _pending(self, key: ChunkKey) -> Optional[bytes]:
+        return self._writer.peek(key) if self._writer is not None else None
+
+    def _open_binary(self, key: ChunkKey, touch: bool) -> ChunkFile:
+        pending = self._pending(key)
+        if pending is not None:
+            return ChunkFile(pending)
+        with self._lock:
+            if self._index is not None:
+                if touch:
+                    self._touch(key)
+                entry = self._index.get(key)
+                if entry is not None and entry.segment:
+                    # Copy out of the segment so compaction can close its map.
+                    return ChunkFile(self._segment(entry.segment).blob(key))
+            return ChunkFile.open(self._path_for(key))
+
+    def _blob(self, key: ChunkKey) -> bytes:
+        pending = self._pending(key)
+        if pending is not None:
+            return pending
+        with self._lock:
+            entry = self._index.get(key) if self._index is not None else None
+            if entry is not None and entry.segment:
+                return self._segment(entry.segment).blob(key)
+            return self._path_for(key).read_bytes()
+
+    def _read_json(self, key: ChunkKey, touch: bool = True) -> bytes:
+        pending = self._pending(key)
+        if pending is not None:
+            return pending
+        with self._lock:
+            if touch and self._index is not None:
+                self._touch(key)
+            return self._path_for(key).read_bytes()
+
+    def _touch(self, key: ChunkKey) -> None:
+        self._index.touch(key)
+        if self._index.dirty >= self.INDEX_SAVE_INTERVAL:
+            self._index.save()
+
+    def _segment(self, name: str) -> RegionPack:
+        segment = self._segments.get(name)
+        if segment is None:
+            segment = self._segments[name] = RegionPack.open(self.root / self.SEGMENT_DIR / name)
+        return segment
+
+    def _segment_bytes(self) -> int:
+        segment_dir = self.root / self.SEGMENT_DIR
+        if not segment_dir.exists():
+            return 0
+        return sum(path.stat().st_size for path in segment_dir.glob("segment_*.owrp"))
+
+    def _commit(self, batch: List[Tuple[Hashable, bytes]]) -> None:
+        written = 0
+        with self._lock:
+            for key, data in batch:
+                path = self._path_for(key)  # type: ignore[arg-type]
+                path.parent.mkdir(parents=True, exist_ok=True)
+                written += write_atomic(path, data)
+                if self._index is not None:
+                    self._index.record_store(key, len(data))  # type: ignore[arg-type]
+            if self.max_bytes is not None:
+                self._enforce_quota(protect=[key for key, _data in batch])
+            if self._index is not None and self._index.dirty >= self.INDEX_SAVE_INTERVAL:
+                self._index.save()
+        if self.metrics is not None:
+            self.metrics.increment("chunk_cache_bytes_written_total", written, codec=self.codec)
+
+    def _enforce_quota(self, protect: Iterable[Hashable]) -> None:
+        segment_bytes = self._segment_bytes()
+        usage = self._index.loose_bytes() + segment_bytes - self._index.dead_bytes
+        if usage <= self.max_bytes:
+            return
+        target = int(self.max_bytes * self.LOW_WATER)
+        for key in self._index.eviction_order(self.eviction, protect=protect):
+            if usage <= target:
+                break
+            entry = self._remove(key)
+            self.evictions += 1
+            if entry is not None:
+                # Segment entries turn into dead bytes, reclaimed below.
+                usage -= entry.size
+        if self.codec == CODEC_BINARY and self._index.dead_bytes > self.COMPACT_DEAD_FRACTION * segment_bytes:
+            self.compact()
+
+    def _remove(self, key: ChunkKey) -> Optional[IndexEntry]:
+        entry = self._index.remove(key) if self._index is not None else None
+        if entry is None or not entry.segment:
+            self._path_for(key).unlink(missing_ok=True)
+        return entry
 
     def _path_for(self, key: ChunkKey) -> Path:
-        return self.root / f"lat_{key.latitude}" / f"lon_{key.longitude}" / f"lod_{key.level_of_detail}.json"
+        extension = _EXTENSIONS[self.codec]
+        return self.root / f"lat_{key.latitude}" / f"lon_{key.longitude}" / f"lod_{key.level_of_detail}{extension}"
+
+
+def _document_for(chunk: Chunk) -> Dict[str, Any]:
+    payload = chunk.payload
+    heights = payload.get("heightfield")
+    if heights is not None and hasattr(heights, "tolist"):
+        # The debug codec spells grids out as nested lists.
+        payload = {**payload, "heightfield": heights.tolist()}
+    return {
+        "format_version": FORMAT_VERSION,
+        "key": {
+            "latitude": chunk.key.latitude,
+            "longitude": chunk.key.longitude,
+            "level_of_detail": chunk.key.level_of_detail,
+        },
+        "metadata": chunk.metadata,
+        "payload": payload,
+    }
+
+
+def convert_cache_tree(
+    root: Path | str,
+    codec: str = CODEC_BINARY,
+    compress: bool | Iterable[str] = False,
+    remove_source: bool = True,
+) -> int:
+    """Re-encode every chunk under ``root`` with ``codec``.
+
+    Returns the number of converted chunks. Source files written with the
+    other codec are removed unless ``remove_source`` is false. Both caches
+    are closed on return, so the target's index is saved.
+    """
+
+    source_codec = CODEC_JSON if codec == CODEC_BINARY else CODEC_BINARY
+    pattern = f"lat_*/lon_*/lod_*{_EXTENSIONS[source_codec]}"
+    converted = 0
+    with ChunkCache(root, codec=codec, compress=compress) as target, ChunkCache(root, codec=source_codec) as source:
+        for path in sorted(target.root.glob(pattern)):
+            key = _key_from_path(path)
+            document = source.load(key)
+            chunk = Chunk(key=key, metadata=document["metadata"], payload=document["payload"])
+            target.store(chunk)
+            if remove_source:
+                path.unlink()
+            converted += 1
+    return converted
+
+
+def _prune_empty_dirs(root: Path) -> None:
+    for lon_dir in root.glob("lat_*/lon_*"):
+        if lon_dir.is_dir() and not any(lon_dir.iterdir()):
+            lon_dir.rmdir()
+    for lat_dir in root.glob("lat_*"):
+        if lat_dir.is_dir() and not any(lat_dir.iterdir()):
+            lat_dir.rmdir()
+
+
+def _key_from_path(path: Path) -> ChunkKey:
+    lod = int(path.stem[len("lod_") :])
+    lon = int(path.parent.name[len("lon_") :])
+    lat = int(path.parent.parent.name[len("lat_") :])
+    return ChunkKey(latitude=lat, longitude=lon, level_of_detail=lod)
 
 
-__all__ = ["ChunkCache"]
+__all__ = ["CODEC_BINARY", "CODEC_JSON", "ChunkCache", "convert_cache_tree"]
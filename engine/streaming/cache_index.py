@@ -0,0 +1,138 @@
+"""Persistent size/access index that lets ``ChunkCache`` honour a disk quota."""
+from __future__ import annotations
+
+import json
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from .chunk import ChunkKey
+
+INDEX_VERSION = 1
+
+EVICTION_LRU = "lru"
+EVICTION_LFU = "lfu"
+EVICTION_POLICIES = (EVICTION_LRU, EVICTION_LFU)
+
+
+@dataclass
+class IndexEntry:
+    """Where a cached chunk lives, how large it is and how it has been used.
+
+    ``last_access`` is a logical clock tick rather than wall time so ordering
+    survives clock changes and restarts. ``segment`` names the compacted
+    segment holding the entry, or is empty for a loose file.
+    """
+
+    size: int
+    last_access: int
+    hits: int = 0
+    segment: str = ""
+
+
+class CacheIndex:
+    """In-memory map of cache entries, saved atomically as JSON."""
+
+    def __init__(self, path: Path | str) -> None:
+        self.path = Path(path)
+        self.entries: Dict[ChunkKey, IndexEntry] = {}
+        self.clock = 0
+        self.next_segment = 0
+        # Bytes in segments that belong to removed or re-stored entries.
+        self.dead_bytes = 0
+        self.dirty = 0
+        self.loaded = self._read()
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self.entries
+
+    def get(self, key: ChunkKey) -> Optional[IndexEntry]:
+        return self.entries.get(key)
+
+    def record_store(self, key: ChunkKey, size: int, segment: str = "") -> None:
+        self.clock += 1
+        entry = self.entries.get(key)
+        hits = entry.hits if entry is not None else 0
+        if entry is not None and entry.segment:
+            self.dead_bytes += entry.size
+        self.entries[key] = IndexEntry(size=size, last_access=self.clock, hits=hits, segment=segment)
+        self.dirty += 1
+
+    def touch(self, key: ChunkKey) -> None:
+        entry = self.entries.get(key)
+        if entry is None:
+            return
+        self.clock += 1
+        entry.last_access = self.clock
+        entry.hits += 1
+        self.dirty += 1
+
+    def remove(self, key: ChunkKey) -> Optional[IndexEntry]:
+        entry = self.entries.pop(key, None)
+        if entry is not None:
+            if entry.segment:
+                self.dead_bytes += entry.size
+            self.dirty += 1
+        return entry
+
+    def loose_bytes(self) -> int:
+        return sum(entry.size for entry in self.entries.values() if not entry.segment)
+
+    def eviction_order(self, policy: str, protect: Iterable[ChunkKey] = ()) -> List[ChunkKey]:
+        """Keys from first to last evicted under ``policy``."""
+
+        protected = set(protect)
+        candidates = [key for key in self.entries if key not in protected]
+        if policy == EVICTION_LFU:
+            candidates.sort(key=lambda key: (self.entries[key].hits, self.entries[key].last_access))
+        else:
+            candidates.sort(key=lambda key: self.entries[key].last_access)
+        return candidates
+
+    def save(self) -> None:
+        document = {
+            "version": INDEX_VERSION,
+            "clock": self.clock,
+            "next_segment": self.next_segment,
+            "dead_bytes": self.dead_bytes,
+            "entries": {
+                _slot(key): [entry.size, entry.last_access, entry.hits, entry.segment]
+                for key, entry in self.entries.items()
+            },
+        }
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+        with temp_path.open("w", encoding="utf-8") as handle:
+            json.dump(document, handle, separators=(",", ":"), sort_keys=True)
+        os.replace(temp_path, self.path)
+        self.dirty = 0
+
+    def _read(self) -> bool:
+        if not self.path.exists():
+            return False
+        try:
+            with self.path.open("r", encoding="utf-8") as handle:
+                document = json.load(handle)
+        except ValueError:
+            return False
+        if document.get("version") != INDEX_VERSION:
+            return False
+        self.clock = int(document.get("clock", 0))
+        self.next_segment = int(document.get("next_segment", 0))
+        self.dead_bytes = int(document.get("dead_bytes", 0))
+        for slot, (size, last_access, hits, segment) in document.get("entries", {}).items():
+            latitude, longitude, lod = map(int, slot.split(":"))
+            key = ChunkKey(latitude=latitude, longitude=longitude, level_of_detail=lod)
+            self.entries[key] = IndexEntry(size=size, last_access=last_access, hits=hits, segment=segment)
+        return True
+
+
+def _slot(key: ChunkKey) -> str:
+    return f"{key.latitude}:{key.longitude}:{key.level_of_detail}"
+
+
+__all__ = ["CacheIndex", "EVICTION_LFU", "EVICTION_LRU", "EVICTION_POLICIES", "IndexEntry"]
@@ -1,9 +1,24 @@
 """Core chunk definitions for the open world streaming engine."""
 from __future__ import annotations
 
+import sys
 from dataclasses import dataclass, field
 from enum import Enum
-from typing import Any, Dict
+from typing import Any, Dict, List, Tuple
+
+from .morton import compact_bits, spread_bits
+from .rng import coordinate_seed
+
+# Instances carry no ``__dict__`` on interpreters that support slotted
+# dataclasses; millions of keys live in indexes and caches.
+_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+# ``ChunkKey.pack`` layout: level of detail in bits 58-62 above a Morton
+# interleave of latitude and longitude, each biased into 29 unsigned bits.
+PACKED_COORD_BITS = 29
+PACKED_MAX_LOD = 31
+_PACKED_BIAS = 1 << (PACKED_COORD_BITS - 1)
+_PACKED_LOD_SHIFT = 2 * PACKED_COORD_BITS
 
 
 class ChunkState(str, Enum):
@@ -14,22 +29,97 @@ class ChunkState(str, Enum):
     UNLOADED = "unloaded"
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, **_SLOTS)
 class ChunkKey:
-    """Uniquely identifies a chunk using integer tile coordinates and LOD."""
+    """Uniquely identifies a chunk using integer tile coordinates and LOD.
+
+    Level 0 is the finest grid. Each level up halves the resolution, so a
+    tile at ``level_of_detail + 1`` covers a 2x2 block of its children.
+    """
 
     latitude: int
     longitude: int
     level_of_detail: int
 
-    def seed(self) -> int:
-        """Generate a deterministic 32-bit seed based on the key."""
+    def __reduce__(self) -> Tuple[type, Tuple[int, int, int]]:
+        # Frozen slotted instances cannot be restored attribute by attribute.
+        return type(self), (self.latitude, self.longitude, self.level_of_detail)
 
-        # Mask to 32 bits so the seed is portable across platforms and runtimes.
-        return hash((self.latitude, self.longitude, self.level_of_detail)) & 0xFFFFFFFF
+    def pack(self) -> int:
+        """Encode the key as one non-negative 63-bit integer.
 
+        Packed keys sort by level of detail, then in Z-order, so nearby tiles
+        stay close together; they can stand in for the key in dicts, sets and
+        ``array('q')`` columns. Coordinates must lie in ``[-2**28, 2**28)``.
+        """
+
+        latitude = self.latitude + _PACKED_BIAS
+        longitude = self.longitude + _PACKED_BIAS
+        limit = 1 << PACKED_COORD_BITS
+        if not (0 <= latitude < limit and 0 <= longitude < limit and 0 <= self.level_of_detail <= PACKED_MAX_LOD):
+            raise ValueError(f"{self} is outside the packable range")
+        return (self.level_of_detail << _PACKED_LOD_SHIFT) | (spread_bits(latitude) << 1) | spread_bits(longitude)
+
+    @classmethod
+    def unpack(cls, packed: int) -> "ChunkKey":
+        """Inverse of ``pack``."""
+
+        morton = packed & ((1 << _PACKED_LOD_SHIFT) - 1)
+        return cls(
+            latitude=compact_bits(morton >> 1) - _PACKED_BIAS,
+            longitude=compact_bits(morton) - _PACKED_BIAS,
+            level_of_detail=packed >> _PACKED_LOD_SHIFT,
+        )
+
+    def seed(self) -> int:
+        """Generate a deterministic 32-bit seed based on the key."""
 
-@dataclass
+        # Derived arithmetically rather than via ``hash()`` so the seed is
+        # identical across processes, interpreters and platforms.
+        return coordinate_seed(self.latitude, self.longitude, self.level_of_detail)
+
+    def bounds(self) -> Tuple[float, float, float, float]:
+        """Tile extent as ``(min_x, min_y, max_x, max_y)`` in level-0 tile units.
+
+        Level-0 tiles are centred on their integer coordinates; ``x`` follows
+        longitude and ``y`` follows latitude, matching footprint coordinates.
+        A level ``L`` tile spans the ``2**L x 2**L`` level-0 tiles it covers.
+        """
+
+        shift = self.level_of_detail
+        return (
+            (self.longitude << shift) - 0.5,
+            (self.latitude << shift) - 0.5,
+            ((self.longitude + 1) << shift) - 0.5,
+            ((self.latitude + 1) << shift) - 0.5,
+        )
+
+    def parent(self) -> "ChunkKey":
+        """The coarser tile one level up that contains this tile."""
+
+        return ChunkKey(
+            latitude=self.latitude >> 1,
+            longitude=self.longitude >> 1,
+            level_of_detail=self.level_of_detail + 1,
+        )
+
+    def children(self) -> List["ChunkKey"]:
+        """The four finer tiles one level down, or ``[]`` at level 0."""
+
+        if self.level_of_detail == 0:
+            return []
+        return [
+            ChunkKey(
+                latitude=(self.latitude << 1) + dlat,
+                longitude=(self.longitude << 1) + dlon,
+                level_of_detail=self.level_of_detail - 1,
+            )
+            for dlat in (0, 1)
+            for dlon in (0, 1)
+        ]
+
+
+@dataclass(**_SLOTS)
 class Chunk:
     """Runtime representation of a chunk and its simulation payload."""
 
@@ -0,0 +1,318 @@
+"""Versioned binary container for cached chunks.
+
+Layout (little endian)::
+
+    header   magic "OWCK" | version u16 | flags u16 | section count u16 | reserved u16
+    key      latitude i32 | longitude i32 | level_of_detail i32
+    table    one entry per section: name 8s | compression u8 | encoding u8 |
+             reserved u16 | offset u64 | stored length u64 | raw length u64
+    sections contiguous section bodies referenced by the table
+
+Section bodies are either compact JSON or raw bytes, optionally zlib
+compressed. A payload ``heightfield`` grid is stored raw in the
+``heights`` section as little-endian float32. Files are read through ``mmap`` so a single section can be
+decoded without touching the others.
+"""
+from __future__ import annotations
+
+import json
+import math
+import mmap
+import struct
+import zlib
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Mapping, Tuple
+
+from .chunk import Chunk, ChunkKey
+from .features import json_default
+from .rng import np
+
+MAGIC = b"OWCK"
+FORMAT_VERSION = 1
+
+COMPRESSION_NONE = 0
+COMPRESSION_ZLIB = 1
+
+ENCODING_JSON = 0
+ENCODING_RAW = 1
+
+_HEADER = struct.Struct("<4sHHHH")
+_KEY = struct.Struct("<iii")
+_SECTION = struct.Struct("<8sBBHQQQ")
+
+# Payload entries promoted to their own sections; everything else in the
+# payload is kept together in the "payload" section.
+SPLIT_PAYLOAD_SECTIONS = ("features", "meshes")
+
+# Raw section holding ``payload["heightfield"]``.
+HEIGHTFIELD_SECTION = "heights"
+
+# Sections smaller than this are never worth compressing.
+COMPRESSION_THRESHOLD = 256
+
+
+class ChunkFormatError(ValueError):
+    """Raised when a chunk file is truncated, corrupt or of an unknown version."""
+
+
+def _encode_json(value: Any) -> bytes:
+    return json.dumps(value, separators=(",", ":"), default=json_default).encode("utf-8")
+
+
+def _encode_heightfield(heights: Any) -> bytes:
+    if isinstance(heights, (bytes, bytearray, memoryview)):
+        return bytes(heights)
+    return np.ascontiguousarray(heights, dtype="<f4").tobytes()
+
+
+def _decode_heightfield(raw: bytes) -> Any:
+    """Square float32 grid, or the raw bytes when NumPy is unavailable."""
+
+    if np is None:
+        return raw
+    side = math.isqrt(len(raw) // 4)
+    # A bytearray keeps the grid writable.
+    return np.frombuffer(bytearray(raw), dtype="<f4").reshape(side, side)
+
+
+def chunk_sections(chunk: Chunk) -> Dict[str, Tuple[int, bytes]]:
+    """Split a chunk into named ``(encoding, body)`` sections."""
+
+    payload = dict(chunk.payload)
+    sections: Dict[str, Tuple[int, bytes]] = {
+        "metadata": (ENCODING_JSON, _encode_json(chunk.metadata)),
+    }
+    for name in SPLIT_PAYLOAD_SECTIONS:
+        if name in payload:
+            sections[name] = (ENCODING_JSON, _encode_json(payload.pop(name)))
+    if "heightfield" in payload:
+        sections[HEIGHTFIELD_SECTION] = (ENCODING_RAW, _encode_heightfield(payload.pop("heightfield")))
+    sections["payload"] = (ENCODING_JSON, _encode_json(payload))
+    return sections
+
+
+def encode_chunk(
+    chunk: Chunk,
+    compress: bool | Iterable[str] = False,
+    extra_sections: Mapping[str, Tuple[int, bytes]] | None = None,
+) -> bytes:
+    """Serialize a chunk into the binary container.
+
+    ``compress`` is either a flag applied to every section or the names of the
+    sections that should be zlib compressed.
+    """
+
+    sections = chunk_sections(chunk)
+    if extra_sections:
+        sections.update(extra_sections)
+    return encode_sections(chunk.key, sections, compress)
+
+
+def encode_sections(
+    key: ChunkKey,
+    sections: Mapping[str, Tuple[int, bytes]],
+    compress: bool | Iterable[str] = False,
+) -> bytes:
+    if isinstance(compress, bool):
+        compressed_names = set(sections) if compress else set()
+    else:
+        compressed_names = set(compress)
+
+    table = []
+    bodies = []
+    offset = _HEADER.size + _KEY.size + _SECTION.size * len(sections)
+    for name, (encoding, raw) in sections.items():
+        encoded_name = name.encode("ascii")
+        if len(encoded_name) > 8:
+            raise ChunkFormatError(f"Section name {name!r} exceeds 8 bytes")
+        body = raw
+        compression = COMPRESSION_NONE
+        if name in compressed_names and len(raw) >= COMPRESSION_THRESHOLD:
+            packed = zlib.compress(raw, 6)
+            if len(packed) < len(raw):
+                body = packed
+                compression = COMPRESSION_ZLIB
+        table.append(_SECTION.pack(encoded_name, compression, encoding, 0, offset, len(body), len(raw)))
+        bodies.append(body)
+        offset += len(body)
+
+    header = _HEADER.pack(MAGIC, FORMAT_VERSION, 0, len(sections), 0)
+    key_block = _KEY.pack(key.latitude, key.longitude, key.level_of_detail)
+    return b"".join([header, key_block, *table, *bodies])
+
+
+class SectionEntry:
+    """Location of a single section inside a chunk file."""
+
+    __slots__ = ("name", "compression", "encoding", "offset", "length", "raw_length")
+
+    def __init__(self, name: str, compression: int, encoding: int, offset: int, length: int, raw_length: int) -> None:
+        self.name = name
+        self.compression = compression
+        self.encoding = encoding
+        self.offset = offset
+        self.length = length
+        self.raw_length = raw_length
+
+
+class ChunkFile:
+    """Lazy reader over an encoded chunk held in a buffer or a memory map."""
+
+    def __init__(self, buffer: bytes | mmap.mmap, owner: mmap.mmap | None = None) -> None:
+        self._buffer = buffer
+        self._view = memoryview(buffer)
+        self._owner = owner
+        self._exports: List[memoryview] = []
+        try:
+            self.version, self.key, self.sections = self._parse_header()
+        except ChunkFormatError:
+            self._view.release()
+            raise
+
+    @classmethod
+    def open(cls, path: Path | str) -> "ChunkFile":
+        """Memory-map ``path`` read-only and parse its header."""
+
+        with open(path, "rb") as handle:
+            try:
+                mapped = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError as exc:  # Zero-length files cannot be mapped.
+                raise ChunkFormatError(f"{path} is empty") from exc
+        try:
+            return cls(mapped, owner=mapped)
+        except ChunkFormatError:
+            mapped.close()
+            raise
+
+    def close(self) -> None:
+        # Views returned by ``raw_section`` pin the map; they die with the file.
+        for view in self._exports:
+            view.release()
+        self._exports.clear()
+        self._view.release()
+        if isinstance(self._buffer, memoryview):
+            # Views handed in (e.g. slices of a region pack) pin the
+            # underlying map until released.
+            self._buffer.release()
+        if self._owner is not None:
+            self._owner.close()
+            self._owner = None
+
+    def __enter__(self) -> "ChunkFile":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.sections
+
+    def raw_section(self, name: str) -> memoryview:
+        """Return the decompressed bytes of ``name``.
+
+        Uncompressed sections are returned as a zero-copy view into the map
+        that is released by ``close``; copy it to keep the bytes longer.
+        """
+
+        entry = self._entry(name)
+        if entry.compression == COMPRESSION_ZLIB:
+            return memoryview(self._decompressed(entry))
+        body = self._view[entry.offset : entry.offset + entry.length]
+        self._exports.append(body)
+        return body
+
+    def section(self, name: str) -> Any:
+        """Decode a section, parsing JSON bodies into Python values."""
+
+        entry = self._entry(name)
+        if entry.encoding == ENCODING_JSON:
+            return json.loads(self._decompressed(entry))
+        return self.raw_section(name)
+
+    @property
+    def nbytes(self) -> int:
+        """Size of the whole encoded chunk."""
+
+        return self._view.nbytes
+
+    @property
+    def metadata(self) -> Dict[str, Any]:
+        return self.section("metadata")
+
+    def payload(self) -> Dict[str, Any]:
+        """Reassemble the full chunk payload from its sections."""
+
+        payload = self.section("payload")
+        for name in SPLIT_PAYLOAD_SECTIONS:
+            if name in self.sections:
+                payload[name] = self.section(name)
+        if HEIGHTFIELD_SECTION in self.sections:
+            payload["heightfield"] = _decode_heightfield(self._decompressed(self._entry(HEIGHTFIELD_SECTION)))
+        return payload
+
+    def to_document(self) -> Dict[str, Any]:
+        """Return the same document shape produced by the JSON codec."""
+
+        return {
+            "format_version": self.version,
+            "key": {
+                "latitude": self.key.latitude,
+                "longitude": self.key.longitude,
+                "level_of_detail": self.key.level_of_detail,
+            },
+            "metadata": self.metadata,
+            "payload": self.payload(),
+        }
+
+    def _decompressed(self, entry: SectionEntry) -> bytes:
+        """A private copy of a section body."""
+
+        with self._view[entry.offset : entry.offset + entry.length] as body:
+            if entry.compression == COMPRESSION_ZLIB:
+                return zlib.decompress(body)
+            return bytes(body)
+
+    def _entry(self, name: str) -> SectionEntry:
+        try:
+            return self.sections[name]
+        except KeyError as exc:
+            raise ChunkFormatError(f"Chunk {self.key} has no section {name!r}") from exc
+
+    def _parse_header(self) -> Tuple[int, ChunkKey, Dict[str, SectionEntry]]:
+        size = len(self._view)
+        prefix = _HEADER.size + _KEY.size
+        if size < prefix:
+            raise ChunkFormatError("Chunk file is truncated")
+        magic, version, _flags, count, _reserved = _HEADER.unpack_from(self._buffer, 0)
+        if magic != MAGIC:
+            raise ChunkFormatError("Not a chunk file")
+        if version != FORMAT_VERSION:
+            raise ChunkFormatError(f"Unsupported chunk format version {version}")
+        latitude, longitude, lod = _KEY.unpack_from(self._buffer, _HEADER.size)
+        if size < prefix + count * _SECTION.size:
+            raise ChunkFormatError("Chunk section table is truncated")
+        sections: Dict[str, SectionEntry] = {}
+        for index in range(count):
+            raw_name, compression, encoding, _pad, offset, length, raw_length = _SECTION.unpack_from(
+                self._buffer, prefix + index * _SECTION.size
+            )
+            if offset + length > size:
+                raise ChunkFormatError("Chunk section extends past end of file")
+            name = raw_name.rstrip(b"\0").decode("ascii")
+            sections[name] = SectionEntry(name, compression, encoding, offset, length, raw_length)
+        key = ChunkKey(latitude=latitude, longitude=longitude, level_of_detail=lod)
+        return version, key, sections
+
+
+__all__ = [
+    "COMPRESSION_NONE",
+    "COMPRESSION_ZLIB",
+    "ChunkFile",
+    "ChunkFormatError",
+    "ENCODING_JSON",
+    "ENCODING_RAW",
+    "FORMAT_VERSION",
+    "HEIGHTFIELD_SECTION",
+    "encode_chunk",
+    "encode_sections",
+]
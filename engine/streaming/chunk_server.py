@@ -0,0 +1,484 @@
+"""Local socket chunk server shared by several game processes.
+
+One ``ChunkServer`` wraps a ``ChunkStreamingService`` (and through it a
+``ChunkCache``) so neighbouring shards stop regenerating the same chunks.
+``ChunkServiceClient`` speaks the protocol and stands in for the service in
+``StreamingTraversalController``.
+
+Wire format (little endian); every message is one frame::
+
+    frame    type u8 | body length u32 | body
+    REQUEST  one or more keys: latitude i32 | longitude i32 | level_of_detail i32
+    CHUNK    latitude i32 | longitude i32 | level_of_detail i32 | status u8 | data
+
+Each requested key is answered by one CHUNK frame. With ``STATUS_OK`` the data
+is the binary container from ``chunk_format``; otherwise it is a UTF-8 error
+message. Answers are streamed as chunks become available, not in request
+order.
+
+Run a server process with ``python -m engine.streaming.serve``.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import contextlib
+import signal
+import socket
+import struct
+import threading
+from concurrent.futures import Future
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterable, List, Optional, Set, Tuple, Union
+
+from engine.telemetry import MetricsRegistry
+
+from .cache import ChunkCache
+from .chunk import Chunk, ChunkKey, ChunkState
+from .chunk_format import ChunkFile, encode_chunk
+from .chunk_service import ChunkLifecycleError, ChunkStreamingService
+from .residency import ChunkResidencyManager
+
+MSG_REQUEST = 1
+MSG_CHUNK = 2
+
+STATUS_OK = 0
+STATUS_ERROR = 1
+
+Address = Union[str, Path, Tuple[str, int]]
+
+_FRAME = struct.Struct("<BI")
+_KEY = struct.Struct("<iii")
+_STATUS = struct.Struct("<B")
+
+
+class ChunkServerError(RuntimeError):
+    """Raised on the client when the server failed to produce a chunk."""
+
+
+@dataclass
+class ChunkServerStats:
+    """Counters describing the traffic a server has handled."""
+
+    connections: int = 0
+    batches: int = 0
+    requests: int = 0
+    coalesced: int = 0
+    errors: int = 0
+    bytes_sent: int = 0
+
+    def as_dict(self) -> Dict[str, int]:
+        return asdict(self)
+
+
+class ChunkServer:
+    """Serves chunks from one streaming service over a local socket.
+
+    Listens on a Unix socket at ``path`` when given, otherwise on TCP
+    ``host:port`` (``port=0`` picks a free port). Each REQUEST frame is a
+    batch; identical keys requested by any client while a load is in flight
+    share one load and one encoding. Encoding runs on the loop's default
+    executor, and answers to one connection are written one at a time.
+    """
+
+    def __init__(
+        self,
+        service: ChunkStreamingService,
+        path: Path | str | None = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        metrics: Optional[MetricsRegistry] = None,
+    ) -> None:
+        self.service = service
+        self.path = Path(path) if path is not None else None
+        self.host = host
+        self.port = port
+        self.metrics = metrics
+        self.stats = ChunkServerStats()
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._inflight: Dict[ChunkKey, "asyncio.Task[Tuple[ChunkKey, int, bytes]]"] = {}
+        self._connections: Set["asyncio.Task[None]"] = set()
+
+    @property
+    def address(self) -> Address:
+        return self.path if self.path is not None else (self.host, self.port)
+
+    async def start(self) -> None:
+        if self.path is not None:
+            self._server = await asyncio.start_unix_server(self._handle, path=str(self.path))
+        else:
+            self._server = await asyncio.start_server(self._handle, self.host, self.port)
+            self.port = self._server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self) -> None:
+        if self._server is None:
+            await self.start()
+        await self._server.serve_forever()
+
+    async def close(self) -> None:
+        if self._server is None:
+            return
+        self._server.close()
+        for task in list(self._connections):
+            task.cancel()
+        for task in list(self._inflight.values()):
+            task.cancel()
+        await asyncio.gather(*self._connections, *self._inflight.values(), return_exceptions=True)
+        await self._server.wait_closed()
+        self._server = None
+        if self.path is not None:
+            self.path.unlink(missing_ok=True)
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.stats.connections += 1
+        connection = asyncio.current_task()
+        self._connections.add(connection)
+        batches: Set["asyncio.Task[None]"] = set()
+        # Batches answer concurrently; one writes (and drains) at a time.
+        write_lock = asyncio.Lock()
+        try:
+            while True:
+                try:
+                    header = await reader.readexactly(_FRAME.size)
+                    kind, length = _FRAME.unpack(header)
+                    body = await reader.readexactly(length)
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+                if kind != MSG_REQUEST or not body or length % _KEY.size:
+                    break  # Protocol violation: drop the client.
+                keys = [ChunkKey(*fields) for fields in _KEY.iter_unpack(body)]
+                self.stats.batches += 1
+                batch = asyncio.ensure_future(self._serve_batch(keys, writer, write_lock))
+                batches.add(batch)
+                batch.add_done_callback(batches.discard)
+        except asyncio.CancelledError:
+            pass
+        finally:
+            for batch in list(batches):
+                batch.cancel()
+            writer.close()
+            with contextlib.suppress(Exception):
+                await writer.wait_closed()
+            self._connections.discard(connection)
+
+    async def _serve_batch(
+        self, keys: List[ChunkKey], writer: asyncio.StreamWriter, write_lock: asyncio.Lock
+    ) -> None:
+        loads = [self._encoded(key) for key in dict.fromkeys(keys)]
+        # Shielded so a client hanging up never cancels a load other clients share.
+        for done in asyncio.as_completed([asyncio.shield(load) for load in loads]):
+            key, status, data = await done
+            header = _KEY.pack(key.latitude, key.longitude, key.level_of_detail) + _STATUS.pack(status)
+            frame = _frame(MSG_CHUNK, header + data)
+            async with write_lock:
+                writer.write(frame)
+                self.stats.bytes_sent += len(frame)
+                if self.metrics is not None:
+                    self.metrics.increment("chunk_server_bytes_sent_total", len(frame))
+                await writer.drain()
+
+    def _encoded(self, key: ChunkKey) -> "asyncio.Task[Tuple[ChunkKey, int, bytes]]":
+        self.stats.requests += 1
+        task = self._inflight.get(key)
+        if task is not None:
+            self.stats.coalesced += 1
+            if self.metrics is not None:
+                self.metrics.increment("chunk_server_requests_total", outcome="coalesced")
+            return task
+        if self.metrics is not None:
+            self.metrics.increment("chunk_server_requests_total", outcome="load")
+        task = asyncio.ensure_future(self._load(key))
+        self._inflight[key] = task
+        task.add_done_callback(lambda _done, key=key: self._inflight.pop(key, None))
+        return task
+
+    async def _load(self, key: ChunkKey) -> Tuple[ChunkKey, int, bytes]:
+        try:
+            chunk = await asyncio.wrap_future(self.service.request_chunk_async(key))
+            # Encoding is CPU-bound; keep it off the loop serving every client.
+            data = await asyncio.get_running_loop().run_in_executor(None, encode_chunk, chunk)
+            return key, STATUS_OK, data
+        except Exception as exc:
+            self.stats.errors += 1
+            return key, STATUS_ERROR, str(exc).encode("utf-8")
+
+
+class ChunkServerThread:
+    """Runs a ``ChunkServer`` on a private event loop in a daemon thread.
+
+    Useful to embed a server in a test or load-test process; use it as a
+    context manager or call ``start``/``stop``.
+    """
+
+    def __init__(self, server: ChunkServer) -> None:
+        self.server = server
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._ready = threading.Event()
+        self._error: Optional[BaseException] = None
+
+    def start(self) -> Address:
+        self._thread = threading.Thread(target=self._run, name="chunk-server", daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        if self._error is not None:
+            raise self._error
+        return self.server.address
+
+    def stop(self) -> None:
+        if self._loop is not None and self._thread is not None and self._thread.is_alive():
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+
+    def __enter__(self) -> Address:
+        return self.start()
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.stop()
+
+    def _run(self) -> None:
+        loop = self._loop = asyncio.new_event_loop()
+        try:
+            try:
+                loop.run_until_complete(self.server.start())
+            except BaseException as exc:
+                self._error = exc
+                return
+            finally:
+                self._ready.set()
+            loop.run_forever()
+            loop.run_until_complete(self.server.close())
+        finally:
+            loop.close()
+
+
+class ChunkServiceClient:
+    """Drop-in stand-in for ``ChunkStreamingService`` backed by a ``ChunkServer``.
+
+    Implements the request, claim, cancel, unload and residency queries used
+    by ``StreamingTraversalController``. Chunks are resident in this process once
+    their answer arrives; requests for a key already in flight share its
+    future, and ``request_many_async`` sends one REQUEST frame per batch.
+    Cancelling only drops the local future; the server still finishes the
+    load for other clients.
+    """
+
+    def __init__(self, address: Address, timeout: Optional[float] = None) -> None:
+        self.address = address
+        self._socket = _connect(address, timeout)
+        self._stream: BinaryIO = self._socket.makefile("rb")
+        self._lock = threading.Lock()
+        self._send_lock = threading.Lock()
+        self._chunks: Dict[ChunkKey, Chunk] = {}
+        self._inflight: Dict[ChunkKey, "Future[Chunk]"] = {}
+        self._claims: Dict[ChunkKey, int] = {}
+        self._closed = False
+        self._reader = threading.Thread(target=self._read_loop, name="chunk-client", daemon=True)
+        self._reader.start()
+
+    def request_chunk(self, key: ChunkKey) -> Chunk:
+        return self.request_chunk_async(key).result()
+
+    def request_chunk_async(self, key: ChunkKey) -> "Future[Chunk]":
+        return self.request_many_async([key])[0]
+
+    def request_many_async(self, keys: Iterable[ChunkKey]) -> List["Future[Chunk]"]:
+        """Request a batch in one frame, one future per key."""
+
+        futures: List["Future[Chunk]"] = []
+        missing: List[ChunkKey] = []
+        with self._lock:
+            if self._closed:
+                raise ConnectionError("Chunk server connection is closed")
+            for key in keys:
+                chunk = self._chunks.get(key)
+                if chunk is not None and chunk.state == ChunkState.LOADED:
+                    future: "Future[Chunk]" = Future()
+                    future.set_result(chunk)
+                else:
+                    future = self._inflight.get(key)
+                    if future is None:
+                        future = self._inflight[key] = Future()
+                        missing.append(key)
+                futures.append(future)
+        if missing:
+            body = b"".join(_KEY.pack(key.latitude, key.longitude, key.level_of_detail) for key in missing)
+            with self._send_lock:
+                self._socket.sendall(_frame(MSG_REQUEST, body))
+        return futures
+
+    def request_many(self, keys: Iterable[ChunkKey]) -> List[Chunk]:
+        return [future.result() for future in self.request_many_async(keys)]
+
+    def claim(self, key: ChunkKey) -> None:
+        with self._lock:
+            self._claims[key] = self._claims.get(key, 0) + 1
+
+    def release(self, key: ChunkKey) -> bool:
+        with self._lock:
+            remaining = self._claims.get(key, 0) - 1
+            if remaining > 0:
+                self._claims[key] = remaining
+                return False
+            self._claims.pop(key, None)
+            return True
+
+    def cancel_request(self, key: ChunkKey) -> bool:
+        with self._lock:
+            future = self._inflight.pop(key, None)
+        if future is None:
+            return False
+        future.cancel()
+        return True
+
+    def unload_chunk(self, key: ChunkKey) -> Chunk:
+        with self._lock:
+            chunk = self._chunks.pop(key, None)
+        if chunk is None:
+            raise ChunkLifecycleError(f"Chunk {key} is not loaded")
+        chunk.mark_unloaded()
+        return chunk
+
+    def get_chunk(self, key: ChunkKey) -> Optional[Chunk]:
+        with self._lock:
+            return self._chunks.get(key)
+
+    def is_loaded(self, key: ChunkKey) -> bool:
+        with self._lock:
+            return key in self._chunks
+
+    def get_loaded_chunks(self) -> Dict[ChunkKey, Chunk]:
+        with self._lock:
+            return dict(self._chunks)
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Close the connection; requests still in flight fail."""
+
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        with contextlib.suppress(OSError):
+            self._socket.shutdown(socket.SHUT_RDWR)
+        self._socket.close()
+        if wait:
+            self._reader.join()
+
+    close = shutdown
+
+    def __enter__(self) -> "ChunkServiceClient":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.shutdown()
+
+    def _read_loop(self) -> None:
+        try:
+            while True:
+                header = self._stream.read(_FRAME.size)
+                if len(header) < _FRAME.size:
+                    break
+                kind, length = _FRAME.unpack(header)
+                body = self._stream.read(length)
+                if len(body) < length or kind != MSG_CHUNK:
+                    break
+                self._receive(body)
+        except (OSError, ValueError):
+            pass
+        finally:
+            with self._lock:
+                self._closed = True
+                pending, self._inflight = self._inflight, {}
+            for future in pending.values():
+                if future.set_running_or_notify_cancel():
+                    future.set_exception(ConnectionError("Chunk server connection closed"))
+
+    def _receive(self, body: bytes) -> None:
+        key = ChunkKey(*_KEY.unpack_from(body))
+        (status,) = _STATUS.unpack_from(body, _KEY.size)
+        data = body[_KEY.size + _STATUS.size :]
+        with self._lock:
+            future = self._inflight.pop(key, None)
+        if future is None or not future.set_running_or_notify_cancel():
+            return  # Cancelled, or a duplicate answer after a re-request.
+        if status != STATUS_OK:
+            future.set_exception(ChunkServerError(data.decode("utf-8", "replace")))
+            return
+        with ChunkFile(data) as chunk_file:
+            document = chunk_file.to_document()
+        chunk = Chunk(key=key, metadata=document["metadata"], payload=document["payload"])
+        chunk.mark_loaded()
+        with self._lock:
+            self._chunks[key] = chunk
+        future.set_result(chunk)
+
+
+def _frame(kind: int, body: bytes) -> bytes:
+    return _FRAME.pack(kind, len(body)) + body
+
+
+def _connect(address: Address, timeout: Optional[float]) -> socket.socket:
+    if isinstance(address, tuple):
+        connection = socket.create_connection(address, timeout=timeout)
+        connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    else:
+        connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        connection.settimeout(timeout)
+        connection.connect(str(address))
+    # The reader thread blocks indefinitely; ``timeout`` only bounds connecting.
+    connection.settimeout(None)
+    return connection
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m engine.streaming.serve", description="Serve chunks locally.")
+    parser.add_argument("--socket", help="Unix socket path (default: TCP on --host/--port).")
+    parser.add_argument("--host", default="127.0.0.1", help="TCP host when no socket path is given.")
+    parser.add_argument("--port", type=int, default=7878, help="TCP port when no socket path is given.")
+    parser.add_argument("--cache-dir", help="Read-through chunk cache directory shared by all clients.")
+    parser.add_argument("--max-workers", type=int, help="Generation worker threads.")
+    parser.add_argument("--max-resident", type=int, help="Bound the chunks held in memory by the server.")
+    args = parser.parse_args(argv)
+
+    cache = ChunkCache(args.cache_dir, write_behind=True) if args.cache_dir else None
+    residency = ChunkResidencyManager(max_chunks=args.max_resident) if args.max_resident else None
+    service = ChunkStreamingService(
+        cache=cache, read_through=cache is not None, residency=residency, max_workers=args.max_workers
+    )
+    server = ChunkServer(service, path=args.socket, host=args.host, port=args.port)
+
+    async def run() -> None:
+        await server.start()
+        print(f"Serving chunks on {server.address}", flush=True)
+        stop = asyncio.Event()
+        with contextlib.suppress(NotImplementedError):
+            asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, stop.set)
+        try:
+            await stop.wait()
+        finally:
+            await server.close()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.shutdown()
+        if cache is not None:
+            cache.close()
+    return 0
+
+
+__all__ = [
+    "ChunkServer",
+    "ChunkServerError",
+    "ChunkServerStats",
+    "ChunkServerThread",
+    "ChunkServiceClient",
+    "MSG_CHUNK",
+    "MSG_REQUEST",
+    "STATUS_ERROR",
+    "STATUS_OK",
+    "main",
+]
@@ -2,88 +2,663 @@
 from __future__ import annotations
 
 import random
-from typing import Dict, Iterable, List, Optional
+import threading
+import time
+from array import array
+from concurrent.futures import CancelledError, Executor, Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import partial
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from engine.telemetry import MetricsRegistry
 
 from .chunk import Chunk, ChunkKey, ChunkState
+from .features import FeatureColumns, compact_features
+from .heightfield import HEIGHTFIELD_DTYPE, HeightfieldGenerator
+from .lod import aggregate_chunk
+from .mesh_pool import MeshPool
+from .region_pack import RegionPack
+from .residency import ChunkResidencyManager
+from .rng import CounterRNG, batch_uniforms, coordinate_seeds, np
+from .scheduler import WORK_WRITE, StreamingScheduler
+from .spatial_index import ChunkSpatialIndex
 
 
 class ChunkLifecycleError(RuntimeError):
     """Raised when lifecycle operations are performed on invalid chunks."""
 
 
+@dataclass(frozen=True)
+class GeneratorConfig:
+    """The settings that determine what a service generates; picklable.
+
+    Lets worker processes rebuild a service that produces the same chunks.
+    """
+
+    deterministic: bool = True
+    heightfield: Optional[HeightfieldGenerator] = None
+    compact_features: bool = False
+
+    def build_service(self, **kwargs: Any) -> "ChunkStreamingService":
+        return ChunkStreamingService(
+            deterministic=self.deterministic,
+            heightfield=self.heightfield,
+            compact_features=self.compact_features,
+            **kwargs,
+        )
+
+
 class ChunkStreamingService:
-    """Pages geographic chunks using deterministic seeds."""
+    """Pages geographic chunks using deterministic seeds.
+
+    With ``read_through`` enabled the cache acts as a backing store: a chunk
+    missing from memory is first loaded from the cache and only regenerated
+    when no entry exists or the stored seed/generator version is stale.
+
+    An optional ``residency`` manager bounds the number (or estimated bytes)
+    of chunks held in memory; least-recently-used chunks are dropped once the
+    budget is exceeded and spilled to the cache after the lock is released.
+
+    Loads can run on a worker pool through ``request_chunk_async``; requests
+    for the same key are coalesced into one future and can be cancelled while
+    they are still in flight. Callers sharing the service (one traversal
+    controller per player, say) ``claim`` the keys they want and ``release``
+    them, and only cancel or unload a key once ``release`` reports that no
+    claims remain.
+
+    Resident keys are mirrored into ``spatial_index`` for box, radius,
+    nearest-neighbour and parent/child queries.
+
+    Chunk payloads reference region meshes through ``mesh_ids``; the shared
+    ``mesh_pool`` resolves them so identical geometry is held once.
+
+    With ``lod_pyramid`` enabled, a coarse tile whose four children are
+    resident (or cached, in read-through mode) is aggregated from them instead
+    of being generated independently; otherwise it is generated directly.
+    Aggregates depend on which children happened to be available, so they
+    are never written to the cache.
+
+    Region packs attached with ``mount_pack`` are consulted before the cache
+    and generation; they are read-only and never written back to.
 
-    def __init__(self, cache: Optional[object] = None, deterministic: bool = True) -> None:
+    An optional ``metrics`` registry records request outcomes, generation
+    time, cache hits/misses and cache read/write latency.
+
+    With a ``heightfield`` generator every chunk also carries
+    ``payload["heightfield"]``, a seamless float32 vertex grid (see
+    ``engine.streaming.heightfield``); cached entries produced with other
+    heightfield settings, or none, are regenerated.
+
+    With ``compact_features`` the feature list of every chunk the service
+    produces or reads back is held as ``FeatureColumns`` (typed arrays) rather
+    than a list of dicts; it compares equal and serializes identically.
+
+    With a ``scheduler`` the cache writes of freshly produced chunks and the
+    spills of evicted ones are queued on it as write work instead of running inside the load; drain the
+    scheduler before shutting down so they are not lost.
+    """
+
+    # Bump whenever ``_generate_features`` or the metadata layout changes so
+    # cached chunks produced by older generators are regenerated.
+    GENERATOR_VERSION = 2
+
+    BIOME_OPTIONS = ("tundra", "temperate", "desert", "forest", "alpine")
+    FEATURES_PER_CHUNK = 5
+
+    def __init__(
+        self,
+        cache: Optional[object] = None,
+        deterministic: bool = True,
+        read_through: bool = False,
+        residency: Optional[ChunkResidencyManager] = None,
+        executor: Optional[Executor] = None,
+        max_workers: Optional[int] = None,
+        mesh_pool: Optional[MeshPool] = None,
+        lod_pyramid: bool = False,
+        metrics: Optional[MetricsRegistry] = None,
+        heightfield: Optional[HeightfieldGenerator] = None,
+        compact_features: bool = False,
+        scheduler: Optional[StreamingScheduler] = None,
+    ) -> None:
         self._cache = cache
         self._deterministic = deterministic
+        self._read_through = read_through
         self._chunks: Dict[ChunkKey, Chunk] = {}
+        self.residency = residency
+        self._executor = executor
+        self._owns_executor = executor is None
+        self._max_workers = max_workers
+        self._lock = threading.RLock()
+        self._inflight: Dict[ChunkKey, "Future[Chunk]"] = {}
+        self._cancelled: Set[ChunkKey] = set()
+        self.mesh_pool = mesh_pool
+        self.spatial_index = ChunkSpatialIndex()
+        self._lod_pyramid = lod_pyramid
+        self.metrics = metrics
+        self._packs: List[RegionPack] = []
+        # Loads reading from ``_packs``; unmounting waits for them to finish.
+        self._pack_readers = 0
+        self._packs_idle = threading.Condition(self._lock)
+        self.heightfield = heightfield
+        self._compact_features = compact_features
+        self.scheduler = scheduler
+        self._claims: Dict[ChunkKey, int] = {}
+
+    @property
+    def cache(self) -> Optional[object]:
+        return self._cache
 
     def request_chunk(self, key: ChunkKey) -> Chunk:
         """Load a chunk, generating deterministic payload if necessary."""
 
-        chunk = self._chunks.get(key)
-        if chunk and chunk.state == ChunkState.LOADED:
-            return chunk
+        future, owner = self._begin_request(key)
+        if owner:
+            self._run_request(key, future)
+        return future.result()
+
+    def request_chunk_async(self, key: ChunkKey) -> "Future[Chunk]":
+        """Schedule a chunk load on the worker pool and return its future.
+
+        Concurrent requests for the same key share a single future. Wrap the
+        result with ``asyncio.wrap_future`` to await it from a coroutine.
+        """
+
+        future, owner = self._begin_request(key)
+        if owner:
+            self._get_executor().submit(self._run_request, key, future)
+        return future
+
+    def request_many_async(self, keys: Iterable[ChunkKey]) -> List["Future[Chunk]"]:
+        """Schedule a batch of chunk loads, one future per key."""
+
+        return [self.request_chunk_async(key) for key in keys]
+
+    def request_many(self, keys: Iterable[ChunkKey]) -> List[Chunk]:
+        """Batch load helper used by higher-level systems."""
+
+        return [future.result() for future in self.request_many_async(keys)]
+
+    def generator_config(self) -> Optional[GeneratorConfig]:
+        """Settings to rebuild an equivalent generator elsewhere.
+
+        ``None`` for subclasses and overridden generators, which a plain
+        service cannot reproduce.
+        """
+
+        if type(self) is not ChunkStreamingService or "_generate_features" in vars(self):
+            return None
+        return GeneratorConfig(self._deterministic, self.heightfield, self._compact_features)
+
+    def generate_chunk(self, key: ChunkKey) -> Chunk:
+        """Generate a chunk without touching the cache or the resident map."""
 
-        chunk = Chunk(key=key)
         seed = key.seed() if self._deterministic else None
-        generator = random.Random(seed)
+        chunk = Chunk(key=key)
+        generator = CounterRNG(seed if seed is not None else random.getrandbits(64))
         features = self._generate_features(generator)
+        if self._compact_features:
+            features = compact_features(features, self.BIOME_OPTIONS)
         chunk.payload = {
             "features": features,
             "seed": seed,
+            "generator_version": self.GENERATOR_VERSION,
         }
         chunk.metadata = {
             "elevation": round(generator.uniform(0.0, 1250.0), 3),
             "temperature": round(generator.uniform(-10.0, 35.0), 2),
         }
+        if self.heightfield is not None:
+            self._attach_heightfield(chunk, self.heightfield.generate(key))
         chunk.mark_loaded()
-        self._chunks[key] = chunk
+        return chunk
+
+    def generate_chunks(self, keys: Sequence[ChunkKey]) -> List[Chunk]:
+        """Generate many chunks in one vectorized pass.
+
+        Produces exactly what ``generate_chunk`` would for each key. Falls back
+        to per-key generation when NumPy is unavailable, the service is not
+        deterministic, or ``_generate_features`` has been overridden.
+        """
+
+        keys = list(keys)
+        if (
+            np is None
+            or not self._deterministic
+            or type(self)._generate_features is not ChunkStreamingService._generate_features
+            or "_generate_features" in vars(self)
+        ):
+            return [self.generate_chunk(key) for key in keys]
+        if not keys:
+            return []
+
+        seeds = coordinate_seeds(
+            [key.latitude for key in keys],
+            [key.longitude for key in keys],
+            [key.level_of_detail for key in keys],
+        )
+        feature_count = self.FEATURES_PER_CHUNK
+        draws = batch_uniforms(seeds, 2 * feature_count + 2)
+        biome_index = np.floor(draws[:, 0 : 2 * feature_count : 2] * len(self.BIOME_OPTIONS)).astype(np.int64)
+        densities = draws[:, 1 : 2 * feature_count : 2]
+        # Same arithmetic as CounterRNG.uniform(0.0, 1250.0) / uniform(-10.0, 35.0).
+        elevations = 0.0 + 1250.0 * draws[:, 2 * feature_count]
+        temperatures = -10.0 + 45.0 * draws[:, 2 * feature_count + 1]
+        grids = self.heightfield.generate_many(keys) if self.heightfield is not None else [None] * len(keys)
+
+        chunks: List[Chunk] = []
+        for key, seed, biomes, density_row, elevation, temperature, grid in zip(
+            keys,
+            seeds.tolist(),
+            biome_index.tolist(),
+            densities.tolist(),
+            elevations.tolist(),
+            temperatures.tolist(),
+            grids,
+        ):
+            chunk = Chunk(key=key)
+            densities_row = [round(density, 4) for density in density_row]
+            if self._compact_features:
+                features: Any = FeatureColumns(
+                    array("i", range(len(biomes))), array("B", biomes), array("d", densities_row), self.BIOME_OPTIONS
+                )
+            else:
+                features = [
+                    {"id": feature_id, "biome": self.BIOME_OPTIONS[biome], "resource_density": density}
+                    for feature_id, (biome, density) in enumerate(zip(biomes, densities_row))
+                ]
+            chunk.payload = {
+                "features": features,
+                "seed": seed,
+                "generator_version": self.GENERATOR_VERSION,
+            }
+            chunk.metadata = {
+                "elevation": round(elevation, 3),
+                "temperature": round(temperature, 2),
+            }
+            if grid is not None:
+                # Copied so each chunk owns (and is charged for) only its own grid.
+                self._attach_heightfield(chunk, grid.copy())
+            chunk.mark_loaded()
+            chunks.append(chunk)
+        return chunks
+
+    def publish_chunk(self, chunk: Chunk) -> Chunk:
+        """Persist an externally completed chunk once and make it resident.
+
+        Used by producers such as the ingest pipeline that decorate a freshly
+        generated chunk before it is written.
+        """
 
         if self._cache is not None:
             self._write_to_cache(chunk)
-
+        spilled: List[Chunk] = []
+        with self._lock:
+            self._chunks[chunk.key] = chunk
+            self.spatial_index.add(chunk.key)
+            if self.residency is not None:
+                self.residency.admit(chunk)
+                spilled = self._enforce_budget(protect=chunk.key)
+        self._spill(spilled)
         return chunk
 
-    def request_many(self, keys: Iterable[ChunkKey]) -> List[Chunk]:
-        """Batch load helper used by higher-level systems."""
+    def mount_pack(self, pack: RegionPack | str | Path) -> RegionPack:
+        """Serve chunks from a region pack; later mounts take precedence."""
+
+        if not isinstance(pack, RegionPack):
+            pack = RegionPack.open(pack)
+        with self._lock:
+            self._packs.insert(0, pack)
+        return pack
+
+    def unmount_packs(self) -> None:
+        """Detach and close every mounted region pack.
+
+        Blocks until loads already reading from the packs have finished.
+        """
+
+        with self._lock:
+            packs, self._packs = self._packs, []
+            while self._pack_readers:
+                self._packs_idle.wait()
+        for pack in packs:
+            pack.close()
+
+    def claim(self, key: ChunkKey) -> None:
+        """Record that one more caller wants ``key`` kept."""
 
-        return [self.request_chunk(key) for key in keys]
+        with self._lock:
+            self._claims[key] = self._claims.get(key, 0) + 1
+
+    def release(self, key: ChunkKey) -> bool:
+        """Drop one claim on ``key``; returns ``True`` once nobody claims it."""
+
+        with self._lock:
+            remaining = self._claims.get(key, 0) - 1
+            if remaining > 0:
+                self._claims[key] = remaining
+                return False
+            self._claims.pop(key, None)
+            return True
+
+    def cancel_request(self, key: ChunkKey) -> bool:
+        """Cancel an in-flight request for ``key``.
+
+        Pending requests are cancelled outright; a request that is already
+        running finishes its work but the chunk is discarded instead of being
+        made resident. Returns ``False`` when nothing was in flight.
+        """
+
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is None:
+                return False
+            if not future.cancel():
+                self._cancelled.add(key)
+            return True
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop the worker pool created by this service."""
+
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None and self._owns_executor:
+            executor.shutdown(wait=wait)
 
     def unload_chunk(self, key: ChunkKey) -> Chunk:
         """Transition a chunk into the unloaded state and evict its payload."""
 
-        chunk = self._chunks.get(key)
-        if chunk is None:
-            raise ChunkLifecycleError(f"Chunk {key} is not loaded")
+        with self._lock:
+            chunk = self._chunks.get(key)
+            if chunk is None:
+                raise ChunkLifecycleError(f"Chunk {key} is not loaded")
 
-        chunk.mark_unloaded()
-        if self._cache is not None:
+            chunk.mark_unloaded()
+            self.spatial_index.remove(key)
+            if self.residency is not None:
+                # Unloaded entries carry no payload; drop them so the map stays bounded.
+                self.residency.discard(key)
+                del self._chunks[key]
+                self.residency.stats.drops += 1
+        # In read-through mode the cache is the backing store, so the persisted
+        # copy is kept around for the next request.
+        if self._cache is not None and not self._read_through:
             if hasattr(self._cache, "evict"):
                 self._cache.evict(key)
             elif key in self._cache:  # Assumes dict-like behavior
                 del self._cache[key]
         return chunk
 
+    def meshes_for(self, chunk: Chunk) -> List[dict]:
+        """Resolve a chunk's ``mesh_ids`` against the shared mesh pool."""
+
+        mesh_ids = chunk.payload.get("mesh_ids", [])
+        if not mesh_ids:
+            return []
+        if self.mesh_pool is None:
+            raise ChunkLifecycleError(f"Chunk {chunk.key} references meshes but no mesh pool is attached")
+        return self.mesh_pool.resolve(mesh_ids)
+
+    def get_chunk(self, key: ChunkKey) -> Optional[Chunk]:
+        """Return the resident chunk for ``key`` without loading it."""
+
+        with self._lock:
+            chunk = self._chunks.get(key)
+            return chunk if chunk is not None and chunk.state == ChunkState.LOADED else None
+
+    def is_loaded(self, key: ChunkKey) -> bool:
+        """Return whether ``key`` is resident without copying the chunk map."""
+
+        with self._lock:
+            chunk = self._chunks.get(key)
+            return chunk is not None and chunk.state == ChunkState.LOADED
+
     def get_loaded_chunks(self) -> Dict[ChunkKey, Chunk]:
         """Return a copy of the loaded chunk map for inspection/testing."""
 
-        return dict(self._chunks)
+        with self._lock:
+            return dict(self._chunks)
+
+    def _begin_request(self, key: ChunkKey) -> Tuple["Future[Chunk]", bool]:
+        """Return the future serving ``key`` and whether the caller must run it."""
+
+        with self._lock:
+            chunk = self._chunks.get(key)
+            if chunk and chunk.state == ChunkState.LOADED:
+                if self.residency is not None:
+                    self.residency.record_hit(key)
+                if self.metrics is not None:
+                    self.metrics.increment("chunk_requests_total", outcome="resident")
+                future: "Future[Chunk]" = Future()
+                future.set_result(chunk)
+                return future, False
+
+            inflight = self._inflight.get(key)
+            if inflight is not None:
+                if self.metrics is not None:
+                    self.metrics.increment("chunk_requests_total", outcome="coalesced")
+                return inflight, False
+
+            if self.residency is not None:
+                self.residency.record_miss()
+            if self.metrics is not None:
+                self.metrics.increment("chunk_requests_total", outcome="load")
+            future = Future()
+            self._inflight[key] = future
+            self._cancelled.discard(key)
+            future.add_done_callback(lambda _done, key=key: self._finish_request(key, _done))
+            return future, True
+
+    def _run_request(self, key: ChunkKey, future: "Future[Chunk]") -> None:
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            chunk = self._load_chunk(key)
+        except BaseException as exc:
+            future.set_exception(exc)
+            return
+
+        spilled: List[Chunk] = []
+        with self._lock:
+            if key in self._cancelled:
+                future.set_exception(CancelledError(f"Request for chunk {key} was cancelled"))
+                return
+            self._chunks[key] = chunk
+            self.spatial_index.add(key)
+            if self.residency is not None:
+                self.residency.admit(chunk)
+                spilled = self._enforce_budget(protect=key)
+        future.set_result(chunk)
+        self._spill(spilled)
+
+    def _finish_request(self, key: ChunkKey, future: "Future[Chunk]") -> None:
+        with self._lock:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+                self._cancelled.discard(key)
+
+    def _get_executor(self) -> Executor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self._max_workers,
+                    thread_name_prefix="chunk-stream",
+                )
+            return self._executor
+
+    def _load_chunk(self, key: ChunkKey) -> Chunk:
+        metrics = self.metrics
+        packed = self._read_from_packs(key)
+        if packed is not None:
+            if metrics is not None:
+                metrics.increment("chunk_pack_hits_total")
+            return packed
+        if self._read_through and self._cache is not None:
+            if metrics is None:
+                cached = self._read_from_cache(key, key.seed() if self._deterministic else None)
+            else:
+                start = time.perf_counter()
+                cached = self._read_from_cache(key, key.seed() if self._deterministic else None)
+                metrics.record_span("chunk_cache_read_seconds", start, time.perf_counter() - start)
+                metrics.increment("chunk_cache_lookups_total", result="miss" if cached is None else "hit")
+            if cached is not None:
+                return cached
+
+        start = time.perf_counter() if metrics is not None else 0.0
+        chunk = self._aggregate_from_children(key) if self._lod_pyramid else None
+        if chunk is None:
+            chunk = self.generate_chunk(key)
+        if metrics is not None:
+            metrics.record_span("chunk_generate_seconds", start, time.perf_counter() - start)
+        if self._cache is not None:
+            self._queue_write(key, partial(self._write_to_cache, chunk))
+        return chunk
+
+    def _read_from_packs(self, key: ChunkKey) -> Optional[Chunk]:
+        with self._lock:
+            packs = list(self._packs)
+            if not packs:
+                return None
+            self._pack_readers += 1
+        try:
+            for pack in packs:
+                packed = self._read_from_cache(key, key.seed() if self._deterministic else None, source=pack)
+                if packed is not None:
+                    return packed
+            return None
+        finally:
+            with self._lock:
+                self._pack_readers -= 1
+                if not self._pack_readers:
+                    self._packs_idle.notify_all()
+
+    def _aggregate_from_children(self, key: ChunkKey) -> Optional[Chunk]:
+        """Build ``key`` from its children if all four are available."""
+
+        children: List[Chunk] = []
+        for child_key in key.children():
+            child = self.get_chunk(child_key)
+            if child is None and self._read_through and self._cache is not None:
+                child = self._read_from_cache(child_key, child_key.seed() if self._deterministic else None)
+            if child is None:
+                return None
+            children.append(child)
+        if not children:
+            return None
+        seed = key.seed() if self._deterministic else None
+        chunk = aggregate_chunk(key, children, self.FEATURES_PER_CHUNK, self.GENERATOR_VERSION, seed)
+        if self._compact_features:
+            chunk.payload["features"] = compact_features(chunk.payload["features"], self.BIOME_OPTIONS)
+        if self.heightfield is not None:
+            self._attach_heightfield(chunk, self.heightfield.generate(key))
+        return chunk
+
+    def _enforce_budget(self, protect: ChunkKey) -> List[Chunk]:
+        """Drop least-recently-used chunks until the budget fits.
+
+        Called with the lock held; returns the dropped chunks so the caller
+        can ``_spill`` them once it has released the lock.
+        """
+
+        dropped: List[Chunk] = []
+        for victim in self.residency.victims(protect=protect):
+            dropped.append(self._chunks.pop(victim))
+            self.spatial_index.remove(victim)
+            self.residency.discard(victim)
+            self.residency.stats.evictions += 1
+        return dropped if self._cache is not None else []
+
+    def _spill(self, chunks: List[Chunk]) -> None:
+        """Write evicted chunks the cache does not hold yet."""
+
+        for chunk in chunks:
+            if not self._is_persisted(chunk.key):
+                self._queue_write(chunk.key, partial(self._spill_chunk, chunk))
+
+    def _spill_chunk(self, chunk: Chunk) -> None:
+        if self._write_to_cache(chunk):
+            with self._lock:
+                self.residency.stats.spills += 1
+
+    def _queue_write(self, key: ChunkKey, write: Callable[[], object]) -> None:
+        """Run a cache write now, or queue it as write work on the scheduler."""
+
+        if self.scheduler is None:
+            write()
+        else:
+            self.scheduler.submit(WORK_WRITE, key, write)
+
+    def _is_persisted(self, key: ChunkKey) -> bool:
+        if hasattr(self._cache, "contains"):
+            return self._cache.contains(key)
+        return key in self._cache
+
+    def _read_from_cache(self, key: ChunkKey, seed: Optional[int], source: Optional[object] = None) -> Optional[Chunk]:
+        """Rebuild a chunk from the cache (or another ``source``) if a valid entry exists."""
+
+        source = self._cache if source is None else source
+        if seed is None or not hasattr(source, "load"):
+            return None
+        try:
+            document: Dict[str, Any] = source.load(key)
+        except (FileNotFoundError, ValueError, KeyError):
+            return None
+        if not self._is_valid_entry(document, seed, source):
+            return None
+        heights = document["payload"].get("heightfield")
+        if isinstance(heights, list):  # Debug JSON codec.
+            document["payload"]["heightfield"] = np.asarray(heights, dtype=HEIGHTFIELD_DTYPE)
+        if self._compact_features and "features" in document["payload"]:
+            document["payload"]["features"] = compact_features(document["payload"]["features"], self.BIOME_OPTIONS)
+        chunk = Chunk(key=key, metadata=document["metadata"], payload=document["payload"])
+        chunk.mark_loaded()
+        return chunk
+
+    def _is_valid_entry(self, document: Dict[str, Any], seed: int, source: Optional[object] = None) -> bool:
+        expected_format = getattr(self._cache if source is None else source, "FORMAT_VERSION", None)
+        if expected_format is not None and document.get("format_version") != expected_format:
+            return False
+        payload = document.get("payload") or {}
+        if payload.get("lod_source") == "aggregated":
+            return False  # Depends on which children were loaded; never trusted from disk.
+        if self.heightfield is not None and payload.get("heightfield_id") != self.heightfield.fingerprint:
+            return False
+        return (
+            payload.get("seed") == seed
+            and payload.get("generator_version") == self.GENERATOR_VERSION
+            and "metadata" in document
+        )
+
+    def _attach_heightfield(self, chunk: Chunk, heights: Any) -> None:
+        chunk.payload["heightfield"] = heights
+        chunk.payload["heightfield_id"] = self.heightfield.fingerprint
+
+    def _write_to_cache(self, chunk: Chunk) -> bool:
+        """Store ``chunk``; returns ``False`` for chunks that are never persisted."""
+
+        if chunk.payload.get("lod_source") == "aggregated":
+            # Aggregates are rebuilt from their persisted children instead.
+            return False
+        if self.metrics is not None:
+            with self.metrics.span("chunk_cache_write_seconds"):
+                self._store(chunk)
+            return True
+        self._store(chunk)
+        return True
 
-    def _write_to_cache(self, chunk: Chunk) -> None:
+    def _store(self, chunk: Chunk) -> None:
         if hasattr(self._cache, "store"):
             self._cache.store(chunk)
         else:
             self._cache[chunk.key] = chunk.payload
 
     @staticmethod
-    def _generate_features(generator: random.Random) -> List[dict]:
+    def _generate_features(generator: CounterRNG) -> List[dict]:
         """Generate synthetic feature data using a deterministic RNG."""
 
-        biome_options = ["tundra", "temperate", "desert", "forest", "alpine"]
+        biome_options = ChunkStreamingService.BIOME_OPTIONS
         features: List[dict] = []
-        for feature_id in range(5):
+        for feature_id in range(ChunkStreamingService.FEATURES_PER_CHUNK):
             features.append(
                 {
                     "id": feature_id,
@@ -94,4 +669,4 @@ class ChunkStreamingService:
         return features
 
 
-__all__ = ["ChunkStreamingService", "ChunkLifecycleError"]
+__all__ = ["ChunkStreamingService", "ChunkLifecycleError", "GeneratorConfig"]
@@ -0,0 +1,112 @@
+"""Column-oriented storage for chunk features."""
+from __future__ import annotations
+
+import sys
+from array import array
+from typing import Any, Dict, Iterator, List, Sequence, Tuple, Union
+
+# The record layout ``FeatureColumns`` can hold.
+FEATURE_FIELDS = ("id", "biome", "resource_density")
+
+
+class FeatureColumns(Sequence[Dict[str, Any]]):
+    """Chunk features held in typed arrays instead of a list of dicts.
+
+    Reads like the list of ``{"id", "biome", "resource_density"}`` dicts it
+    replaces: indexing and iteration build dicts on demand, and it compares
+    equal to that list. Biomes are stored as byte codes into ``vocabulary``,
+    a tuple normally shared by every chunk.
+    """
+
+    __slots__ = ("ids", "biome_codes", "densities", "vocabulary")
+
+    def __init__(self, ids: array, biome_codes: array, densities: array, vocabulary: Tuple[str, ...]) -> None:
+        if not len(ids) == len(biome_codes) == len(densities):
+            raise ValueError("Feature columns must have the same length")
+        self.ids = ids
+        self.biome_codes = biome_codes
+        self.densities = densities
+        self.vocabulary = vocabulary
+
+    @classmethod
+    def from_records(cls, records: Sequence[Dict[str, Any]], vocabulary: Sequence[str] = ()) -> "FeatureColumns":
+        """Pack feature dicts; raises ``ValueError`` if one does not fit the layout."""
+
+        names = list(vocabulary)
+        codes = {name: code for code, name in enumerate(names)}
+        ids = array("i")
+        biome_codes = array("B")
+        densities = array("d")
+        try:
+            for record in records:
+                if len(record) != len(FEATURE_FIELDS):
+                    raise ValueError(f"Feature {record!r} does not match {FEATURE_FIELDS}")
+                biome = record["biome"]
+                code = codes.get(biome)
+                if code is None:
+                    code = codes[biome] = len(names)
+                    names.append(biome)
+                ids.append(record["id"])
+                biome_codes.append(code)
+                densities.append(record["resource_density"])
+        except (KeyError, TypeError, OverflowError) as exc:
+            raise ValueError(f"Features do not match {FEATURE_FIELDS}") from exc
+        shared = tuple(vocabulary)
+        return cls(ids, biome_codes, densities, shared if len(names) == len(shared) else tuple(names))
+
+    def to_records(self) -> List[Dict[str, Any]]:
+        return list(self)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[Dict[str, Any], List[Dict[str, Any]]]:
+        if isinstance(index, slice):
+            return [self[position] for position in range(*index.indices(len(self)))]
+        return {
+            "id": self.ids[index],
+            "biome": self.vocabulary[self.biome_codes[index]],
+            "resource_density": self.densities[index],
+        }
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        vocabulary = self.vocabulary
+        for feature_id, code, density in zip(self.ids, self.biome_codes, self.densities):
+            yield {"id": feature_id, "biome": vocabulary[code], "resource_density": density}
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, (FeatureColumns, list)):
+            return self.to_records() == list(other)
+        return NotImplemented
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return f"FeatureColumns({self.to_records()!r})"
+
+    def __sizeof__(self) -> int:
+        # The vocabulary is shared between chunks and not charged here.
+        columns = (self.ids, self.biome_codes, self.densities)
+        return object.__sizeof__(self) + sum(sys.getsizeof(column) for column in columns)
+
+
+def compact_features(records: Any, vocabulary: Sequence[str] = ()) -> Any:
+    """``FeatureColumns`` for ``records`` when they fit the layout, else ``records`` unchanged."""
+
+    if isinstance(records, FeatureColumns) or not isinstance(records, list):
+        return records
+    try:
+        return FeatureColumns.from_records(records, vocabulary)
+    except ValueError:
+        return records
+
+
+def json_default(value: Any) -> Any:
+    """``json.dumps`` hook that writes feature columns as plain records."""
+
+    if isinstance(value, FeatureColumns):
+        return value.to_records()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+__all__ = ["FEATURE_FIELDS", "FeatureColumns", "compact_features", "json_default"]
@@ -0,0 +1,148 @@
+"""Seamless per-chunk heightfields from vectorized fractal value noise.
+
+Heights are a pure function of world position. Samples sit on a global
+integer lattice with ``cells`` steps per level-0 tile, aligned with tile
+edges (``ChunkKey.bounds``), and a level ``L`` tile takes every
+``2**L``-th lattice point, so neighbouring tiles share their
+edge samples bit for bit and a coarse tile's samples equal the finer tiles'
+samples at the same positions.
+"""
+from __future__ import annotations
+
+from typing import Iterable, List, Tuple
+
+from .chunk import ChunkKey
+from .rng import GAMMA, lattice_uniforms, mix64, np
+
+# Raw section layout: little-endian float32, row major, square.
+HEIGHTFIELD_DTYPE = "<f4"
+
+
+class HeightfieldGenerator:
+    """Generates ``(cells + 1) x (cells + 1)`` float32 height grids per chunk.
+
+    Grids are vertex grids: rows run north from the tile's southern edge and
+    columns east from its western edge, so ``grid[0, 0]`` sits at
+    ``key.bounds()[:2]``, ``grid[-1, -1]`` at ``key.bounds()[2:]``, and the
+    last row/column is shared with the northern and eastern neighbours. The
+    sample count is fixed while the spacing doubles with each
+    ``level_of_detail``.
+
+    Heights are fractal value noise in ``[0, amplitude)``: ``octaves`` layers,
+    the broadest repeating every ``feature_size`` level-0 tiles, each next one
+    half the size and ``persistence`` times the weight. Octaves finer than a
+    coarse tile's spacing are point-sampled rather than filtered, which is
+    what keeps coarse samples equal to fine ones.
+    """
+
+    def __init__(
+        self,
+        seed: int = 0,
+        cells: int = 32,
+        octaves: int = 5,
+        feature_size: int = 8,
+        amplitude: float = 1250.0,
+        persistence: float = 0.5,
+    ) -> None:
+        if np is None:
+            raise RuntimeError("Heightfield generation requires NumPy")
+        if cells < 2 or cells & (cells - 1):
+            # Tile edges sit half a level-0 tile off the integer grid.
+            raise ValueError("cells must be a power of two, at least 2")
+        if octaves < 1:
+            raise ValueError("octaves must be at least 1")
+        if feature_size < 1 or (feature_size * cells) >> (octaves - 1) < 1:
+            raise ValueError("feature_size is too small for the number of octaves")
+        self.seed = seed
+        self.cells = cells
+        self.octaves = octaves
+        self.feature_size = feature_size
+        self.amplitude = amplitude
+        self.persistence = persistence
+        self._periods = [(feature_size * cells) >> octave for octave in range(octaves)]
+        self._salts = [mix64(seed + (octave + 1) * GAMMA) for octave in range(octaves)]
+        weights = [persistence**octave for octave in range(octaves)]
+        self._weights = [amplitude * weight / sum(weights) for weight in weights]
+
+    @property
+    def side(self) -> int:
+        return self.cells + 1
+
+    @property
+    def fingerprint(self) -> str:
+        """Identifies the parameters; cached grids from other settings are stale."""
+
+        return (
+            f"value-noise/2:{self.seed}:{self.cells}:{self.octaves}:"
+            f"{self.feature_size}:{self.amplitude!r}:{self.persistence!r}"
+        )
+
+    def generate(self, key: ChunkKey) -> "np.ndarray":
+        return self.generate_many([key])[0]
+
+    def generate_many(self, keys: Iterable[ChunkKey]) -> "np.ndarray":
+        """Grids for every key in one vectorized pass, shaped ``(len(keys), side, side)``."""
+
+        ys, xs = self._lattice(list(keys))
+        return self._sample(ys[:, :, None], xs[:, None, :])
+
+    def _lattice(self, keys: List[ChunkKey]) -> Tuple["np.ndarray", "np.ndarray"]:
+        """Lattice rows and columns sampled for each key, shaped ``(len(keys), side)``."""
+
+        steps = np.arange(self.side, dtype=np.int64)
+        latitudes = np.array([key.latitude for key in keys], dtype=np.int64).reshape(-1, 1)
+        longitudes = np.array([key.longitude for key in keys], dtype=np.int64).reshape(-1, 1)
+        lods = np.array([key.level_of_detail for key in keys], dtype=np.int64).reshape(-1, 1)
+        # Level-0 tiles are centred on integer coordinates, so their edges
+        # are half a tile (``cells // 2`` lattice steps) below them.
+        half = self.cells // 2
+        ys = ((latitudes * self.cells + steps) << lods) - half
+        xs = ((longitudes * self.cells + steps) << lods) - half
+        return ys, xs
+
+    def _sample(self, ys: "np.ndarray", xs: "np.ndarray") -> "np.ndarray":
+        """Fractal value noise at integer lattice positions (broadcast)."""
+
+        heights = np.zeros(np.broadcast_shapes(ys.shape, xs.shape), dtype=np.float64)
+        for period, salt, weight in zip(self._periods, self._salts, self._weights):
+            x0 = xs // period
+            y0 = ys // period
+            fx = _smoothstep((xs - x0 * period) / period)
+            fy = _smoothstep((ys - y0 * period) / period)
+            v00 = lattice_uniforms(x0, y0, salt)
+            v10 = lattice_uniforms(x0 + 1, y0, salt)
+            v01 = lattice_uniforms(x0, y0 + 1, salt)
+            v11 = lattice_uniforms(x0 + 1, y0 + 1, salt)
+            south = v00 + (v10 - v00) * fx
+            north = v01 + (v11 - v01) * fx
+            heights += weight * (south + (north - south) * fy)
+        return heights.astype(HEIGHTFIELD_DTYPE)
+
+
+def heightfield_mip(heights: "np.ndarray", level: int) -> "np.ndarray":
+    """Every ``2**level``-th sample of a vertex grid (a view, not a copy).
+
+    Matches the grid a generator with ``cells >> level`` would produce, so
+    mips keep seams exact.
+    """
+
+    step = 1 << level
+    if level < 0 or (heights.shape[-1] - 1) % step:
+        raise ValueError(f"Grid of side {heights.shape[-1]} has no mip level {level}")
+    return heights[..., ::step, ::step]
+
+
+def heightfield_mips(heights: "np.ndarray") -> List["np.ndarray"]:
+    """The full chain from ``heights`` down to a single cell."""
+
+    mips = [heights]
+    while mips[-1].shape[-1] > 2 and (mips[-1].shape[-1] - 1) % 2 == 0:
+        mips.append(heightfield_mip(mips[-1], 1))
+    return mips
+
+
+def _smoothstep(t: "np.ndarray") -> "np.ndarray":
+    return t * t * (3.0 - 2.0 * t)
+
+
+__all__ = ["HEIGHTFIELD_DTYPE", "HeightfieldGenerator", "heightfield_mip", "heightfield_mips"]
@@ -0,0 +1,127 @@
+"""Hierarchical level-of-detail helpers: pyramid aggregation and ring selection."""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Tuple
+
+from .chunk import Chunk, ChunkKey
+
+
+def lod0_extent(key: ChunkKey) -> Tuple[int, int, int, int]:
+    """Inclusive level-0 tile range ``(lat_min, lat_max, lon_min, lon_max)`` covered by ``key``."""
+
+    shift = key.level_of_detail
+    return (
+        key.latitude << shift,
+        ((key.latitude + 1) << shift) - 1,
+        key.longitude << shift,
+        ((key.longitude + 1) << shift) - 1,
+    )
+
+
+def lod0_distance(center: ChunkKey, key: ChunkKey) -> int:
+    """Chebyshev distance, in level-0 tiles, from ``center`` to the nearest tile of ``key``."""
+
+    lat_min, lat_max, lon_min, lon_max = lod0_extent(key)
+    dlat = max(lat_min - center.latitude, 0, center.latitude - lat_max)
+    dlon = max(lon_min - center.longitude, 0, center.longitude - lon_max)
+    return max(dlat, dlon)
+
+
+def aggregate_chunk(
+    key: ChunkKey,
+    children: Sequence[Chunk],
+    feature_count: int,
+    generator_version: int,
+    seed: Optional[int],
+) -> Chunk:
+    """Build a coarse chunk from its loaded children.
+
+    Metadata is averaged; the coarse tile keeps the ``feature_count`` richest
+    features (by ``resource_density``) across all children, renumbered.
+    """
+
+    candidates = [
+        feature
+        for child in sorted(children, key=lambda chunk: (chunk.key.latitude, chunk.key.longitude))
+        for feature in child.payload.get("features", [])
+    ]
+    richest = sorted(candidates, key=lambda feature: -feature["resource_density"])[:feature_count]
+    chunk = Chunk(key=key)
+    chunk.payload = {
+        "features": [{**feature, "id": feature_id} for feature_id, feature in enumerate(richest)],
+        "seed": seed,
+        "generator_version": generator_version,
+        "lod_source": "aggregated",
+    }
+    chunk.metadata = {
+        "elevation": round(sum(child.metadata["elevation"] for child in children) / len(children), 3),
+        "temperature": round(sum(child.metadata["temperature"] for child in children) / len(children), 2),
+    }
+    chunk.mark_loaded()
+    return chunk
+
+
+@dataclass(frozen=True)
+class LODRing:
+    """Tiles up to ``radius`` level-0 tiles away are served at ``level_of_detail``."""
+
+    radius: int
+    level_of_detail: int
+
+
+class LODSelector:
+    """Assigns LOD levels around the player by concentric distance rings.
+
+    Rings must get coarser as they get wider. Selection starts from the
+    coarsest tiles covering the outermost ring and refines any tile that
+    reaches into a finer ring, so the result tiles the area without overlap.
+    """
+
+    def __init__(self, rings: Sequence[LODRing]) -> None:
+        if not rings:
+            raise ValueError("At least one LOD ring is required")
+        ordered = sorted(rings, key=lambda ring: ring.radius)
+        for inner, outer in zip(ordered, ordered[1:]):
+            if outer.level_of_detail <= inner.level_of_detail:
+                raise ValueError("Outer LOD rings must use coarser levels than inner rings")
+        self.rings: Tuple[LODRing, ...] = tuple(ordered)
+
+    def level_for_distance(self, distance: int) -> Optional[int]:
+        for ring in self.rings:
+            if distance <= ring.radius:
+                return ring.level_of_detail
+        return None
+
+    def select(self, center: ChunkKey) -> List[ChunkKey]:
+        """Keys covering every tile within the outer ring, nearest first.
+
+        ``center`` must be a level-0 key.
+        """
+
+        outer = self.rings[-1]
+        coarse = outer.level_of_detail
+        reach = outer.radius
+        lat_lo, lat_hi = (center.latitude - reach) >> coarse, (center.latitude + reach) >> coarse
+        lon_lo, lon_hi = (center.longitude - reach) >> coarse, (center.longitude + reach) >> coarse
+        pending = [
+            ChunkKey(latitude=lat, longitude=lon, level_of_detail=coarse)
+            for lat in range(lat_lo, lat_hi + 1)
+            for lon in range(lon_lo, lon_hi + 1)
+        ]
+        selected: List[ChunkKey] = []
+        while pending:
+            key = pending.pop()
+            distance = lod0_distance(center, key)
+            wanted = self.level_for_distance(distance)
+            if wanted is None:
+                continue
+            if wanted < key.level_of_detail:
+                pending.extend(key.children())
+            else:
+                selected.append(key)
+        selected.sort(key=lambda key: (lod0_distance(center, key), key.level_of_detail, key.latitude, key.longitude))
+        return selected
+
+
+__all__ = ["LODRing", "LODSelector", "aggregate_chunk", "lod0_distance", "lod0_extent"]
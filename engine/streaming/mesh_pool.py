@@ -0,0 +1,201 @@
+"""Region-level, content-addressed mesh storage shared across chunks."""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Sequence, Set, TextIO, Tuple
+
+Bounds = Tuple[float, float, float, float]
+Point = Sequence[float]
+
+MESH_POOL_VERSION = 1
+
+
+def mesh_id(mesh: dict) -> str:
+    """Stable content hash for a mesh dict."""
+
+    canonical = json.dumps(mesh, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:16]
+
+
+class MeshPool:
+    """Stores each distinct mesh once; chunks reference meshes by ID.
+
+    A pool created with ``MeshPool.lazy`` defers reading its file until the
+    first lookup, so attaching a large region pool to a service is free.
+    """
+
+    def __init__(self, meshes: Dict[str, dict] | None = None, path: Path | str | None = None) -> None:
+        self._path = Path(path) if path is not None else None
+        self._meshes: Dict[str, dict] | None = None
+        if meshes is not None or path is None:
+            self._meshes = dict(meshes or {})
+
+    @classmethod
+    def lazy(cls, path: Path | str) -> "MeshPool":
+        return cls(path=path)
+
+    def add(self, mesh: dict) -> str:
+        identifier = mesh_id(mesh)
+        self._loaded().setdefault(identifier, mesh)
+        return identifier
+
+    def get(self, identifier: str) -> dict:
+        return self._loaded()[identifier]
+
+    def resolve(self, identifiers: Iterable[str]) -> List[dict]:
+        """Return the pooled meshes for ``identifiers`` without copying them."""
+
+        meshes = self._loaded()
+        return [meshes[identifier] for identifier in identifiers]
+
+    def __contains__(self, identifier: object) -> bool:
+        return identifier in self._loaded()
+
+    def __len__(self) -> int:
+        return len(self._loaded())
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._loaded())
+
+    def save(self, path: Path | str) -> None:
+        with MeshPoolWriter(path) as writer:
+            for mesh in self._loaded().values():
+                writer.add(mesh)
+
+    @classmethod
+    def load(cls, path: Path | str) -> "MeshPool":
+        return cls(_read_pool(Path(path)))
+
+    def _loaded(self) -> Dict[str, dict]:
+        if self._meshes is None:
+            self._meshes = _read_pool(self._path)
+        return self._meshes
+
+
+class MeshPoolWriter:
+    """Streams meshes into a pool file without holding them in memory.
+
+    Only mesh IDs are retained (for de-duplication); the output is the same
+    document ``MeshPool.load`` reads. Like ``RegionPackWriter`` it writes a
+    temporary file that replaces ``path`` on ``close``; leaving the context
+    with an exception discards it and keeps the previous pool.
+    """
+
+    def __init__(self, path: Path | str) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.ids: Set[str] = set()
+        self._temp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+        self._handle: TextIO | None = self._temp_path.open("w", encoding="utf-8")
+        self._handle.write(f'{{"version":{MESH_POOL_VERSION},"meshes":{{')
+
+    def add(self, mesh: dict) -> str:
+        identifier = mesh_id(mesh)
+        if identifier not in self.ids:
+            if self.ids:
+                self._handle.write(",")
+            self._handle.write(json.dumps(identifier))
+            self._handle.write(":")
+            self._handle.write(json.dumps(mesh, separators=(",", ":")))
+            self.ids.add(identifier)
+        return identifier
+
+    def close(self) -> None:
+        if self._handle is not None:
+            self._handle.write("}}")
+            self._handle.close()
+            self._handle = None
+            os.replace(self._temp_path, self.path)
+
+    def abort(self) -> None:
+        """Discard the partial pool."""
+
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+        self._temp_path.unlink(missing_ok=True)
+
+    def __enter__(self) -> "MeshPoolWriter":
+        return self
+
+    def __exit__(self, exc_type: object, *exc_info: object) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+def _read_pool(path: Path) -> Dict[str, dict]:
+    with path.open("r", encoding="utf-8") as handle:
+        document = json.load(handle)
+    if document.get("version") != MESH_POOL_VERSION:
+        raise ValueError(f"Unsupported mesh pool version {document.get('version')!r}")
+    return document["meshes"]
+
+
+def footprint_bounds(footprint: Sequence[Point]) -> Bounds:
+    xs = [point[0] for point in footprint]
+    ys = [point[1] for point in footprint]
+    return min(xs), min(ys), max(xs), max(ys)
+
+
+def footprint_intersects(footprint: Sequence[Point], bounds: Bounds) -> bool:
+    """Exact polygon/rectangle overlap test (touching edges count)."""
+
+    min_x, min_y, max_x, max_y = bounds
+    f_min_x, f_min_y, f_max_x, f_max_y = footprint_bounds(footprint)
+    if f_max_x < min_x or f_min_x > max_x or f_max_y < min_y or f_min_y > max_y:
+        return False
+    for x, y in footprint:
+        if min_x <= x <= max_x and min_y <= y <= max_y:
+            return True
+    corners = [(min_x, min_y), (max_x, min_y), (max_x, max_y), (min_x, max_y)]
+    if any(_point_in_polygon(corner, footprint) for corner in corners):
+        return True
+    rect_edges = list(zip(corners, corners[1:] + corners[:1]))
+    count = len(footprint)
+    for index in range(count):
+        start, end = footprint[index], footprint[(index + 1) % count]
+        if any(_segments_intersect(start, end, a, b) for a, b in rect_edges):
+            return True
+    return False
+
+
+def _point_in_polygon(point: Point, polygon: Sequence[Point]) -> bool:
+    x, y = point
+    inside = False
+    count = len(polygon)
+    for index in range(count):
+        x1, y1 = polygon[index]
+        x2, y2 = polygon[(index + 1) % count]
+        if (y1 > y) != (y2 > y):
+            crossing = x1 + (y - y1) * (x2 - x1) / (y2 - y1)
+            if x < crossing:
+                inside = not inside
+    return inside
+
+
+def _orientation(a: Point, b: Point, c: Point) -> float:
+    return (b[0] - a[0]) * (c[1] - a[1]) - (b[1] - a[1]) * (c[0] - a[0])
+
+
+def _segments_intersect(p1: Point, p2: Point, q1: Point, q2: Point) -> bool:
+    d1 = _orientation(q1, q2, p1)
+    d2 = _orientation(q1, q2, p2)
+    d3 = _orientation(p1, p2, q1)
+    d4 = _orientation(p1, p2, q2)
+    if d1 == d2 == d3 == d4 == 0:
+        # Collinear: overlap only if the projections overlap on both axes.
+        return (
+            min(p1[0], p2[0]) <= max(q1[0], q2[0])
+            and min(q1[0], q2[0]) <= max(p1[0], p2[0])
+            and min(p1[1], p2[1]) <= max(q1[1], q2[1])
+            and min(q1[1], q2[1]) <= max(p1[1], p2[1])
+        )
+    return (d1 * d2 <= 0) and (d3 * d4 <= 0)
+
+
+__all__ = ["MeshPool", "MeshPoolWriter", "footprint_bounds", "footprint_intersects", "mesh_id"]
@@ -0,0 +1,29 @@
+"""Bit interleaving helpers for Morton (Z-order) codes."""
+from __future__ import annotations
+
+
+def spread_bits(value: int) -> int:
+    """Insert a zero bit between each of the low 32 bits of ``value``."""
+
+    value &= 0xFFFFFFFF
+    value = (value | (value << 16)) & 0x0000FFFF0000FFFF
+    value = (value | (value << 8)) & 0x00FF00FF00FF00FF
+    value = (value | (value << 4)) & 0x0F0F0F0F0F0F0F0F
+    value = (value | (value << 2)) & 0x3333333333333333
+    value = (value | (value << 1)) & 0x5555555555555555
+    return value
+
+
+def compact_bits(value: int) -> int:
+    """Inverse of ``spread_bits``: gather the even bits of ``value``."""
+
+    value &= 0x5555555555555555
+    value = (value | (value >> 1)) & 0x3333333333333333
+    value = (value | (value >> 2)) & 0x0F0F0F0F0F0F0F0F
+    value = (value | (value >> 4)) & 0x00FF00FF00FF00FF
+    value = (value | (value >> 8)) & 0x0000FFFF0000FFFF
+    value = (value | (value >> 16)) & 0x00000000FFFFFFFF
+    return value
+
+
+__all__ = ["compact_bits", "spread_bits"]
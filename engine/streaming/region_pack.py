@@ -0,0 +1,240 @@
+"""Single-file region packs: a sorted key index over contiguous chunk blobs.
+
+Layout (little endian)::
+
+    header  magic "OWRP" | version u16 | flags u16 | entry count u32 | index offset u64
+    blobs   encoded chunk containers (see ``chunk_format``), back to back
+    index   one entry per chunk sorted by key: latitude i32 | longitude i32 |
+            level_of_detail i32 | blob offset u64 | blob length u64
+
+The index is written last so packs can be produced in one streaming pass.
+Readers map the file once and binary-search the index in place, so opening
+a pack costs a single ``open`` regardless of how many chunks it holds.
+"""
+from __future__ import annotations
+
+import mmap
+import os
+import struct
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, Tuple
+
+from .chunk import Chunk, ChunkKey
+from .chunk_format import FORMAT_VERSION, ChunkFile, ChunkFormatError, encode_chunk
+
+PACK_MAGIC = b"OWRP"
+PACK_VERSION = 1
+
+_PACK_HEADER = struct.Struct("<4sHHIQ")
+_PACK_ENTRY = struct.Struct("<iiiQQ")
+
+
+class RegionPackWriter:
+    """Streams chunk blobs into a pack and writes the index on ``close``.
+
+    Output goes to a temporary file that replaces ``path`` atomically once the
+    index is complete, so readers never observe a half-written pack.
+    """
+
+    def __init__(self, path: Path | str) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._temp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+        self._handle = self._temp_path.open("wb")
+        self._handle.write(b"\0" * _PACK_HEADER.size)
+        self._offset = _PACK_HEADER.size
+        self._entries: Dict[Tuple[int, int, int], Tuple[int, int]] = {}
+
+    def add(self, chunk: Chunk, compress: bool | Iterable[str] = False) -> None:
+        self.add_blob(chunk.key, encode_chunk(chunk, compress=compress))
+
+    def add_blob(self, key: ChunkKey, blob: bytes) -> None:
+        """Append an already encoded chunk container for ``key``."""
+
+        slot = _slot(key)
+        if slot in self._entries:
+            raise ValueError(f"Chunk {key} was already added to the pack")
+        self._handle.write(blob)
+        self._entries[slot] = (self._offset, len(blob))
+        self._offset += len(blob)
+
+    def close(self) -> None:
+        if self._handle.closed:
+            return
+        index_offset = self._offset
+        for slot in sorted(self._entries):
+            offset, length = self._entries[slot]
+            self._handle.write(_PACK_ENTRY.pack(*slot, offset, length))
+        self._handle.seek(0)
+        self._handle.write(_PACK_HEADER.pack(PACK_MAGIC, PACK_VERSION, 0, len(self._entries), index_offset))
+        self._handle.close()
+        os.replace(self._temp_path, self.path)
+
+    def abort(self) -> None:
+        """Discard the partial pack."""
+
+        if not self._handle.closed:
+            self._handle.close()
+        self._temp_path.unlink(missing_ok=True)
+
+    def __enter__(self) -> "RegionPackWriter":
+        return self
+
+    def __exit__(self, exc_type: object, *exc_info: object) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+class RegionPack:
+    """Read-only, memory-mapped view of a region pack.
+
+    Exposes the read side of ``ChunkCache`` (``load``, ``load_metadata``,
+    ``contains``) so the streaming service can serve from it.
+    """
+
+    FORMAT_VERSION = FORMAT_VERSION
+
+    def __init__(self, buffer: mmap.mmap, path: Optional[Path] = None) -> None:
+        self.path = path
+        self._map = buffer
+        self._view = memoryview(buffer)
+        try:
+            self._count, self._index_offset = self._parse_header()
+        except ChunkFormatError:
+            self._view.release()
+            raise
+
+    @classmethod
+    def open(cls, path: Path | str) -> "RegionPack":
+        path = Path(path)
+        with path.open("rb") as handle:
+            try:
+                mapped = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError as exc:
+                raise ChunkFormatError(f"{path} is empty") from exc
+        try:
+            return cls(mapped, path=path)
+        except ChunkFormatError:
+            mapped.close()
+            raise
+
+    def close(self) -> None:
+        if self._map.closed:
+            return
+        self._view.release()
+        self._map.close()
+
+    def __enter__(self) -> "RegionPack":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __contains__(self, key: object) -> bool:
+        return isinstance(key, ChunkKey) and self._find(key) is not None
+
+    def contains(self, key: ChunkKey) -> bool:
+        return self._find(key) is not None
+
+    def keys(self) -> Iterator[ChunkKey]:
+        """Packed keys in index order (latitude, longitude, level of detail)."""
+
+        for position in range(self._count):
+            latitude, longitude, lod, _offset, _length = self._entry(position)
+            yield ChunkKey(latitude=latitude, longitude=longitude, level_of_detail=lod)
+
+    def open_chunk(self, key: ChunkKey) -> ChunkFile:
+        """Zero-copy ``ChunkFile`` over the packed blob; close it before the pack."""
+
+        location = self._find(key)
+        if location is None:
+            raise KeyError(key)
+        offset, length = location
+        return ChunkFile(self._view[offset : offset + length])
+
+    def blob(self, key: ChunkKey) -> bytes:
+        """Copy of the encoded chunk container packed for ``key``."""
+
+        location = self._find(key)
+        if location is None:
+            raise KeyError(key)
+        offset, length = location
+        return bytes(self._view[offset : offset + length])
+
+    def load(self, key: ChunkKey) -> Dict[str, Any]:
+        with self.open_chunk(key) as chunk_file:
+            return chunk_file.to_document()
+
+    def load_metadata(self, key: ChunkKey) -> Dict[str, Any]:
+        with self.open_chunk(key) as chunk_file:
+            return chunk_file.metadata
+
+    def _find(self, key: ChunkKey) -> Optional[Tuple[int, int]]:
+        target = _slot(key)
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            latitude, longitude, lod, offset, length = self._entry(middle)
+            slot = (latitude, longitude, lod)
+            if slot == target:
+                return offset, length
+            if slot < target:
+                low = middle + 1
+            else:
+                high = middle
+        return None
+
+    def _entry(self, position: int) -> Tuple[int, int, int, int, int]:
+        return _PACK_ENTRY.unpack_from(self._view, self._index_offset + position * _PACK_ENTRY.size)
+
+    def _parse_header(self) -> Tuple[int, int]:
+        size = len(self._view)
+        if size < _PACK_HEADER.size:
+            raise ChunkFormatError("Region pack is truncated")
+        magic, version, _flags, count, index_offset = _PACK_HEADER.unpack_from(self._view, 0)
+        if magic != PACK_MAGIC:
+            raise ChunkFormatError("Not a region pack")
+        if version != PACK_VERSION:
+            raise ChunkFormatError(f"Unsupported region pack version {version}")
+        if index_offset + count * _PACK_ENTRY.size > size:
+            raise ChunkFormatError("Region pack index extends past end of file")
+        return count, index_offset
+
+
+def write_region_pack(
+    path: Path | str,
+    cache: Any,
+    keys: Iterable[ChunkKey],
+    rebuild: Optional[Callable[[ChunkKey], Chunk]] = None,
+) -> int:
+    """Pack the cached chunks for ``keys`` into ``path``; returns the chunk count.
+
+    ``cache`` is a ``ChunkCache``; binary entries are copied byte for byte.
+    Keys the cache no longer holds (evicted by its quota, say) are produced
+    by ``rebuild`` and encoded with the cache's compression instead.
+    """
+
+    written = 0
+    with RegionPackWriter(path) as writer:
+        for key in dict.fromkeys(keys):
+            try:
+                blob = cache.encoded(key)
+            except (KeyError, FileNotFoundError):
+                if rebuild is None:
+                    raise
+                blob = encode_chunk(rebuild(key), compress=getattr(cache, "compress", False))
+            writer.add_blob(key, blob)
+            written += 1
+    return written
+
+
+def _slot(key: ChunkKey) -> Tuple[int, int, int]:
+    return key.latitude, key.longitude, key.level_of_detail
+
+
+__all__ = ["PACK_VERSION", "RegionPack", "RegionPackWriter", "write_region_pack"]
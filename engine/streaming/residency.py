@@ -0,0 +1,130 @@
+"""Bounded in-memory residency tracking for streamed chunks."""
+from __future__ import annotations
+
+import sys
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from .chunk import Chunk, ChunkKey
+
+
+@dataclass
+class ResidencyStats:
+    """Counters describing how the residency budget is being used."""
+
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    spills: int = 0
+    drops: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def as_dict(self) -> Dict[str, float]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "spills": self.spills,
+            "drops": self.drops,
+            "hit_rate": round(self.hit_rate, 4),
+        }
+
+
+class ChunkResidencyManager:
+    """Tracks resident chunks in LRU order against a count and/or byte budget.
+
+    The manager only decides *what* to evict; the streaming service performs
+    the eviction so it can spill chunks to its cache first.
+    """
+
+    def __init__(self, max_chunks: Optional[int] = None, max_bytes: Optional[int] = None) -> None:
+        if max_chunks is not None and max_chunks < 1:
+            raise ValueError("max_chunks must be at least 1")
+        if max_bytes is not None and max_bytes < 1:
+            raise ValueError("max_bytes must be positive")
+        self.max_chunks = max_chunks
+        self.max_bytes = max_bytes
+        self.stats = ResidencyStats()
+        self._sizes: "OrderedDict[ChunkKey, int]" = OrderedDict()
+        self._resident_bytes = 0
+
+    @property
+    def resident_chunks(self) -> int:
+        return len(self._sizes)
+
+    @property
+    def resident_bytes(self) -> int:
+        return self._resident_bytes
+
+    def record_hit(self, key: ChunkKey) -> None:
+        self.stats.hits += 1
+        if key in self._sizes:
+            self._sizes.move_to_end(key)
+
+    def record_miss(self) -> None:
+        self.stats.misses += 1
+
+    def admit(self, chunk: Chunk) -> None:
+        """Track a newly loaded chunk as the most recently used entry."""
+
+        self.discard(chunk.key)
+        size = estimate_chunk_bytes(chunk)
+        self._sizes[chunk.key] = size
+        self._resident_bytes += size
+
+    def discard(self, key: ChunkKey) -> None:
+        size = self._sizes.pop(key, None)
+        if size is not None:
+            self._resident_bytes -= size
+
+    def victims(self, protect: Optional[ChunkKey] = None) -> List[ChunkKey]:
+        """Return least-recently-used keys that must go to fit the budget."""
+
+        victims: List[ChunkKey] = []
+        count = len(self._sizes)
+        resident = self._resident_bytes
+        for key, size in self._sizes.items():
+            if not self._over_budget(count, resident):
+                break
+            if key == protect:
+                continue
+            victims.append(key)
+            count -= 1
+            resident -= size
+        return victims
+
+    def _over_budget(self, count: int, resident: int) -> bool:
+        if self.max_chunks is not None and count > self.max_chunks:
+            return True
+        return self.max_bytes is not None and resident > self.max_bytes
+
+
+def estimate_chunk_bytes(chunk: Chunk) -> int:
+    """Approximate the heap footprint of a chunk's metadata and payload."""
+
+    return sys.getsizeof(chunk) + _deep_size(chunk.metadata) + _deep_size(chunk.payload)
+
+
+def _deep_size(value: Any) -> int:
+    if hasattr(value, "nbytes") and hasattr(value, "dtype"):
+        # NumPy arrays: views (e.g. grids read back with ``np.frombuffer``)
+        # leave their buffer out of ``getsizeof``.
+        if getattr(value, "base", None) is None:
+            return sys.getsizeof(value)
+        return sys.getsizeof(value) + value.nbytes
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        for item_key, item in value.items():
+            size += sys.getsizeof(item_key) + _deep_size(item)
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            size += _deep_size(item)
+    return size
+
+
+__all__ = ["ChunkResidencyManager", "ResidencyStats", "estimate_chunk_bytes"]
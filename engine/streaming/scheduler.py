@@ -0,0 +1,240 @@
+"""Frame-budgeted cooperative scheduler for streaming work."""
+from __future__ import annotations
+
+import heapq
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+from engine.telemetry import MetricsRegistry
+
+from .chunk import ChunkKey
+from .lod import lod0_extent
+
+WORK_UNLOAD = "unload"
+WORK_LOAD = "load"
+WORK_WRITE = "write"
+WORK_KINDS = (WORK_UNLOAD, WORK_LOAD, WORK_WRITE)
+
+# Unloads are cheap and free memory, so they go first; writes can wait.
+_KIND_RANK = {WORK_UNLOAD: 0, WORK_LOAD: 1, WORK_WRITE: 2}
+# Queuing one of these cancels queued work of the other kind for the key.
+_OPPOSITE = {WORK_LOAD: WORK_UNLOAD, WORK_UNLOAD: WORK_LOAD}
+
+
+@dataclass
+class SchedulerStats:
+    """Counters describing queued work and how ticks used their budget."""
+
+    submitted: int = 0
+    executed: int = 0
+    coalesced: int = 0
+    cancelled: int = 0
+    dropped: int = 0
+    ticks: int = 0
+    overruns: int = 0
+    max_depth: int = 0
+    last_tick_seconds: float = 0.0
+
+
+class _Task:
+    __slots__ = ("kind", "key", "action", "future", "sequence")
+
+    def __init__(self, kind: str, key: ChunkKey, action: Callable[[], Any], sequence: int) -> None:
+        self.kind = kind
+        self.key = key
+        self.action = action
+        self.future: "Future[Any]" = Future()
+        self.sequence = sequence
+
+
+class StreamingScheduler:
+    """Queues load, unload and write work and runs it within a per-tick budget.
+
+    Work is identified by ``(kind, key)``: submitting it again replaces the
+    queued action and returns the same future, and queuing a load cancels a
+    queued unload of the key (and vice versa). Each ``tick`` runs the most
+    urgent work until ``budget`` seconds have elapsed. At least one task
+    runs per tick so the queue always drains, and a tick that ends over
+    budget counts as an overrun.
+
+    Urgency is measured in level-0 tiles from the nearest focus set with
+    ``set_focus`` (one per traversal controller). Unloads run first, farthest
+    first. Loads run nearest first and writes last. A load more than
+    ``drop_distance`` tiles from every focus is stale: it is dropped at the
+    next tick and its future cancelled.
+
+    Call ``tick`` once per frame; actions run on the calling thread.
+    """
+
+    def __init__(
+        self,
+        budget: float = 0.002,
+        drop_distance: Optional[int] = None,
+        clock: Callable[[], float] = time.perf_counter,
+        metrics: Optional[MetricsRegistry] = None,
+    ) -> None:
+        if budget <= 0:
+            raise ValueError("budget must be positive")
+        if drop_distance is not None and drop_distance < 0:
+            raise ValueError("drop_distance must be non-negative")
+        self.budget = budget
+        self.drop_distance = drop_distance
+        self.metrics = metrics
+        self.stats = SchedulerStats()
+        self._clock = clock
+        self._tasks: Dict[Tuple[str, ChunkKey], _Task] = {}
+        self._focus: Dict[Hashable, ChunkKey] = {}
+        self._sequence = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._tasks)
+
+    def depth(self, kind: Optional[str] = None) -> int:
+        """Queued tasks, optionally of one kind."""
+
+        with self._lock:
+            if kind is None:
+                return len(self._tasks)
+            return sum(1 for task_kind, _key in self._tasks if task_kind == kind)
+
+    def set_focus(self, key: ChunkKey, owner: Hashable = None) -> None:
+        """Move ``owner``'s traversal position; priorities follow at the next tick."""
+
+        with self._lock:
+            self._focus[owner] = key
+
+    def clear_focus(self, owner: Hashable = None) -> None:
+        with self._lock:
+            self._focus.pop(owner, None)
+
+    def submit(self, kind: str, key: ChunkKey, action: Callable[[], Any]) -> "Future[Any]":
+        """Queue ``action`` as ``kind`` work for ``key``; the future holds its result."""
+
+        if kind not in _KIND_RANK:
+            raise ValueError(f"Unknown work kind {kind!r}")
+        with self._lock:
+            self.stats.submitted += 1
+            opposite = self._tasks.pop((_OPPOSITE.get(kind, ""), key), None)
+            if opposite is not None:
+                opposite.future.cancel()
+                self.stats.cancelled += 1
+            task = self._tasks.get((kind, key))
+            if task is not None:
+                task.action = action
+                self.stats.coalesced += 1
+                return task.future
+            self._sequence += 1
+            task = self._tasks[(kind, key)] = _Task(kind, key, action, self._sequence)
+            self.stats.max_depth = max(self.stats.max_depth, len(self._tasks))
+            return task.future
+
+    def cancel(self, kind: str, key: ChunkKey) -> bool:
+        """Drop queued work; returns ``False`` if none was queued."""
+
+        with self._lock:
+            task = self._tasks.pop((kind, key), None)
+            if task is None:
+                return False
+            self.stats.cancelled += 1
+        task.future.cancel()
+        return True
+
+    def tick(self) -> int:
+        """Run queued work until the budget is spent; returns how many tasks ran."""
+
+        start = self._clock()
+        stale: List[_Task] = []
+        with self._lock:
+            queue = []
+            for task in self._tasks.values():
+                distance = self._distance(task.key)
+                if task.kind == WORK_LOAD and self.drop_distance is not None and distance > self.drop_distance:
+                    stale.append(task)
+                    continue
+                signed = -distance if task.kind == WORK_UNLOAD else distance
+                queue.append((_KIND_RANK[task.kind], signed, task.sequence, task))
+            for task in stale:
+                del self._tasks[(task.kind, task.key)]
+            self.stats.dropped += len(stale)
+        for task in stale:
+            task.future.cancel()
+        heapq.heapify(queue)
+
+        executed = 0
+        while queue:
+            if executed and self._clock() - start >= self.budget:
+                break
+            task = heapq.heappop(queue)[-1]
+            with self._lock:
+                if self._tasks.get((task.kind, task.key)) is not task:
+                    continue  # Cancelled by an action earlier in this tick.
+                del self._tasks[(task.kind, task.key)]
+            if not task.future.set_running_or_notify_cancel():
+                continue
+            try:
+                result = task.action()
+            except Exception as exc:
+                task.future.set_exception(exc)
+            else:
+                task.future.set_result(result)
+            executed += 1
+            if self.metrics is not None:
+                self.metrics.increment("scheduler_tasks_total", kind=task.kind)
+
+        elapsed = self._clock() - start
+        with self._lock:
+            self.stats.ticks += 1
+            self.stats.executed += executed
+            self.stats.last_tick_seconds = elapsed
+            overrun = elapsed > self.budget
+            if overrun:
+                self.stats.overruns += 1
+            depths = {kind: 0 for kind in WORK_KINDS}
+            for kind, _key in self._tasks:
+                depths[kind] += 1
+        if self.metrics is not None:
+            self.metrics.observe("scheduler_tick_seconds", elapsed)
+            if overrun:
+                self.metrics.increment("scheduler_overruns_total")
+            if stale:
+                self.metrics.increment("scheduler_dropped_total", len(stale))
+            for kind, depth in depths.items():
+                self.metrics.set_gauge("scheduler_queue_depth", depth, kind=kind)
+        return executed
+
+    def drain(self) -> int:
+        """Tick until the queue is empty, ignoring the budget between ticks."""
+
+        executed = 0
+        while len(self):
+            executed += self.tick()
+        return executed
+
+    def _distance(self, key: ChunkKey) -> int:
+        if not self._focus:
+            return 0
+        lat_min, lat_max, lon_min, lon_max = lod0_extent(key)
+        best: Optional[int] = None
+        for focus in self._focus.values():
+            focus_lat_min, focus_lat_max, focus_lon_min, focus_lon_max = lod0_extent(focus)
+            dlat = max(lat_min - focus_lat_max, 0, focus_lat_min - lat_max)
+            dlon = max(lon_min - focus_lon_max, 0, focus_lon_min - lon_max)
+            distance = max(dlat, dlon)
+            if best is None or distance < best:
+                best = distance
+        return best
+
+
+__all__ = [
+    "SchedulerStats",
+    "StreamingScheduler",
+    "WORK_KINDS",
+    "WORK_LOAD",
+    "WORK_UNLOAD",
+    "WORK_WRITE",
+]
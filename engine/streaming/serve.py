@@ -0,0 +1,7 @@
+"""Command line entry point: ``python -m engine.streaming.serve``."""
+from __future__ import annotations
+
+from .chunk_server import main
+
+if __name__ == "__main__":
+    raise SystemExit(main())
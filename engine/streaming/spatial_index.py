@@ -0,0 +1,194 @@
+"""Morton-ordered spatial index over resident chunk keys."""
+from __future__ import annotations
+
+import bisect
+import heapq
+import math
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from .chunk import ChunkKey
+from .morton import compact_bits, spread_bits
+
+_COORD_OFFSET = 1 << 31
+
+
+def morton_encode(latitude: int, longitude: int) -> int:
+    """Interleave signed 32-bit tile coordinates into a 64-bit Z-order code.
+
+    Coordinates are offset by 2**31 so ordering is preserved across zero.
+    Longitude occupies the even bits and latitude the odd bits.
+    """
+
+    return spread_bits(longitude + _COORD_OFFSET) | (spread_bits(latitude + _COORD_OFFSET) << 1)
+
+
+def morton_decode(code: int) -> Tuple[int, int]:
+    """Inverse of ``morton_encode``; returns ``(latitude, longitude)``."""
+
+    return compact_bits(code >> 1) - _COORD_OFFSET, compact_bits(code) - _COORD_OFFSET
+
+
+class ChunkSpatialIndex:
+    """Per-LOD sorted Morton codes supporting neighbourhood queries.
+
+    Box queries walk the Morton interval between the box corners and filter
+    codes outside the box; small boxes are answered by probing cells
+    directly instead. Results are lists of ``ChunkKey`` and never copy the
+    service's chunk map.
+    """
+
+    # Boxes with at most this many cells are probed cell by cell.
+    PROBE_LIMIT = 64
+
+    def __init__(self) -> None:
+        self._codes: Dict[int, List[int]] = {}
+        self._members: Dict[int, set] = {}
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return sum(len(codes) for codes in self._codes.values())
+
+    def __contains__(self, key: object) -> bool:
+        if not isinstance(key, ChunkKey):
+            return False
+        with self._lock:
+            members = self._members.get(key.level_of_detail)
+            return members is not None and morton_encode(key.latitude, key.longitude) in members
+
+    def add(self, key: ChunkKey) -> None:
+        code = morton_encode(key.latitude, key.longitude)
+        with self._lock:
+            members = self._members.setdefault(key.level_of_detail, set())
+            if code in members:
+                return
+            members.add(code)
+            bisect.insort(self._codes.setdefault(key.level_of_detail, []), code)
+
+    def remove(self, key: ChunkKey) -> None:
+        code = morton_encode(key.latitude, key.longitude)
+        with self._lock:
+            members = self._members.get(key.level_of_detail)
+            if members is None or code not in members:
+                return
+            members.discard(code)
+            codes = self._codes[key.level_of_detail]
+            del codes[bisect.bisect_left(codes, code)]
+
+    def query_box(
+        self,
+        level_of_detail: int,
+        min_latitude: int,
+        max_latitude: int,
+        min_longitude: int,
+        max_longitude: int,
+    ) -> List[ChunkKey]:
+        """Keys at ``level_of_detail`` inside the inclusive tile box."""
+
+        if min_latitude > max_latitude or min_longitude > max_longitude:
+            return []
+        cells = (max_latitude - min_latitude + 1) * (max_longitude - min_longitude + 1)
+        with self._lock:
+            members = self._members.get(level_of_detail)
+            if not members:
+                return []
+            if cells <= self.PROBE_LIMIT or cells <= len(members):
+                return [
+                    ChunkKey(latitude=lat, longitude=lon, level_of_detail=level_of_detail)
+                    for lat in range(min_latitude, max_latitude + 1)
+                    for lon in range(min_longitude, max_longitude + 1)
+                    if morton_encode(lat, lon) in members
+                ]
+            codes = self._codes[level_of_detail]
+            low = bisect.bisect_left(codes, morton_encode(min_latitude, min_longitude))
+            high = bisect.bisect_right(codes, morton_encode(max_latitude, max_longitude))
+            found: List[ChunkKey] = []
+            for code in codes[low:high]:
+                lat, lon = morton_decode(code)
+                if min_latitude <= lat <= max_latitude and min_longitude <= lon <= max_longitude:
+                    found.append(ChunkKey(latitude=lat, longitude=lon, level_of_detail=level_of_detail))
+            return found
+
+    def query_radius(self, center: ChunkKey, radius: float) -> List[ChunkKey]:
+        """Keys on ``center``'s level whose centres lie within ``radius`` tiles."""
+
+        reach = int(math.floor(radius))
+        candidates = self.query_box(
+            center.level_of_detail,
+            center.latitude - reach,
+            center.latitude + reach,
+            center.longitude - reach,
+            center.longitude + reach,
+        )
+        limit = radius * radius
+        return [key for key in candidates if _distance_sq(center, key) <= limit]
+
+    def nearest(self, center: ChunkKey, count: int) -> List[ChunkKey]:
+        """The ``count`` keys closest to ``center`` on its level, nearest first.
+
+        Rings are searched outward while that is cheaper than a scan; keys
+        outside ring ``r`` are at least ``r + 1`` tiles away, which bounds the
+        search. Ties are broken by latitude then longitude.
+        """
+
+        if count <= 0:
+            return []
+        with self._lock:
+            codes = self._codes.get(center.level_of_detail)
+            if not codes:
+                return []
+            total = len(codes)
+            found: List[Tuple[int, int, int]] = []
+            ring = 0
+            while (2 * ring + 1) ** 2 <= 4 * total:
+                for key in self._ring(center, ring):
+                    found.append((_distance_sq(center, key), key.latitude, key.longitude))
+                if len(found) == total:
+                    break
+                if len(found) >= count:
+                    worst = heapq.nsmallest(count, found)[-1][0]
+                    if worst < (ring + 1) * (ring + 1):
+                        break
+                ring += 1
+            else:
+                found = []
+                for code in codes:
+                    lat, lon = morton_decode(code)
+                    dlat, dlon = lat - center.latitude, lon - center.longitude
+                    found.append((dlat * dlat + dlon * dlon, lat, lon))
+            return [
+                ChunkKey(latitude=lat, longitude=lon, level_of_detail=center.level_of_detail)
+                for _distance, lat, lon in heapq.nsmallest(count, found)
+            ]
+
+    def parent_of(self, key: ChunkKey) -> Optional[ChunkKey]:
+        """The resident parent tile of ``key``, if any."""
+
+        parent = key.parent()
+        return parent if parent in self else None
+
+    def children_of(self, key: ChunkKey) -> List[ChunkKey]:
+        """The resident child tiles of ``key``."""
+
+        return [child for child in key.children() if child in self]
+
+    def _ring(self, center: ChunkKey, ring: int) -> List[ChunkKey]:
+        if ring == 0:
+            return [center] if center in self else []
+        lod = center.level_of_detail
+        lat, lon = center.latitude, center.longitude
+        keys = self.query_box(lod, lat - ring, lat - ring, lon - ring, lon + ring)
+        keys += self.query_box(lod, lat + ring, lat + ring, lon - ring, lon + ring)
+        keys += self.query_box(lod, lat - ring + 1, lat + ring - 1, lon - ring, lon - ring)
+        keys += self.query_box(lod, lat - ring + 1, lat + ring - 1, lon + ring, lon + ring)
+        return keys
+
+
+def _distance_sq(a: ChunkKey, b: ChunkKey) -> int:
+    dlat = a.latitude - b.latitude
+    dlon = a.longitude - b.longitude
+    return dlat * dlat + dlon * dlon
+
+
+__all__ = ["ChunkSpatialIndex", "morton_decode", "morton_encode"]
@@ -0,0 +1,145 @@
+"""Background, coalescing writer used by ``ChunkCache`` in write-behind mode."""
+from __future__ import annotations
+
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Dict, Hashable, List, Optional, Tuple
+
+Commit = Callable[[List[Tuple[Hashable, bytes]]], None]
+
+
+def write_atomic(path: Path, data: bytes) -> int:
+    """Write ``data`` to ``path`` via a temporary file and rename.
+
+    Readers see either the previous file or the complete new one, never a
+    partial write.
+    """
+
+    temp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    with temp_path.open("wb") as handle:
+        handle.write(data)
+    os.replace(temp_path, path)
+    return len(data)
+
+
+class WriteBehindQueue:
+    """Bounded map of pending writes drained in batches by a daemon thread.
+
+    Storing a key that is already pending replaces its bytes in place, so a
+    chunk rewritten several times before the writer catches up is committed
+    once. ``submit`` blocks while ``max_pending`` distinct keys are waiting.
+    Entries stay visible through ``peek`` until their batch is committed.
+    Errors raised by ``commit`` are re-raised from the next ``submit`` or
+    ``flush``.
+    """
+
+    def __init__(self, commit: Commit, max_pending: int = 256, batch_size: int = 32) -> None:
+        if max_pending < 1:
+            raise ValueError("max_pending must be at least 1")
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+        self._commit = commit
+        self.max_pending = max_pending
+        self.batch_size = batch_size
+        self._pending: "OrderedDict[Hashable, bytes]" = OrderedDict()
+        self._writing: Dict[Hashable, bytes] = {}
+        self._condition = threading.Condition()
+        self._closed = False
+        self._error: Optional[BaseException] = None
+        self.commits = 0
+        self.coalesced = 0
+        self._thread = threading.Thread(target=self._run, name="chunk-cache-writer", daemon=True)
+        self._thread.start()
+
+    def __len__(self) -> int:
+        with self._condition:
+            return len(self._pending) + len(self._writing)
+
+    def submit(self, key: Hashable, data: bytes) -> None:
+        with self._condition:
+            self._raise_error()
+            if self._closed:
+                raise RuntimeError("Write-behind queue is closed")
+            if key in self._pending:
+                self._pending[key] = data
+                self.coalesced += 1
+                return
+            while len(self._pending) >= self.max_pending and self._error is None:
+                self._condition.wait()
+            self._raise_error()
+            self._pending[key] = data
+            self._condition.notify_all()
+
+    def peek(self, key: Hashable) -> Optional[bytes]:
+        """Bytes queued or being committed for ``key``, newest first."""
+
+        with self._condition:
+            data = self._pending.get(key)
+            return data if data is not None else self._writing.get(key)
+
+    def discard(self, key: Hashable) -> None:
+        """Drop a pending write and wait out any in-progress commit of ``key``."""
+
+        with self._condition:
+            self._pending.pop(key, None)
+            while key in self._writing:
+                self._condition.wait()
+            self._condition.notify_all()
+
+    def flush(self) -> None:
+        """Block until every write submitted so far is committed."""
+
+        with self._condition:
+            while (self._pending or self._writing) and self._error is None:
+                self._condition.wait()
+            self._raise_error()
+
+    def close(self) -> None:
+        with self._condition:
+            if self._closed:
+                self._raise_error()
+                return
+            self._closed = True
+            self._condition.notify_all()
+        self._thread.join()
+        with self._condition:
+            self._raise_error()
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                while not self._pending and not self._closed:
+                    self._condition.wait()
+                if not self._pending:
+                    return
+                batch: List[Tuple[Hashable, bytes]] = []
+                while self._pending and len(batch) < self.batch_size:
+                    key, data = self._pending.popitem(last=False)
+                    self._writing[key] = data
+                    batch.append((key, data))
+                self._condition.notify_all()
+            try:
+                self._commit(batch)
+            except BaseException as exc:  # Surface to the producing thread.
+                with self._condition:
+                    self._error = exc
+                    self._closed = True
+                    self._writing.clear()
+                    self._pending.clear()
+                    self._condition.notify_all()
+                return
+            with self._condition:
+                for key, _data in batch:
+                    self._writing.pop(key, None)
+                self.commits += 1
+                self._condition.notify_all()
+
+    def _raise_error(self) -> None:
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
+
+
+__all__ = ["WriteBehindQueue", "write_atomic"]
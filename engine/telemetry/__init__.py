@@ -0,0 +1,15 @@
+"""Lightweight metrics and tracing shared by the engine, ingest and controls."""
+from .metrics import COUNT_BUCKETS, DEFAULT_BUCKETS, Histogram, MetricsRegistry, Span
+from .sinks import InMemorySink, JsonLogSink, PeriodicExporter, PrometheusTextSink
+
+__all__ = [
+    "COUNT_BUCKETS",
+    "DEFAULT_BUCKETS",
+    "Histogram",
+    "InMemorySink",
+    "JsonLogSink",
+    "MetricsRegistry",
+    "PeriodicExporter",
+    "PrometheusTextSink",
+    "Span",
+]
@@ -0,0 +1,196 @@
+"""In-process counters, gauges, latency histograms and trace spans."""
+from __future__ import annotations
+
+import bisect
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, Iterator, List, Optional, Sequence, Tuple
+
+LabelSet = Tuple[Tuple[str, str], ...]
+SeriesKey = Tuple[str, LabelSet]
+
+# Upper bounds in seconds; spans 50us to 10s, which covers an in-memory
+# chunk lookup at one end and a full region ingest stage at the other.
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.00005,
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    10.0,
+)
+
+# Buckets for small per-frame counts such as input events or requests.
+COUNT_BUCKETS: Tuple[float, ...] = (0, 1, 2, 4, 8, 16, 32, 64, 128)
+
+
+@dataclass
+class Histogram:
+    """Cumulative-friendly bucket counts plus sum and count."""
+
+    buckets: Tuple[float, ...] = DEFAULT_BUCKETS
+    counts: List[int] = field(default_factory=list)
+    total: float = 0.0
+    count: int = 0
+
+    def __post_init__(self) -> None:
+        if not self.counts:
+            # One extra slot for observations above the largest bound (+Inf).
+            self.counts = [0] * (len(self.buckets) + 1)
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.count += 1
+
+    def quantile(self, q: float) -> float:
+        """Upper bucket bound containing quantile ``q`` (``inf`` past the last bucket)."""
+
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, bucket_count in zip(self.buckets + (float("inf"),), self.counts):
+            seen += bucket_count
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "buckets": list(self.buckets),
+            "counts": list(self.counts),
+            "sum": self.total,
+            "count": self.count,
+        }
+
+
+@dataclass(frozen=True)
+class Span:
+    """One timed operation kept in the registry's trace buffer."""
+
+    name: str
+    labels: LabelSet
+    start: float
+    duration: float
+
+
+class MetricsRegistry:
+    """Thread-safe store of named metric series.
+
+    Components take an optional registry and skip all bookkeeping when it is
+    ``None``, so instrumentation costs one attribute check when disabled.
+    Series are identified by a name plus keyword labels, mirroring the
+    Prometheus data model. With ``trace_capacity > 0`` the most recent spans
+    are also kept for inspection.
+    """
+
+    def __init__(self, trace_capacity: int = 0, buckets: Sequence[float] = DEFAULT_BUCKETS) -> None:
+        self._lock = threading.Lock()
+        self._buckets = tuple(sorted(buckets))
+        self._counters: Dict[SeriesKey, float] = {}
+        self._gauges: Dict[SeriesKey, float] = {}
+        self._histograms: Dict[SeriesKey, Histogram] = {}
+        self._spans: Deque[Span] = deque(maxlen=trace_capacity or None)
+        self._trace = trace_capacity > 0
+        self.sinks: List[Any] = []
+
+    def increment(self, name: str, amount: float = 1, **labels: object) -> None:
+        key = (name, _labels(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def set_gauge(self, name: str, value: float, **labels: object) -> None:
+        with self._lock:
+            self._gauges[(name, _labels(labels))] = value
+
+    def observe(self, name: str, value: float, buckets: Optional[Sequence[float]] = None, **labels: object) -> None:
+        """Add ``value`` to a histogram; ``buckets`` only applies when it is created."""
+
+        key = (name, _labels(labels))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                bounds = self._buckets if buckets is None else tuple(sorted(buckets))
+                histogram = self._histograms[key] = Histogram(bounds)
+            histogram.observe(value)
+
+    @contextmanager
+    def span(self, name: str, **labels: object) -> Iterator[None]:
+        """Time the enclosed block into the ``name`` histogram (in seconds)."""
+
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record_span(name, start, time.perf_counter() - start, **labels)
+
+    def record_span(self, name: str, start: float, duration: float, **labels: object) -> None:
+        self.observe(name, duration, **labels)
+        if self._trace:
+            with self._lock:
+                self._spans.append(Span(name, _labels(labels), start, duration))
+
+    def counter_value(self, name: str, **labels: object) -> float:
+        with self._lock:
+            return self._counters.get((name, _labels(labels)), 0)
+
+    def histogram(self, name: str, **labels: object) -> Optional[Histogram]:
+        with self._lock:
+            histogram = self._histograms.get((name, _labels(labels)))
+            if histogram is None:
+                return None
+            return Histogram(histogram.buckets, list(histogram.counts), histogram.total, histogram.count)
+
+    def spans(self) -> List[Span]:
+        with self._lock:
+            return list(self._spans)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """JSON-ready copy of every series, grouped by metric type."""
+
+        with self._lock:
+            return {
+                "timestamp": time.time(),
+                "counters": [_series(key, value) for key, value in sorted(self._counters.items())],
+                "gauges": [_series(key, value) for key, value in sorted(self._gauges.items())],
+                "histograms": [
+                    _series(key, histogram.as_dict()) for key, histogram in sorted(self._histograms.items())
+                ],
+            }
+
+    def add_sink(self, sink: Any) -> None:
+        self.sinks.append(sink)
+
+    def export(self) -> Dict[str, Any]:
+        """Push a snapshot to every attached sink and return it."""
+
+        snapshot = self.snapshot()
+        for sink in list(self.sinks):
+            sink.export(snapshot)
+        return snapshot
+
+
+def _labels(labels: Dict[str, object]) -> LabelSet:
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+def _series(key: SeriesKey, value: Any) -> Dict[str, Any]:
+    name, labels = key
+    return {"name": name, "labels": dict(labels), "value": value}
+
+
+__all__ = ["COUNT_BUCKETS", "DEFAULT_BUCKETS", "Histogram", "MetricsRegistry", "Span"]
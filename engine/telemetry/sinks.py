@@ -0,0 +1,155 @@
+"""Exporters that receive ``MetricsRegistry`` snapshots."""
+from __future__ import annotations
+
+import json
+import math
+import os
+import re
+import threading
+from collections import deque
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Optional
+
+from .metrics import MetricsRegistry
+
+_INVALID_NAME = re.compile(r"[^a-zA-Z0-9_:]")
+
+
+class InMemorySink:
+    """Keeps the most recent snapshots for tests and debug overlays."""
+
+    def __init__(self, capacity: int = 16) -> None:
+        self.snapshots: Deque[Dict[str, Any]] = deque(maxlen=capacity)
+
+    @property
+    def latest(self) -> Optional[Dict[str, Any]]:
+        return self.snapshots[-1] if self.snapshots else None
+
+    def export(self, snapshot: Dict[str, Any]) -> None:
+        self.snapshots.append(snapshot)
+
+
+class JsonLogSink:
+    """Appends one compact JSON line per snapshot."""
+
+    def __init__(self, path: Path | str) -> None:
+        self.path = Path(path)
+
+    def export(self, snapshot: Dict[str, Any]) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self.path.open("a", encoding="utf-8") as handle:
+            handle.write(json.dumps(snapshot, separators=(",", ":"), sort_keys=True))
+            handle.write("\n")
+
+
+class PrometheusTextSink:
+    """Rewrites a Prometheus text-exposition file (for node_exporter's textfile collector).
+
+    Metric names are prefixed with ``namespace`` and sanitized; histograms
+    are exported with cumulative ``_bucket``/``_sum``/``_count`` series.
+    """
+
+    def __init__(self, path: Path | str, namespace: str = "owg") -> None:
+        self.path = Path(path)
+        self.namespace = namespace
+
+    def export(self, snapshot: Dict[str, Any]) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+        temp_path.write_text(self.render(snapshot), encoding="utf-8")
+        os.replace(temp_path, self.path)
+
+    def render(self, snapshot: Dict[str, Any]) -> str:
+        lines: List[str] = []
+        typed: set = set()
+
+        def declare(name: str, kind: str) -> None:
+            if name not in typed:
+                typed.add(name)
+                lines.append(f"# TYPE {name} {kind}")
+
+        for series in snapshot["counters"]:
+            name = self._name(series["name"])
+            declare(name, "counter")
+            lines.append(f"{name}{_format_labels(series['labels'])} {_format_value(series['value'])}")
+        for series in snapshot["gauges"]:
+            name = self._name(series["name"])
+            declare(name, "gauge")
+            lines.append(f"{name}{_format_labels(series['labels'])} {_format_value(series['value'])}")
+        for series in snapshot["histograms"]:
+            name = self._name(series["name"])
+            declare(name, "histogram")
+            histogram = series["value"]
+            cumulative = 0
+            for bound, count in zip(histogram["buckets"] + [math.inf], histogram["counts"]):
+                cumulative += count
+                labels = dict(series["labels"], le=_format_value(bound))
+                lines.append(f"{name}_bucket{_format_labels(labels)} {cumulative}")
+            lines.append(f"{name}_sum{_format_labels(series['labels'])} {_format_value(histogram['sum'])}")
+            lines.append(f"{name}_count{_format_labels(series['labels'])} {histogram['count']}")
+        return "\n".join(lines) + "\n"
+
+    def _name(self, name: str) -> str:
+        return _INVALID_NAME.sub("_", f"{self.namespace}_{name}" if self.namespace else name)
+
+
+class PeriodicExporter:
+    """Background thread that calls ``registry.export()`` every ``interval`` seconds.
+
+    A final export runs on ``stop()`` so short-lived processes still leave a
+    complete snapshot behind.
+    """
+
+    def __init__(self, registry: MetricsRegistry, interval: float = 10.0) -> None:
+        if interval <= 0:
+            raise ValueError("interval must be positive")
+        self.registry = registry
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "PeriodicExporter":
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="metrics-export", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        thread, self._thread = self._thread, None
+        if thread is not None:
+            self._stop.set()
+            thread.join()
+        self.registry.export()
+
+    def __enter__(self) -> "PeriodicExporter":
+        return self.start()
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.stop()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.registry.export()
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in sorted(labels.items())]
+    return "{" + ",".join(pairs) + "}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+__all__ = ["InMemorySink", "JsonLogSink", "PeriodicExporter", "PrometheusTextSink"]
@@ -1,4 +1,5 @@
 """Procedural buildings package exports."""
 from .extrusion import BuildingExtruder, FidelityHookRegistry, LODPolicy
+from .extrusion_cache import ExtrusionCache, ExtrusionCacheStats
 
-__all__ = ["BuildingExtruder", "FidelityHookRegistry", "LODPolicy"]
+__all__ = ["BuildingExtruder", "ExtrusionCache", "ExtrusionCacheStats", "FidelityHookRegistry", "LODPolicy"]
@@ -3,7 +3,11 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from enum import Enum
-from typing import Callable, Iterable, List, Sequence, Tuple
+from typing import TYPE_CHECKING, Any, Callable, Iterable, List, Sequence, Tuple
+
+if TYPE_CHECKING:
+    from .columnar import ExtrusionColumns, PackedFootprints
+    from .extrusion_cache import ExtrusionCache
 
 Footprint = Sequence[Tuple[float, float]]
 
@@ -37,15 +41,25 @@ class LODPolicy(str, Enum):
 
 @dataclass
 class FidelityHookRegistry:
-    """Registers fidelity callbacks for named presets."""
+    """Registers fidelity callbacks for named presets.
+
+    Batch hooks receive an ``ExtrusionColumns`` and return one column per
+    output field; they are used by ``BuildingExtruder.extrude_many``.
+    """
 
     halo_ultra_hd_hook: Callable[[Footprint, str, float], dict] | None = None
+    halo_ultra_hd_batch_hook: Callable[["ExtrusionColumns"], dict] | None = None
 
     def resolve(self, policy: LODPolicy) -> Callable[[Footprint, str, float], dict] | None:
         if policy is LODPolicy.HALO_INFINITE_ULTRA_HD:
             return self.halo_ultra_hd_hook
         return None
 
+    def resolve_batch(self, policy: LODPolicy) -> Callable[["ExtrusionColumns"], dict] | None:
+        if policy is LODPolicy.HALO_INFINITE_ULTRA_HD:
+            return self.halo_ultra_hd_batch_hook
+        return None
+
     @staticmethod
     def default() -> "FidelityHookRegistry":
         def default_hook(footprint: Footprint, zoning: str, height: float) -> dict:
@@ -57,11 +71,23 @@ class FidelityHookRegistry:
                 "height": height,
             }
 
-        return FidelityHookRegistry(halo_ultra_hd_hook=default_hook)
+        def default_batch_hook(columns: "ExtrusionColumns") -> dict:
+            from .columnar import default_fidelity_columns
+
+            return default_fidelity_columns(columns)
+
+        return FidelityHookRegistry(
+            halo_ultra_hd_hook=default_hook,
+            halo_ultra_hd_batch_hook=default_batch_hook,
+        )
 
 
 class BuildingExtruder:
-    """Extrudes building footprints into simple prism meshes."""
+    """Extrudes building footprints into simple prism meshes.
+
+    With an ``ExtrusionCache`` attached, repeated footprints are served from
+    the cache instead of regenerating facades and rerunning fidelity hooks.
+    """
 
     ZONING_HEIGHTS = {
         "residential": 12.0,
@@ -70,10 +96,25 @@ class BuildingExtruder:
         "mixed_use": 18.0,
     }
 
-    def __init__(self, fidelity_registry: FidelityHookRegistry | None = None) -> None:
+    def __init__(
+        self,
+        fidelity_registry: FidelityHookRegistry | None = None,
+        cache: "ExtrusionCache" | None = None,
+    ) -> None:
         self.registry = fidelity_registry or FidelityHookRegistry.default()
+        self.cache = cache
 
     def extrude(self, footprint: Footprint, zoning: str, policy: LODPolicy) -> dict:
+        if self.cache is None:
+            return self._extrude(footprint, zoning, policy)
+        key = self.cache.key_for(footprint, zoning, policy)
+        mesh = self.cache.get(key, footprint)
+        if mesh is None:
+            mesh = self._extrude(footprint, zoning, policy)
+            self.cache.put(key, mesh)
+        return mesh
+
+    def _extrude(self, footprint: Footprint, zoning: str, policy: LODPolicy) -> dict:
         base_height = self.ZONING_HEIGHTS.get(zoning, 10.0)
         height = round(base_height * policy.height_multiplier, 3)
         mesh = {
@@ -89,6 +130,37 @@ class BuildingExtruder:
             mesh["fidelity"] = hook(footprint, zoning, height)
         return mesh
 
+    def extrude_many(
+        self,
+        footprints: "PackedFootprints" | Sequence[Footprint],
+        zoning: str | Sequence[str],
+        policy: LODPolicy,
+    ) -> "ExtrusionColumns":
+        """Extrude many footprints at once into columnar results.
+
+        ``footprints`` is a ``PackedFootprints`` (or a sequence that will be
+        packed). Numbers match ``extrude`` exactly; registries without a batch
+        hook fall back to calling the scalar hook per footprint.
+        """
+
+        from .columnar import PackedFootprints, extrude_columns
+
+        if not isinstance(footprints, PackedFootprints):
+            footprints = PackedFootprints.from_footprints(footprints)
+        columns = extrude_columns(footprints, zoning, policy, self.ZONING_HEIGHTS)
+        batch_hook = self.registry.resolve_batch(policy)
+        if batch_hook:
+            columns.fidelity = batch_hook(columns)
+            return columns
+        hook = self.registry.resolve(policy)
+        if hook:
+            fidelity: List[Any] = []
+            for index in range(len(columns)):
+                height = float(columns.heights[index])
+                fidelity.append(hook(footprints.footprint(index), columns.zoning[index], height))
+            columns.fidelity = fidelity
+        return columns
+
     @staticmethod
     def _generate_facades(footprint: Footprint, layers: int) -> List[dict]:
         edges = _edges(footprint)
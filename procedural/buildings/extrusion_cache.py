@@ -0,0 +1,175 @@
+"""Bounded memoization of building extrusions keyed on footprint content."""
+from __future__ import annotations
+
+import json
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, Optional, Sequence, Tuple
+
+if TYPE_CHECKING:
+    from .extrusion import Footprint, LODPolicy
+
+EXTRUSION_CACHE_VERSION = 1
+
+CacheKey = Tuple[Tuple[Tuple[float, float], ...], str, str]
+
+
+@dataclass
+class ExtrusionCacheStats:
+    """Counters describing how often repeated footprints were reused."""
+
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def as_dict(self) -> Dict[str, float]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hit_rate, 4),
+        }
+
+
+class ExtrusionCache:
+    """LRU cache of extruded meshes keyed on footprint, zoning and LOD policy.
+
+    Footprints are normalized to tuples of float pairs, so lists, tuples and
+    integer coordinates describing the same polygon share an entry. With
+    ``translation_invariant`` the key is taken relative to the first vertex,
+    letting translated copies of an archetype (row houses, tract housing)
+    share one entry; facade lengths are then computed from the first copy
+    seen and may differ from a direct extrusion in the last rounded digit,
+    and fidelity hooks must not depend on absolute position.
+
+    Entries are held for one ``BuildingExtruder`` and its fidelity hooks. With
+    a ``path`` the cache can be saved and reloaded between ingest runs; bump
+    ``EXTRUSION_CACHE_VERSION`` (or delete the file) when hooks change.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 4096,
+        path: Path | str | None = None,
+        translation_invariant: bool = False,
+    ) -> None:
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        self.max_entries = max_entries
+        self.path = Path(path) if path is not None else None
+        self.translation_invariant = translation_invariant
+        self.stats = ExtrusionCacheStats()
+        self._entries: "OrderedDict[CacheKey, dict]" = OrderedDict()
+        self._lock = threading.Lock()
+        if self.path is not None and self.path.exists():
+            self.load()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def key_for(self, footprint: "Footprint", zoning: str, policy: "LODPolicy") -> CacheKey:
+        points = tuple((float(x), float(y)) for x, y in footprint)
+        if self.translation_invariant and points:
+            origin_x, origin_y = points[0]
+            points = tuple((x - origin_x, y - origin_y) for x, y in points)
+        return points, zoning, policy.value
+
+    def get(self, key: CacheKey, footprint: "Footprint") -> Optional[dict]:
+        """Return a private copy of the cached mesh for ``footprint``, or ``None``."""
+
+        with self._lock:
+            mesh = self._entries.get(key)
+            if mesh is None:
+                self.stats.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats.hits += 1
+        copy = _clone(mesh)
+        copy["footprint"] = list(footprint)
+        return copy
+
+    def put(self, key: CacheKey, mesh: dict) -> None:
+        stored = _clone(mesh)
+        with self._lock:
+            self._entries[key] = stored
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def save(self, path: Path | str | None = None) -> None:
+        """Write entries (least recently used first) atomically to ``path``."""
+
+        target = Path(path) if path is not None else self.path
+        if target is None:
+            return
+        with self._lock:
+            entries = [
+                {"footprint": [list(point) for point in key[0]], "zoning": key[1], "policy": key[2], "mesh": mesh}
+                for key, mesh in self._entries.items()
+            ]
+        document = {
+            "version": EXTRUSION_CACHE_VERSION,
+            "translation_invariant": self.translation_invariant,
+            "entries": entries,
+        }
+        target.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = target.with_suffix(target.suffix + ".tmp")
+        with temp_path.open("w", encoding="utf-8") as handle:
+            json.dump(document, handle, separators=(",", ":"))
+        os.replace(temp_path, target)
+
+    def load(self, path: Path | str | None = None) -> int:
+        """Merge entries from disk; returns how many were loaded.
+
+        Files from another cache version or key mode are ignored.
+        """
+
+        source = Path(path) if path is not None else self.path
+        if source is None or not source.exists():
+            return 0
+        try:
+            with source.open("r", encoding="utf-8") as handle:
+                document = json.load(handle)
+        except ValueError:
+            return 0
+        if (
+            document.get("version") != EXTRUSION_CACHE_VERSION
+            or document.get("translation_invariant") != self.translation_invariant
+        ):
+            return 0
+        entries: Sequence[Dict[str, Any]] = document.get("entries", [])
+        for entry in entries:
+            key: CacheKey = (
+                tuple((float(x), float(y)) for x, y in entry["footprint"]),
+                entry["zoning"],
+                entry["policy"],
+            )
+            self.put(key, entry["mesh"])
+        return len(entries)
+
+
+def _clone(value: Any) -> Any:
+    """Copy the dict/list structure of a mesh; leaves are immutable."""
+
+    if isinstance(value, dict):
+        return {name: _clone(item) for name, item in value.items()}
+    if isinstance(value, list):
+        return [_clone(item) for item in value]
+    return value
+
+
+__all__ = ["EXTRUSION_CACHE_VERSION", "ExtrusionCache", "ExtrusionCacheStats"]
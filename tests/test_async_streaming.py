@@ -0,0 +1,75 @@
+import threading
+from concurrent.futures import CancelledError
+
+import pytest
+
+from controls.input_profiles import InputEvent, StreamingTraversalController, XboxControllerProfile
+from engine.streaming import ChunkKey, ChunkStreamingService
+
+
+class _GatedService(ChunkStreamingService):
+    """Blocks generation until the test releases the gate."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.gate = threading.Event()
+        self.started = threading.Event()
+        self.loads = 0
+
+    def _load_chunk(self, key):
+        self.loads += 1
+        self.started.set()
+        self.gate.wait(timeout=5)
+        return super()._load_chunk(key)
+
+
+def test_concurrent_requests_are_coalesced():
+    service = _GatedService(max_workers=4)
+    key = ChunkKey(latitude=2, longitude=3, level_of_detail=0)
+
+    first = service.request_chunk_async(key)
+    second = service.request_chunk_async(key)
+    assert first is second
+
+    service.gate.set()
+    chunk = first.result(timeout=5)
+    assert service.loads == 1
+    assert service.request_chunk(key) is chunk
+    service.shutdown()
+
+
+def test_cancel_running_request_discards_chunk():
+    service = _GatedService(max_workers=1)
+    key = ChunkKey(latitude=0, longitude=0, level_of_detail=0)
+
+    future = service.request_chunk_async(key)
+    assert service.started.wait(timeout=5)
+    assert service.cancel_request(key)
+    service.gate.set()
+
+    with pytest.raises(CancelledError):
+        future.result(timeout=5)
+    assert key not in service.get_loaded_chunks()
+    assert not service.cancel_request(key)
+    service.shutdown()
+
+
+def test_request_many_matches_serial_generation():
+    keys = [ChunkKey(latitude=lat, longitude=lon, level_of_detail=0) for lat in range(3) for lon in range(3)]
+    service = ChunkStreamingService(max_workers=4)
+
+    batch = service.request_many(keys)
+    serial = [ChunkStreamingService().request_chunk(key) for key in keys]
+
+    assert [chunk.payload for chunk in batch] == [chunk.payload for chunk in serial]
+    service.shutdown()
+
+
+def test_controller_schedules_chunk_without_blocking():
+    service = ChunkStreamingService()
+    controller = StreamingTraversalController(service, ChunkKey(latitude=0, longitude=0, level_of_detail=0))
+
+    key = controller.apply_event(XboxControllerProfile(), InputEvent("xbox", "left_stick_up"))
+
+    assert controller.pending.result(timeout=5).key == key
+    service.shutdown()
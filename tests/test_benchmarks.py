@@ -0,0 +1,56 @@
+import copy
+import json
+
+from benchmarks import BenchmarkConfig, compare_results, run_suite
+from benchmarks.__main__ import main
+
+TINY = BenchmarkConfig(chunks=4, footprints=3, ingest_chunks=1, traversal_steps=6, repeat=1, warmup=0)
+
+
+def test_suite_reports_every_hot_path():
+    results = run_suite(TINY)
+
+    benchmarks = results["benchmarks"]
+    assert set(benchmarks) == {
+        "request_chunk",
+        "request_many",
+        "cache_store",
+        "cache_load",
+        "extrude",
+        "pipeline",
+        "traversal",
+        "memory",
+    }
+    assert benchmarks["cache_store"]["bytes_on_disk"] > 0
+    memory = benchmarks["memory"]
+    assert memory["bytes_per_chunk"]["compact"] < memory["bytes_per_chunk"]["legacy"]
+    assert memory["bytes_per_key"]["slotted"] < memory["bytes_per_key"]["legacy"]
+    assert benchmarks["extrude"]["operations"] == 3
+    assert json.loads(json.dumps(results)) == results
+
+
+def test_compare_flags_only_slowdowns_beyond_threshold():
+    baseline = run_suite(TINY, only=["extrude", "request_chunk"])
+    current = copy.deepcopy(baseline)
+    current["benchmarks"]["extrude"]["seconds"]["median"] *= 1.5
+    current["benchmarks"]["request_chunk"]["seconds"]["median"] *= 1.05
+
+    flagged = {item.name for item in compare_results(baseline, current, threshold=0.1) if item.regressed}
+
+    assert flagged == {"extrude"}
+
+    current["benchmarks"]["extrude"]["operations"] = 0
+    assert [item.name for item in compare_results(baseline, current)] == ["request_chunk"]
+
+
+def test_cli_run_and_compare_round_trip(tmp_path):
+    output = tmp_path / "results.json"
+    assert main(["run", "--size", "small", "--repeat", "1", "--only", "extrude", "--output", str(output)]) == 0
+
+    slower = json.loads(output.read_text())
+    slower["benchmarks"]["extrude"]["seconds"]["median"] *= 10
+    slower_path = tmp_path / "slower.json"
+    slower_path.write_text(json.dumps(slower))
+
+    assert main(["compare", str(output), str(output)]) == 0
+    assert main(["compare", str(output), str(slower_path)]) == 1
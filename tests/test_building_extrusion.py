@@ -0,0 +1,42 @@
+import random
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from procedural.buildings import BuildingExtruder, FidelityHookRegistry, LODPolicy  # noqa: E402
+from procedural.buildings.columnar import PackedFootprints  # noqa: E402
+
+
+def _random_footprints(count, seed=7):
+    rng = random.Random(seed)
+    return [
+        [(round(rng.uniform(-0.5, 0.5), 3), round(rng.uniform(-0.5, 0.5), 3)) for _ in range(rng.randint(3, 8))]
+        for _ in range(count)
+    ]
+
+
+@pytest.mark.parametrize("policy", list(LODPolicy))
+def test_extrude_many_matches_scalar_extrude(policy):
+    extruder = BuildingExtruder()
+    footprints = _random_footprints(200)
+    zoning = ["residential", "commercial", "unknown", "mixed_use"] * 50
+
+    columns = extruder.extrude_many(footprints, zoning, policy)
+
+    expected = [extruder.extrude(footprint, zone, policy) for footprint, zone in zip(footprints, zoning)]
+    assert columns.to_meshes() == expected
+
+
+def test_extrude_many_falls_back_to_scalar_hook():
+    registry = FidelityHookRegistry(halo_ultra_hd_hook=lambda footprint, zoning, height: {"points": len(footprint)})
+    extruder = BuildingExtruder(fidelity_registry=registry)
+    packed = PackedFootprints(
+        vertices=np.array([[0.0, 0.0], [1.0, 0.0], [1.0, 1.0], [0.0, 0.0], [2.0, 0.0], [2.0, 2.0], [0.0, 2.0]]),
+        offsets=np.array([0, 3, 7]),
+    )
+
+    columns = extruder.extrude_many(packed, "industrial", LODPolicy.HALO_INFINITE_ULTRA_HD)
+
+    assert columns.fidelity == [{"points": 3}, {"points": 4}]
+    assert columns.window_bays.tolist() == [10, 10, 10, 20, 20, 20, 20]
@@ -0,0 +1,308 @@
+import threading
+
+import pytest
+
+from engine.streaming import (
+    ChunkCache,
+    ChunkFormatError,
+    ChunkKey,
+    ChunkStreamingService,
+    RegionPack,
+    RegionPackWriter,
+    convert_cache_tree,
+)
+
+
+def _sample_chunk(key):
+    chunk = ChunkStreamingService().request_chunk(key)
+    chunk.payload["meshes"] = [{"height": 18.0, "footprint": [[0.1, 0.2], [0.3, 0.4]]}] * 20
+    return chunk
+
+
+def test_binary_round_trip_matches_json_codec(tmp_path):
+    key = ChunkKey(latitude=1, longitude=-2, level_of_detail=3)
+    chunk = _sample_chunk(key)
+    binary = ChunkCache(tmp_path / "bin", compress=True)
+    debug = ChunkCache(tmp_path / "json", codec="json")
+
+    binary.store(chunk)
+    debug.store(chunk)
+
+    assert binary.load(key) == debug.load(key)
+    assert binary.load_metadata(key) == chunk.metadata
+    assert binary._path_for(key).stat().st_size < debug._path_for(key).stat().st_size
+
+
+def test_sections_decode_lazily(tmp_path):
+    key = ChunkKey(latitude=0, longitude=0, level_of_detail=0)
+    cache = ChunkCache(tmp_path, compress=["meshes"])
+    cache.store(_sample_chunk(key))
+
+    with cache.open(key) as chunk_file:
+        assert chunk_file.key == key
+        assert set(chunk_file.sections) == {"metadata", "features", "meshes", "payload"}
+        assert chunk_file.sections["meshes"].compression == 1
+        assert chunk_file.sections["features"].compression == 0
+        assert len(chunk_file.section("meshes")) == 20
+
+
+def test_closing_releases_section_views_handed_out(tmp_path):
+    key = ChunkKey(latitude=0, longitude=0, level_of_detail=0)
+    cache = ChunkCache(tmp_path / "cache")
+    cache.store(_sample_chunk(key))
+
+    with cache.open(key) as chunk_file:
+        raw = chunk_file.raw_section("metadata")
+        kept = bytes(raw)
+    with pytest.raises(ValueError):
+        raw.tobytes()
+    assert kept
+
+    with RegionPackWriter(tmp_path / "region.owrp") as writer:
+        writer.add(_sample_chunk(key))
+    with RegionPack.open(tmp_path / "region.owrp") as pack:
+        with pack.open_chunk(key) as chunk_file:
+            raw = chunk_file.raw_section("features")
+    with pytest.raises(ValueError):
+        raw.tobytes()
+
+
+def test_corrupt_file_raises_format_error(tmp_path):
+    key = ChunkKey(latitude=0, longitude=0, level_of_detail=0)
+    cache = ChunkCache(tmp_path)
+    cache.store(_sample_chunk(key))
+    path = cache._path_for(key)
+    path.write_bytes(path.read_bytes()[:20])
+
+    with pytest.raises(ChunkFormatError):
+        cache.load(key)
+
+
+def test_convert_cache_tree(tmp_path):
+    keys = [ChunkKey(latitude=lat, longitude=1, level_of_detail=0) for lat in range(3)]
+    legacy = ChunkCache(tmp_path, codec="json")
+    for key in keys:
+        legacy.store(_sample_chunk(key))
+    expected = {key: legacy.load(key) for key in keys}
+
+    assert convert_cache_tree(tmp_path) == 3
+
+    converted = ChunkCache(tmp_path)
+    assert not list(tmp_path.rglob("*.json"))
+    for key in keys:
+        assert converted.load(key) == expected[key]
+
+
+def test_convert_cache_tree_saves_the_target_index(tmp_path):
+    keys = [ChunkKey(latitude=lat, longitude=1, level_of_detail=0) for lat in range(3)]
+    with ChunkCache(tmp_path, codec="json", max_bytes=10_000_000) as legacy:
+        for key in keys:
+            legacy.store(_sample_chunk(key))
+
+    assert convert_cache_tree(tmp_path) == 3
+
+    reopened = ChunkCache(tmp_path, max_bytes=10_000_000)
+    assert reopened.disk_usage() == sum(path.stat().st_size for path in tmp_path.rglob("lod_*.chunk"))
+
+
+def test_region_pack_serves_chunks_without_the_cache_tree(tmp_path):
+    keys = [ChunkKey(latitude=lat, longitude=lon, level_of_detail=0) for lat in (3, -1) for lon in (2, 0, -4)]
+    with RegionPackWriter(tmp_path / "region.owrp") as writer:
+        for key in keys:
+            writer.add(_sample_chunk(key), compress=["meshes"])
+
+    with RegionPack.open(tmp_path / "region.owrp") as pack:
+        assert len(pack) == len(keys)
+        assert list(pack.keys()) == sorted(keys, key=lambda key: (key.latitude, key.longitude))
+        assert ChunkKey(latitude=9, longitude=9, level_of_detail=0) not in pack
+        assert pack.load(keys[0])["payload"] == _sample_chunk(keys[0]).payload
+
+    service = ChunkStreamingService()
+    service.mount_pack(tmp_path / "region.owrp")
+    served = service.request_chunk(keys[1])
+    service.unmount_packs()
+
+    assert served.payload["meshes"] == _sample_chunk(keys[1]).payload["meshes"]
+
+
+def test_unmount_waits_for_loads_reading_a_pack(tmp_path):
+    key = ChunkKey(latitude=0, longitude=0, level_of_detail=0)
+    with RegionPackWriter(tmp_path / "region.owrp") as writer:
+        writer.add(_sample_chunk(key))
+    service = ChunkStreamingService()
+    pack = service.mount_pack(tmp_path / "region.owrp")
+    reading, release = threading.Event(), threading.Event()
+    original_load = pack.load
+
+    def slow_load(requested):
+        reading.set()
+        release.wait(5)
+        return original_load(requested)
+
+    pack.load = slow_load
+    future = service.request_chunk_async(key)
+    assert reading.wait(5)
+    unmount = threading.Thread(target=service.unmount_packs)
+    unmount.start()
+    unmount.join(0.1)
+    assert unmount.is_alive()
+
+    release.set()
+    unmount.join(5)
+    assert future.result(5).payload["meshes"] == _sample_chunk(key).payload["meshes"]
+    assert not unmount.is_alive()
+    service.shutdown()
+
+
+def test_region_pack_rejects_foreign_files(tmp_path):
+    (tmp_path / "bogus.owrp").write_bytes(b"OWCK" + b"\0" * 40)
+
+    with pytest.raises(ChunkFormatError):
+        RegionPack.open(tmp_path / "bogus.owrp")
+
+
+def test_write_behind_serves_pending_writes_and_coalesces(tmp_path):
+    key = ChunkKey(latitude=4, longitude=4, level_of_detail=0)
+    committed = []
+    gate = threading.Event()
+
+    with ChunkCache(tmp_path, write_behind=True, batch_size=8) as cache:
+        commit = cache._writer._commit
+
+        def slow_commit(batch):
+            gate.wait(timeout=5)
+            committed.append([item_key for item_key, _data in batch])
+            commit(batch)
+
+        cache._writer._commit = slow_commit
+        chunk = _sample_chunk(key)
+        cache.store(chunk)
+        chunk.metadata["elevation"] = -1.0
+        cache.store(chunk)
+        cache.store(chunk)
+
+        assert cache.contains(key)
+        assert cache.load(key)["metadata"]["elevation"] == -1.0
+        gate.set()
+        cache.flush()
+        assert cache._path_for(key).exists()
+
+    assert sum(len(batch) for batch in committed) <= 2
+    assert ChunkCache(tmp_path).load(key)["metadata"]["elevation"] == -1.0
+    assert not list(tmp_path.rglob("*.tmp"))
+
+
+def test_write_behind_evict_drops_pending_write(tmp_path):
+    key = ChunkKey(latitude=1, longitude=1, level_of_detail=0)
+    cache = ChunkCache(tmp_path, write_behind=True)
+    cache.store(_sample_chunk(key))
+    cache.evict(key)
+    cache.close()
+
+    assert not cache.contains(key)
+
+
+def _quota_for(tmp_path, entries):
+    probe = ChunkCache(tmp_path / "probe")
+    probe.store(_sample_chunk(ChunkKey(latitude=0, longitude=0, level_of_detail=0)))
+    return probe._path_for(ChunkKey(latitude=0, longitude=0, level_of_detail=0)).stat().st_size * entries + 64
+
+
+@pytest.mark.parametrize("policy, survivor", [("lru", 3), ("lfu", 0)])
+def test_quota_evicts_by_policy(tmp_path, policy, survivor):
+    keys = [ChunkKey(latitude=index, longitude=0, level_of_detail=0) for index in range(5)]
+    cache = ChunkCache(tmp_path / "cache", max_bytes=_quota_for(tmp_path, 4), eviction=policy)
+    for key in keys[:4]:
+        cache.store(_sample_chunk(key))
+    for _ in range(3):
+        cache.load(keys[0])
+    for key in keys[1:4]:
+        cache.load_metadata(key)
+
+    cache.store(_sample_chunk(keys[4]))
+
+    assert cache.evictions >= 1
+    assert cache.disk_usage() <= cache.max_bytes
+    assert cache.contains(keys[4])
+    assert cache.contains(keys[survivor])
+    evicted = keys[0] if policy == "lru" else keys[1]
+    assert not cache.contains(evicted)
+
+
+def test_quota_after_compaction_evicts_only_what_it_needs(tmp_path):
+    keys = [ChunkKey(latitude=index, longitude=0, level_of_detail=0) for index in range(14)]
+    cache = ChunkCache(tmp_path / "cache", max_bytes=_quota_for(tmp_path, 12))
+    for key in keys[:10]:
+        cache.store(_sample_chunk(key))
+    cache.compact()
+
+    for key in keys[10:]:
+        cache.store(_sample_chunk(key))
+
+    # Down to the low-water mark (about ten entries plus segment overhead), not everything.
+    assert 3 <= cache.evictions <= 4
+    assert len(cache._index) == 14 - cache.evictions
+    assert cache.disk_usage() <= cache.max_bytes
+    assert all(cache.contains(key) for key in keys[10:])
+
+
+def test_quota_compacts_only_once_enough_segment_space_is_dead(tmp_path, monkeypatch):
+    keys = [ChunkKey(latitude=index, longitude=0, level_of_detail=0) for index in range(40)]
+    cache = ChunkCache(tmp_path / "cache", max_bytes=_quota_for(tmp_path, 12))
+    for key in keys[:10]:
+        cache.store(_sample_chunk(key))
+    cache.compact()
+    compactions = []
+    original = cache.compact
+    monkeypatch.setattr(cache, "compact", lambda: compactions.append(original()))
+
+    over_quota = 0
+    for key in keys[10:]:
+        evictions = cache.evictions
+        cache.store(_sample_chunk(key))
+        over_quota += cache.evictions > evictions
+
+    assert 1 <= len(compactions) < over_quota / 2
+    usage = cache.disk_usage() - cache._index.dead_bytes
+    assert usage <= cache.max_bytes
+    assert cache._index.dead_bytes <= cache.COMPACT_DEAD_FRACTION * cache._segment_bytes()
+    assert all(cache.contains(key) for key in keys[-3:])
+
+
+def test_cache_index_persists_across_reopen(tmp_path):
+    keys = [ChunkKey(latitude=0, longitude=index, level_of_detail=0) for index in range(3)]
+    with ChunkCache(tmp_path, max_bytes=10_000_000) as cache:
+        for key in keys:
+            cache.store(_sample_chunk(key))
+        cache.load(keys[1])
+        usage = cache.disk_usage()
+
+    reopened = ChunkCache(tmp_path, max_bytes=10_000_000, eviction="lfu")
+    assert reopened.disk_usage() == usage
+    assert reopened._index.get(keys[1]).hits == 1
+    assert reopened._index.eviction_order("lfu")[-1] == keys[1]
+
+
+def test_compaction_packs_entries_into_one_segment(tmp_path):
+    keys = [ChunkKey(latitude=lat, longitude=lon, level_of_detail=0) for lat in range(3) for lon in range(3)]
+    cache = ChunkCache(tmp_path, max_bytes=10_000_000)
+    for key in keys:
+        cache.store(_sample_chunk(key))
+    expected = {key: cache.load(key) for key in keys}
+
+    assert cache.compact() == len(keys)
+    cache.store(_sample_chunk(ChunkKey(latitude=9, longitude=9, level_of_detail=0)))
+    cache.evict(keys[0])
+    assert cache.compact() == len(keys)
+
+    assert list(tmp_path.glob("lat_*")) == []
+    assert len(list((tmp_path / "segments").glob("*.owrp"))) == 1
+    assert not cache.contains(keys[0])
+    for key in keys[1:]:
+        assert cache.load(key) == expected[key]
+        assert cache.load_metadata(key) == expected[key]["metadata"]
+    cache.close()
+
+    reopened = ChunkCache(tmp_path)
+    assert reopened.load(keys[4]) == expected[keys[4]]
+    reopened.close()
@@ -0,0 +1,129 @@
+import socket
+import threading
+import time
+
+import pytest
+
+from controls.input_profiles import InputEvent, StreamingTraversalController, WorkingSetPolicy, XboxControllerProfile
+from engine.streaming import (
+    ChunkCache,
+    ChunkKey,
+    ChunkLifecycleError,
+    ChunkServer,
+    ChunkServerError,
+    ChunkServerThread,
+    ChunkServiceClient,
+    ChunkStreamingService,
+    HeightfieldGenerator,
+)
+from engine.streaming.chunk_server import _FRAME, _KEY, _STATUS, MSG_REQUEST, STATUS_OK, _frame
+
+
+class _GatedService(ChunkStreamingService):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.gate = threading.Event()
+        self.loads = []
+
+    def _load_chunk(self, key):
+        self.loads.append(key)
+        self.gate.wait(timeout=5)
+        if key.latitude < 0:
+            raise ValueError(f"no data for {key}")
+        return super()._load_chunk(key)
+
+
+def _wait_for(predicate):
+    deadline = time.monotonic() + 5
+    while not predicate():
+        assert time.monotonic() < deadline
+        time.sleep(0.005)
+
+
+def test_clients_share_in_flight_loads(tmp_path):
+    service = _GatedService(max_workers=4)
+    server = ChunkServer(service, path=tmp_path / "chunks.sock")
+    keys = [ChunkKey(latitude=0, longitude=lon, level_of_detail=0) for lon in range(4)]
+    with ChunkServerThread(server) as address:
+        with ChunkServiceClient(address) as first, ChunkServiceClient(address) as second:
+            first_futures = first.request_many_async(keys)
+            second_futures = second.request_many_async(list(reversed(keys)))
+            _wait_for(lambda: server.stats.requests == 2 * len(keys))
+            service.gate.set()
+
+            first_chunks = [future.result(timeout=5) for future in first_futures]
+            second_chunks = [future.result(timeout=5) for future in second_futures]
+
+    assert sorted(service.loads, key=lambda key: key.longitude) == keys
+    assert server.stats.batches == 2
+    assert server.stats.coalesced == len(keys)
+    local = ChunkStreamingService()
+    for chunk in first_chunks:
+        assert chunk.payload == local.generate_chunk(chunk.key).payload
+    assert [chunk.payload for chunk in reversed(second_chunks)] == [chunk.payload for chunk in first_chunks]
+    assert not (tmp_path / "chunks.sock").exists()
+
+
+def test_client_reports_server_errors_and_lifecycle(tmp_path):
+    service = _GatedService()
+    service.gate.set()
+    with ChunkServerThread(ChunkServer(service)) as address:
+        assert isinstance(address, tuple)
+        with ChunkServiceClient(address) as client:
+            with pytest.raises(ChunkServerError, match="no data"):
+                client.request_chunk(ChunkKey(latitude=-1, longitude=0, level_of_detail=0))
+
+            key = ChunkKey(latitude=1, longitude=1, level_of_detail=0)
+            chunk = client.request_chunk(key)
+            assert client.is_loaded(key)
+            assert client.request_chunk_async(key).result() is chunk
+            assert client.unload_chunk(key) is chunk
+            assert not client.is_loaded(key)
+            with pytest.raises(ChunkLifecycleError):
+                client.unload_chunk(key)
+            assert not client.cancel_request(key)
+
+
+def test_concurrent_batches_on_one_connection_all_arrive(tmp_path):
+    pytest.importorskip("numpy")
+    service = ChunkStreamingService(heightfield=HeightfieldGenerator(cells=128), max_workers=4)
+    keys = [ChunkKey(latitude=lat, longitude=lon, level_of_detail=0) for lat in range(8) for lon in range(8)]
+    with ChunkServerThread(ChunkServer(service, path=tmp_path / "chunks.sock")) as address:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as raw:
+            raw.settimeout(5)
+            raw.connect(str(address))
+            for key in keys:
+                raw.sendall(_frame(MSG_REQUEST, _KEY.pack(key.latitude, key.longitude, key.level_of_detail)))
+            # Not reading yet fills the socket buffer, so batches wait on the writer together.
+            time.sleep(0.5)
+            stream = raw.makefile("rb")
+            answered = []
+            for _ in keys:
+                _kind, length = _FRAME.unpack(stream.read(_FRAME.size))
+                body = stream.read(length)
+                answered.append(ChunkKey(*_KEY.unpack_from(body)))
+                assert _STATUS.unpack_from(body, _KEY.size)[0] == STATUS_OK
+            stream.close()
+    service.shutdown()
+
+    assert set(answered) == set(keys) and len(answered) == len(keys)
+
+
+def test_controller_streams_through_client(tmp_path):
+    cache = ChunkCache(tmp_path / "cache", write_behind=True)
+    service = ChunkStreamingService(cache=cache, read_through=True, max_workers=2)
+    with ChunkServerThread(ChunkServer(service, path=tmp_path / "chunks.sock")) as address:
+        with ChunkServiceClient(address) as client:
+            controller = StreamingTraversalController(
+                client, ChunkKey(latitude=0, longitude=0, level_of_detail=0), working_set=WorkingSetPolicy(radius=1)
+            )
+            profile = XboxControllerProfile()
+            for _ in range(3):
+                key = controller.apply_events(profile, [InputEvent("xbox", "left_stick_right")])
+                controller.pending.result(timeout=5)
+                controller.end_frame()
+            assert key == ChunkKey(latitude=0, longitude=3, level_of_detail=0)
+            assert client.is_loaded(key)
+    service.shutdown()
+    cache.close()
+    assert cache.contains(key)
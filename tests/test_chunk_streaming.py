@@ -1,4 +1,19 @@
-from engine.streaming import ChunkKey, ChunkLifecycleError, ChunkStreamingService
+import pickle
+import threading
+
+import pytest
+
+from engine.streaming import (
+    ChunkCache,
+    ChunkKey,
+    ChunkLifecycleError,
+    ChunkResidencyManager,
+    ChunkStreamingService,
+    FeatureColumns,
+    HeightfieldGenerator,
+    StreamingScheduler,
+)
+from engine.streaming.residency import estimate_chunk_bytes
 
 
 def test_request_chunk_is_deterministic(tmp_path):
@@ -35,3 +50,172 @@ def test_unload_missing_chunk_raises():
         pass
     else:
         raise AssertionError("Expected ChunkLifecycleError for missing chunk")
+
+
+def test_read_through_serves_cached_chunk(tmp_path, monkeypatch):
+    cache = ChunkCache(tmp_path)
+    key = ChunkKey(latitude=3, longitude=4, level_of_detail=1)
+    original = ChunkStreamingService(cache=cache, read_through=True).request_chunk(key)
+
+    service = ChunkStreamingService(cache=cache, read_through=True)
+
+    def fail(_generator):
+        raise AssertionError("chunk should have been served from the cache")
+
+    monkeypatch.setattr(service, "_generate_features", fail)
+    restored = service.request_chunk(key)
+
+    assert restored.payload == original.payload
+    assert restored.metadata == original.metadata
+    assert restored.state.value == "loaded"
+
+    service.unload_chunk(key)
+    assert cache.contains(key)
+    assert service.request_chunk(key).payload == original.payload
+
+
+def test_read_through_regenerates_stale_entry(tmp_path):
+    cache = ChunkCache(tmp_path)
+    key = ChunkKey(latitude=5, longitude=6, level_of_detail=0)
+    service = ChunkStreamingService(cache=cache, read_through=True)
+    chunk = service.request_chunk(key)
+    chunk.payload["generator_version"] = ChunkStreamingService.GENERATOR_VERSION - 1
+    chunk.payload["features"] = []
+    cache.store(chunk)
+
+    fresh = ChunkStreamingService(cache=cache, read_through=True).request_chunk(key)
+
+    assert fresh.payload["features"]
+    assert fresh.payload["generator_version"] == ChunkStreamingService.GENERATOR_VERSION
+    assert cache.load(key)["payload"]["features"] == fresh.payload["features"]
+
+
+def test_residency_budget_evicts_least_recently_used(tmp_path):
+    cache = ChunkCache(tmp_path)
+    residency = ChunkResidencyManager(max_chunks=2)
+    service = ChunkStreamingService(cache=cache, read_through=True, residency=residency)
+    keys = [ChunkKey(latitude=idx, longitude=0, level_of_detail=0) for idx in range(3)]
+
+    service.request_chunk(keys[0])
+    service.request_chunk(keys[1])
+    service.request_chunk(keys[0])
+    service.request_chunk(keys[2])
+
+    assert set(service.get_loaded_chunks()) == {keys[0], keys[2]}
+    assert cache.contains(keys[1])
+    assert residency.stats.as_dict()["hits"] == 1
+    assert residency.stats.misses == 3
+    assert residency.stats.evictions == 1
+
+
+def test_residency_spills_outside_the_lock_and_counts_only_stored_chunks(tmp_path):
+    service = None
+    locked_out = []
+
+    def probe():
+        acquired = service._lock.acquire(timeout=1)
+        if acquired:
+            service._lock.release()
+        locked_out.append(not acquired)
+
+    class _ProbeCache(ChunkCache):
+        def store(self, chunk):
+            thread = threading.Thread(target=probe)
+            thread.start()
+            thread.join()
+            super().store(chunk)
+
+    residency = ChunkResidencyManager(max_chunks=1)
+    scheduler = StreamingScheduler(budget=1.0)
+    service = ChunkStreamingService(
+        cache=_ProbeCache(tmp_path), read_through=True, residency=residency, lod_pyramid=True, scheduler=scheduler
+    )
+    parent = ChunkKey(latitude=0, longitude=0, level_of_detail=1)
+    for child in parent.children():
+        service.request_chunk(child)
+    # Evicted before its queued write ran, so the scheduler spills it.
+    assert residency.stats.evictions == 3 and residency.stats.spills == 0
+    scheduler.drain()
+    assert residency.stats.spills == 3
+
+    assert service.request_chunk(parent).payload["lod_source"] == "aggregated"
+    service.request_chunk(ChunkKey(latitude=9, longitude=9, level_of_detail=0))
+    scheduler.drain()
+
+    # The aggregated parent is dropped but never written, so it is no spill.
+    assert residency.stats.spills == 3
+    assert not service.cache.contains(parent)
+    assert locked_out and not any(locked_out)
+
+
+def test_residency_charges_cached_heightfields_like_fresh_ones(tmp_path):
+    pytest.importorskip("numpy")
+    key = ChunkKey(latitude=2, longitude=3, level_of_detail=0)
+    cache = ChunkCache(tmp_path)
+    fresh = ChunkStreamingService(cache=cache, heightfield=HeightfieldGenerator(cells=64)).request_chunk(key)
+    warmed = ChunkStreamingService(
+        cache=cache, read_through=True, heightfield=HeightfieldGenerator(cells=64)
+    ).request_chunk(key)
+
+    assert warmed.payload["heightfield"].base is not None
+    grid_bytes = fresh.payload["heightfield"].nbytes
+    assert estimate_chunk_bytes(warmed) > grid_bytes
+    assert abs(estimate_chunk_bytes(warmed) - estimate_chunk_bytes(fresh)) < grid_bytes // 4
+
+
+def test_residency_drops_unloaded_entries():
+    residency = ChunkResidencyManager(max_bytes=10_000_000)
+    service = ChunkStreamingService(residency=residency)
+    key = ChunkKey(latitude=0, longitude=0, level_of_detail=0)
+
+    service.request_chunk(key)
+    assert residency.resident_bytes > 0
+    service.unload_chunk(key)
+
+    assert service.get_loaded_chunks() == {}
+    assert residency.resident_bytes == 0
+    assert residency.stats.drops == 1
+
+
+def test_packed_keys_round_trip_and_sort_by_lod_then_z_order():
+    keys = [
+        ChunkKey(latitude=lat, longitude=lon, level_of_detail=lod)
+        for lat in (-(1 << 28), -3, 0, 5, (1 << 28) - 1)
+        for lon in (-(1 << 28), -1, 0, 7, (1 << 28) - 1)
+        for lod in (0, 4, 31)
+    ]
+    packed = [key.pack() for key in keys]
+
+    assert [ChunkKey.unpack(value) for value in packed] == keys
+    assert all(0 <= value < 1 << 63 for value in packed)
+    assert len(set(packed)) == len(keys)
+    ordered = [ChunkKey.unpack(value) for value in sorted(packed)]
+    assert [key.level_of_detail for key in ordered] == sorted(key.level_of_detail for key in keys)
+    quad = [ChunkKey(latitude=lat, longitude=lon, level_of_detail=0) for lat in (0, 1) for lon in (0, 1)]
+    assert sorted(quad, key=ChunkKey.pack) == quad
+    with pytest.raises(ValueError):
+        ChunkKey(latitude=1 << 28, longitude=0, level_of_detail=0).pack()
+
+    key = keys[7]
+    assert pickle.loads(pickle.dumps(key)) == key
+    assert not hasattr(key, "__dict__")
+
+
+def test_compact_features_match_dict_features(tmp_path):
+    keys = [ChunkKey(latitude=0, longitude=lon, level_of_detail=0) for lon in range(4)]
+    plain = ChunkStreamingService()
+    compact = ChunkStreamingService(compact_features=True, cache=ChunkCache(tmp_path), read_through=True)
+
+    for expected, batched in zip(plain.generate_chunks(keys), compact.generate_chunks(keys)):
+        single = compact.request_chunk(expected.key)
+        assert isinstance(batched.payload["features"], FeatureColumns)
+        assert isinstance(single.payload["features"], FeatureColumns)
+        assert batched.payload["features"] == expected.payload["features"]
+        assert single.payload["features"] == expected.payload["features"]
+        assert list(single.payload["features"]) == expected.payload["features"]
+
+    reread = ChunkStreamingService(compact_features=True, cache=ChunkCache(tmp_path), read_through=True)
+    features = reread.request_chunk(keys[0]).payload["features"]
+    assert isinstance(features, FeatureColumns)
+    assert features[1] == plain.generate_chunk(keys[0]).payload["features"][1]
+    assert ChunkCache(tmp_path).load(keys[0])["payload"]["features"] == features
@@ -0,0 +1,310 @@
+import threading
+import time
+
+import pytest
+
+from data_ingest.open_maps import DataIngestPipeline, RegionRequest, StageConfig
+from data_ingest.open_maps.cli import parse_chunk_range
+from data_ingest.open_maps.stages import chain_stages
+from engine.streaming import ChunkCache, ChunkKey, ChunkStreamingService, HeightfieldGenerator, MeshPool
+from engine.streaming.mesh_pool import MeshPoolWriter, footprint_intersects
+
+
+def _run(tmp_path, monkeypatch, keys, name="test_region"):
+    monkeypatch.chdir(tmp_path)
+    pipeline = DataIngestPipeline(cache_dir=tmp_path / "chunks")
+    report = pipeline.run(RegionRequest(name=name, chunk_keys=keys))
+    return pipeline, report
+
+
+def test_chunks_reference_pooled_meshes_they_intersect(tmp_path, monkeypatch):
+    inside = ChunkKey(latitude=0, longitude=0, level_of_detail=0)
+    outside = ChunkKey(latitude=0, longitude=5, level_of_detail=0)
+    pipeline, report = _run(tmp_path, monkeypatch, [inside, outside])
+
+    counts = {entry["key"]["longitude"]: entry["mesh_count"] for entry in report["chunks"]}
+    assert counts == {0: 6, 5: 0}
+
+    stored = ChunkCache(tmp_path / "chunks").load(inside)
+    assert "meshes" not in stored["payload"]
+    pool = MeshPool.load(pipeline.mesh_pool_path("test_region"))
+    assert len(pool) == 6
+
+    service = ChunkStreamingService(cache=ChunkCache(tmp_path / "chunks"), read_through=True, mesh_pool=pool)
+    meshes = service.meshes_for(service.request_chunk(inside))
+    assert meshes[0] is pool.get(stored["payload"]["mesh_ids"][0])
+
+
+def test_interrupted_run_keeps_the_previous_mesh_pool(tmp_path, monkeypatch):
+    keys = [ChunkKey(latitude=0, longitude=0, level_of_detail=0)]
+    pipeline, _report = _run(tmp_path, monkeypatch, keys)
+    pool_path = pipeline.mesh_pool_path("test_region")
+    before = pool_path.read_bytes()
+
+    original = pipeline.extruder.extrude
+    calls = []
+
+    def fail_midway(**kwargs):
+        calls.append(kwargs)
+        if len(calls) == 3:
+            raise KeyboardInterrupt
+        return original(**kwargs)
+
+    monkeypatch.setattr(pipeline.extruder, "extrude", fail_midway)
+    with pytest.raises(KeyboardInterrupt):
+        pipeline.run(RegionRequest(name="test_region", chunk_keys=keys))
+
+    assert pool_path.read_bytes() == before
+    assert not list(pool_path.parent.glob("*.tmp"))
+
+
+def test_footprint_intersection_is_exact():
+    bounds = ChunkKey(latitude=0, longitude=0, level_of_detail=0).bounds()
+    # Diagonal sliver whose bounding box overlaps the tile corner but whose shape does not.
+    sliver = [(0.45, 0.7), (0.7, 0.45), (0.72, 0.47), (0.47, 0.72)]
+
+    assert not footprint_intersects(sliver, bounds)
+    assert footprint_intersects([(0.4, 0.4), (0.6, 0.4), (0.6, 0.6)], bounds)
+    assert footprint_intersects([(-1.0, -1.0), (1.0, -1.0), (1.0, 1.0), (-1.0, 1.0)], bounds)
+
+
+def test_coarse_chunks_receive_meshes_anywhere_in_their_extent(tmp_path):
+    mesh = {"height": 4.0, "footprint": [[0.8, 0.8], [1.2, 0.8], [1.2, 1.2], [0.8, 1.2]]}
+    keys = [
+        ChunkKey(latitude=0, longitude=0, level_of_detail=0),
+        ChunkKey(latitude=1, longitude=1, level_of_detail=0),
+        ChunkKey(latitude=0, longitude=0, level_of_detail=1),
+        ChunkKey(latitude=1, longitude=1, level_of_detail=1),
+    ]
+    writer = MeshPoolWriter(tmp_path / "meshes.jsonl")
+    try:
+        assignments = DataIngestPipeline._assign_meshes([mesh], keys, writer)
+    finally:
+        writer.close()
+
+    assert sorted(assignments, key=lambda key: key.level_of_detail) == [keys[1], keys[2]]
+
+
+def _tree_bytes(root):
+    return {
+        path.relative_to(root).as_posix(): path.read_bytes()
+        for path in sorted(root.rglob("*"))
+        if path.is_file()
+    }
+
+
+def test_parallel_ingest_is_byte_identical_to_serial(tmp_path, monkeypatch):
+    keys = parse_chunk_range("-1:1,0:2,0")
+    request = RegionRequest(name="parallel", chunk_keys=keys)
+    monkeypatch.chdir(tmp_path)
+
+    serial = DataIngestPipeline(cache_dir=tmp_path / "serial", package_dir=tmp_path / "serial_pkg")
+    parallel = DataIngestPipeline(cache_dir=tmp_path / "parallel", package_dir=tmp_path / "parallel_pkg")
+    serial_report = serial.run(request)
+    parallel_report = parallel.run(request, workers=2)
+
+    assert serial_report == parallel_report
+    assert _tree_bytes(tmp_path / "serial") == _tree_bytes(tmp_path / "parallel")
+    assert _tree_bytes(tmp_path / "serial_pkg") == _tree_bytes(tmp_path / "parallel_pkg")
+
+
+def test_parallel_ingest_matches_serial_with_a_heightfield(tmp_path, monkeypatch):
+    pytest.importorskip("numpy")
+    keys = parse_chunk_range("-1:1,0:2,0")
+    request = RegionRequest(name="terrain", chunk_keys=keys)
+    monkeypatch.chdir(tmp_path)
+
+    def pipeline(name):
+        service = ChunkStreamingService(heightfield=HeightfieldGenerator(seed=7, cells=4))
+        return DataIngestPipeline(
+            cache_dir=tmp_path / name, package_dir=tmp_path / f"{name}_pkg", streaming_service=service
+        )
+
+    serial = pipeline("serial")
+    parallel = pipeline("parallel")
+    assert serial.run(request) == parallel.run(request, workers=2)
+
+    assert "heightfield_id" in parallel.cache.load(keys[0])["payload"]
+    assert _tree_bytes(tmp_path / "serial") == _tree_bytes(tmp_path / "parallel")
+    assert _tree_bytes(tmp_path / "serial_pkg") == _tree_bytes(tmp_path / "parallel_pkg")
+
+
+def test_packaging_regenerates_chunks_the_cache_quota_evicted(tmp_path, monkeypatch):
+    keys = parse_chunk_range("0:0,0:7,0")
+    request = RegionRequest(name="quota", chunk_keys=keys)
+    monkeypatch.chdir(tmp_path)
+    unbounded = DataIngestPipeline(cache_dir=tmp_path / "full", package_dir=tmp_path / "full_pkg")
+    unbounded.run(request)
+    chunk_bytes = max(len(unbounded.cache.encoded(key)) for key in keys)
+
+    bounded = DataIngestPipeline(
+        cache_dir=tmp_path / "bounded", package_dir=tmp_path / "bounded_pkg", cache_max_bytes=3 * chunk_bytes
+    )
+    bounded.run(request)
+
+    assert bounded.cache.evictions > 0
+    assert not all(bounded.cache.contains(key) for key in keys)
+    assert bounded.pack_path("quota").read_bytes() == unbounded.pack_path("quota").read_bytes()
+
+
+def test_resume_skips_journaled_chunks(tmp_path, monkeypatch):
+    keys = parse_chunk_range("0:0,0:3,0")
+    monkeypatch.chdir(tmp_path)
+    pipeline = DataIngestPipeline(cache_dir=tmp_path / "chunks")
+    request = RegionRequest(name="resumable", chunk_keys=keys)
+
+    original_store = pipeline.cache.store
+
+    def interrupt_at_third_chunk(chunk):
+        if chunk.key == keys[2]:
+            raise KeyboardInterrupt
+        original_store(chunk)
+
+    monkeypatch.setattr(pipeline.cache, "store", interrupt_at_third_chunk)
+    with pytest.raises(KeyboardInterrupt):
+        pipeline.run(request)
+    assert pipeline.journal_path("resumable").exists()
+
+    resumed = []
+    monkeypatch.setattr(pipeline.cache, "store", lambda chunk: (resumed.append(chunk.key), original_store(chunk)))
+    report = pipeline.run(request)
+
+    assert list(dict.fromkeys(resumed)) == keys[2:]
+    assert [entry["key"]["longitude"] for entry in report["chunks"]] == [0, 1, 2, 3]
+    assert not pipeline.journal_path("resumable").exists()
+
+
+def test_no_resume_truncates_the_journal(tmp_path, monkeypatch):
+    keys = parse_chunk_range("0:0,0:3,0")
+    monkeypatch.chdir(tmp_path)
+    pipeline = DataIngestPipeline(cache_dir=tmp_path / "chunks")
+    request = RegionRequest(name="restart", chunk_keys=keys)
+    original_store = pipeline.cache.store
+
+    def interrupt_at(key):
+        def store(chunk):
+            if chunk.key == key:
+                raise KeyboardInterrupt
+            original_store(chunk)
+
+        return store
+
+    monkeypatch.setattr(pipeline.cache, "store", interrupt_at(keys[3]))
+    with pytest.raises(KeyboardInterrupt):
+        pipeline.run(request)
+    monkeypatch.setattr(pipeline.cache, "store", interrupt_at(keys[1]))
+    with pytest.raises(KeyboardInterrupt):
+        pipeline.run(request, resume=False)
+
+    # Header plus the one chunk finished by the restarted run.
+    assert len(pipeline.journal_path("restart").read_text().splitlines()) == 2
+
+
+def test_cli_range_parsing():
+    keys = parse_chunk_range("2:1,5:5,3")
+
+    assert keys == [
+        ChunkKey(latitude=1, longitude=5, level_of_detail=3),
+        ChunkKey(latitude=2, longitude=5, level_of_detail=3),
+    ]
+
+
+def test_streaming_stages_apply_backpressure():
+    produced = []
+
+    def source():
+        for idx in range(100):
+            produced.append(idx)
+            yield idx
+
+    stream = chain_stages(source(), [lambda items: (item * 2 for item in items)], queue_size=2)
+    first = next(stream)
+
+    assert first == 0
+    # Two bounded queues of two items each, plus one item held by each stage thread.
+    assert len(produced) <= 8
+    assert list(stream) == [item * 2 for item in range(1, 100)]
+
+
+def test_stage_threads_exit_when_the_consumer_stops_early():
+    def stage_threads():
+        return [thread for thread in threading.enumerate() if thread.name == "ingest-stage"]
+
+    def slow_source():
+        for idx in range(1000):
+            time.sleep(0.01)
+            yield idx
+
+    before = len(stage_threads())
+    stages = [lambda items: (item + 1 for item in items), lambda items: (item * 2 for item in items)]
+    stream = chain_stages(slow_source(), stages, queue_size=1)
+    assert next(stream) == 2
+    stream.close()
+
+    deadline = time.monotonic() + 5.0
+    while len(stage_threads()) > before and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert len(stage_threads()) == before
+
+
+def test_streaming_stages_propagate_errors():
+    def explode(items):
+        for item in items:
+            if item == 3:
+                raise ValueError("bad record")
+            yield item
+
+    with pytest.raises(ValueError, match="bad record"):
+        list(chain_stages(iter(range(10)), [explode], queue_size=1))
+
+
+def test_synchronous_stages_match_threaded_output(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    keys = parse_chunk_range("0:0,-1:1,0")
+    request = RegionRequest(name="a", chunk_keys=keys)
+    threaded = DataIngestPipeline(
+        cache_dir=tmp_path / "threaded", stage_config=StageConfig(queue_size=1, batch_size=2)
+    )
+    inline = DataIngestPipeline(cache_dir=tmp_path / "inline", stage_config=StageConfig(queue_size=0))
+
+    assert threaded.run(request) == inline.run(request)
+    assert _tree_bytes(tmp_path / "threaded") == _tree_bytes(tmp_path / "inline")
+
+
+def test_incremental_rerun_skips_unchanged_chunks(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    keys = parse_chunk_range("0:0,0:2,0")
+    pipeline = DataIngestPipeline(cache_dir=tmp_path / "chunks")
+    stores = []
+    original_store = pipeline.cache.store
+    monkeypatch.setattr(pipeline.cache, "store", lambda chunk: (stores.append(chunk.key), original_store(chunk)))
+
+    first = pipeline.run(RegionRequest(name="nightly", chunk_keys=keys))
+    assert stores == keys
+
+    stores.clear()
+    assert pipeline.run(RegionRequest(name="nightly", chunk_keys=keys)) == first
+    assert stores == []
+    assert pipeline.written_chunks == []
+
+    pipeline.cache.evict(keys[1])
+    pipeline.run(RegionRequest(name="nightly", chunk_keys=keys))
+    assert stores == [keys[1]]
+
+    stores.clear()
+    pipeline.run(RegionRequest(name="nightly", chunk_keys=keys, zoning_policy="residential"))
+    assert stores == keys
+
+
+def test_pipeline_writes_region_pack(tmp_path, monkeypatch):
+    keys = [ChunkKey(latitude=0, longitude=lon, level_of_detail=0) for lon in range(3)]
+    pipeline, _report = _run(tmp_path, monkeypatch, keys)
+
+    service = ChunkStreamingService()
+    pack = service.mount_pack(pipeline.pack_path("test_region"))
+    try:
+        assert sorted(pack.keys(), key=lambda key: key.longitude) == keys
+        for key in keys:
+            assert service.request_chunk(key).payload == pipeline.cache.load(key)["payload"]
+    finally:
+        service.unmount_packs()
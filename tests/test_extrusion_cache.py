@@ -0,0 +1,46 @@
+from procedural.buildings import BuildingExtruder, ExtrusionCache, FidelityHookRegistry, LODPolicy
+
+
+def test_extrusion_cache_reuses_repeated_footprints_and_hooks():
+    calls = []
+
+    def hook(footprint, zoning, height):
+        calls.append(footprint)
+        return {"height": height, "tags": ["roof"]}
+
+    cache = ExtrusionCache(max_entries=2)
+    extruder = BuildingExtruder(FidelityHookRegistry(halo_ultra_hd_hook=hook), cache=cache)
+    plain = BuildingExtruder(FidelityHookRegistry(halo_ultra_hd_hook=hook))
+    square = [(0, 0), (4, 0), (4, 4), (0, 4)]
+    policy = LODPolicy.HALO_INFINITE_ULTRA_HD
+
+    first = extruder.extrude(square, "residential", policy)
+    second = extruder.extrude([tuple(map(float, point)) for point in square], "residential", policy)
+    second["fidelity"]["tags"].append("mutated")
+
+    assert len(calls) == 1
+    assert extruder.extrude(square, "residential", policy) == first == plain.extrude(square, "residential", policy)
+    assert cache.stats.as_dict() == {"hits": 2, "misses": 1, "evictions": 0, "hit_rate": round(2 / 3, 4)}
+
+    extruder.extrude(square, "commercial", policy)
+    extruder.extrude(square, "industrial", policy)
+    assert len(cache) == 2 and cache.stats.evictions == 1
+
+
+def test_translation_invariant_cache_shares_archetypes_and_persists(tmp_path):
+    path = tmp_path / "extrusions.json"
+    cache = ExtrusionCache(path=path, translation_invariant=True)
+    extruder = BuildingExtruder(cache=cache)
+    row = [[(x, 0.0), (x + 5.0, 0.0), (x + 5.0, 8.0), (x, 8.0)] for x in (0.0, 5.0, 10.0)]
+
+    meshes = [extruder.extrude(footprint, "residential", LODPolicy.HIGH) for footprint in row]
+
+    assert cache.stats.hits == 2
+    assert [mesh["footprint"] for mesh in meshes] == row
+    cache.save()
+
+    reloaded = ExtrusionCache(path=path, translation_invariant=True)
+    mesh = BuildingExtruder(cache=reloaded).extrude(row[1], "residential", LODPolicy.HIGH)
+    assert reloaded.stats.hits == 1
+    assert mesh == meshes[1]
+    assert len(ExtrusionCache(path=path)) == 0
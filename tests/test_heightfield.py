@@ -0,0 +1,104 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from engine.streaming import (  # noqa: E402
+    ChunkCache,
+    ChunkKey,
+    ChunkStreamingService,
+    HeightfieldGenerator,
+    heightfield_mip,
+    heightfield_mips,
+)
+from engine.streaming.chunk_format import ENCODING_RAW, HEIGHTFIELD_SECTION  # noqa: E402
+
+
+def test_neighbouring_edges_match_exactly():
+    generator = HeightfieldGenerator(seed=7, cells=16)
+    for lod in (0, 2):
+        center = generator.generate(ChunkKey(latitude=-1, longitude=-1, level_of_detail=lod))
+        east = generator.generate(ChunkKey(latitude=-1, longitude=0, level_of_detail=lod))
+        north = generator.generate(ChunkKey(latitude=0, longitude=-1, level_of_detail=lod))
+
+        assert center.shape == (17, 17)
+        assert center.dtype == np.float32
+        assert np.array_equal(center[:, -1], east[:, 0])
+        assert np.array_equal(center[-1, :], north[0, :])
+        assert 0.0 <= center.min() and center.max() < 1250.0
+        assert center.std() > 0.0
+
+
+def test_grid_corners_sit_on_tile_bounds():
+    generator = HeightfieldGenerator(cells=8)
+    keys = [
+        ChunkKey(latitude=0, longitude=0, level_of_detail=0),
+        ChunkKey(latitude=-2, longitude=3, level_of_detail=1),
+        ChunkKey(latitude=1, longitude=-1, level_of_detail=3),
+    ]
+
+    ys, xs = generator._lattice(keys)
+
+    for key, rows, columns in zip(keys, ys, xs):
+        min_x, min_y, max_x, max_y = key.bounds()
+        assert (columns[0] / 8, rows[0] / 8) == (min_x, min_y)
+        assert (columns[-1] / 8, rows[-1] / 8) == (max_x, max_y)
+    with pytest.raises(ValueError):
+        HeightfieldGenerator(cells=1)
+
+
+def test_coarse_tiles_and_mips_agree_with_fine_samples():
+    generator = HeightfieldGenerator(seed=3, cells=16)
+    coarse_key = ChunkKey(latitude=2, longitude=-3, level_of_detail=1)
+    fine = generator.generate(ChunkKey(latitude=4, longitude=-6, level_of_detail=0))
+    coarse = generator.generate(coarse_key)
+
+    # The fine tile is the coarse tile's south-west child.
+    assert np.array_equal(heightfield_mip(fine, 1), coarse[:9, :9])
+    assert np.array_equal(heightfield_mip(coarse, 2), HeightfieldGenerator(seed=3, cells=4).generate(coarse_key))
+    assert [mip.shape[0] for mip in heightfield_mips(fine)] == [17, 9, 5, 3, 2]
+    with pytest.raises(ValueError):
+        heightfield_mip(fine, 5)
+
+
+def test_batch_generation_matches_single_keys():
+    generator = HeightfieldGenerator(seed=11, cells=8)
+    keys = [
+        ChunkKey(latitude=0, longitude=0, level_of_detail=0),
+        ChunkKey(latitude=-3, longitude=5, level_of_detail=1),
+        ChunkKey(latitude=9, longitude=-2, level_of_detail=3),
+    ]
+
+    batch = generator.generate_many(keys)
+
+    assert batch.shape == (3, 9, 9)
+    for key, grid in zip(keys, batch):
+        assert np.array_equal(grid, generator.generate(key))
+
+    service = ChunkStreamingService(heightfield=generator)
+    for chunk in service.generate_chunks(keys):
+        assert np.array_equal(chunk.payload["heightfield"], service.generate_chunk(chunk.key).payload["heightfield"])
+
+
+def test_heightfield_is_cached_as_raw_section(tmp_path):
+    generator = HeightfieldGenerator(cells=8)
+    cache = ChunkCache(tmp_path / "cache")
+    service = ChunkStreamingService(cache=cache, read_through=True, heightfield=generator)
+    key = ChunkKey(latitude=1, longitude=2, level_of_detail=0)
+    expected = service.request_chunk(key).payload["heightfield"]
+
+    with cache.open(key) as chunk_file:
+        assert chunk_file.sections[HEIGHTFIELD_SECTION].encoding == ENCODING_RAW
+        assert len(chunk_file.raw_section(HEIGHTFIELD_SECTION)) == 9 * 9 * 4
+        assert "heightfield" not in chunk_file.section("payload")
+
+    reloaded = ChunkStreamingService(cache=cache, read_through=True, heightfield=generator).request_chunk(key)
+    assert np.array_equal(reloaded.payload["heightfield"], expected)
+
+    # Different settings invalidate the cached grid.
+    other = ChunkStreamingService(cache=cache, read_through=True, heightfield=HeightfieldGenerator(cells=4))
+    assert other.request_chunk(key).payload["heightfield"].shape == (5, 5)
+
+    debug = ChunkCache(tmp_path / "json", codec="json")
+    ChunkStreamingService(cache=debug, heightfield=generator).request_chunk(key)
+    restored = ChunkStreamingService(cache=debug, read_through=True, heightfield=generator).request_chunk(key)
+    assert np.array_equal(restored.payload["heightfield"], expected)
@@ -0,0 +1,87 @@
+import json
+
+from benchmarks.__main__ import main
+from benchmarks.loadtest import MOVEMENT_PATTERNS, LoadTestConfig, run_load_test, synthesize_recording
+from controls.input_profiles import (
+    InputEvent,
+    InputRecording,
+    MouseKeyboardProfile,
+    StreamingTraversalController,
+    WorkingSetPolicy,
+)
+from engine.streaming import ChunkKey, ChunkStreamingService
+
+SMALL = LoadTestConfig(players=4, frames=24, fps=0, move_every=2, sample_every=8)
+
+
+def test_synthesized_input_round_trips_through_a_recording(tmp_path):
+    recording = synthesize_recording(SMALL)
+    path = tmp_path / "input.jsonl"
+    recording.save(path)
+
+    loaded = InputRecording.load(path)
+
+    assert loaded == recording
+    assert loaded.frame_count == 24
+    assert {track.profile for track in loaded.tracks} == {"keyboard", "xbox"}
+    for track in loaded.tracks:
+        profile = track.make_profile()
+        moves = [profile.translate(event) for frame in track.frames for event in frame]
+        assert len(moves) == 12
+        assert all(move.startswith("move_") for move in moves)
+    # Every pattern moves each player somewhere different.
+    assert len({str(track.frames) for track in loaded.tracks}) == len(MOVEMENT_PATTERNS)
+
+
+def test_load_test_reports_latency_throughput_and_growth(tmp_path):
+    report = run_load_test(SMALL, tmp_path / "cache")
+
+    latency = report["latency_ms"]
+    assert latency["count"] + latency["cancelled"] == 4 * 12
+    assert latency["p50"] <= latency["p95"] <= latency["p99"] <= latency["max"]
+    assert report["chunks_loaded"] > 0 and report["chunks_per_second"] > 0
+    assert report["cache_bytes"]["growth"] > 0
+    assert [point["frame"] for point in report["timeline"]] == [0, 8, 16, 24, 24]
+    assert report["timeline"][-1]["cache_bytes"] == report["cache_bytes"]["end"]
+    assert json.loads(json.dumps(report)) == report
+
+    # A second run over the same cache directory is served from disk.
+    replay = run_load_test(SMALL, tmp_path / "cache", synthesize_recording(SMALL))
+    assert replay["final_positions"] == report["final_positions"]
+    assert replay["cache_bytes"]["growth"] < report["cache_bytes"]["growth"]
+
+
+def test_cli_records_and_replays(tmp_path, capsys):
+    recording = tmp_path / "input.jsonl"
+    first = tmp_path / "first.json"
+    second = tmp_path / "second.json"
+    common = ["loadtest", "--frames", "12", "--fps", "0", "--move-every", "3"]
+
+    assert main([*common, "--players", "2", "--pattern", "spiral", "--record", str(recording), "--output", str(first)]) == 0
+    assert main([*common, "--replay", str(recording), "--budget-ms", "2", "--output", str(second)]) == 0
+
+    assert "availability p50" in capsys.readouterr().out
+    first_report = json.loads(first.read_text())
+    second_report = json.loads(second.read_text())
+    assert second_report["players"] == 2
+    assert second_report["final_positions"] == first_report["final_positions"]
+    assert second_report["scheduler"]["executed"] > 0
+
+
+def test_players_sharing_a_service_keep_each_others_tiles():
+    service = ChunkStreamingService()
+    policy = WorkingSetPolicy(radius=1, lookahead=0, hysteresis=0)
+    origin = ChunkKey(latitude=0, longitude=0, level_of_detail=0)
+    walker = StreamingTraversalController(service, origin, working_set=policy)
+    stayer = StreamingTraversalController(service, origin, working_set=policy)
+    keyboard = MouseKeyboardProfile()
+
+    stayer.apply_events(keyboard, [InputEvent("keyboard", "d")])
+    stayer.pending.result()
+    for _ in range(4):
+        walker.apply_events(keyboard, [InputEvent("keyboard", "a")])
+        walker.pending.result()
+
+    # The walker left (0, 1) behind, but the stayer still stands on it.
+    assert service.is_loaded(ChunkKey(latitude=0, longitude=1, level_of_detail=0))
+    assert walker.metrics.unloads > 0
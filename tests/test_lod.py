@@ -0,0 +1,95 @@
+from engine.streaming import ChunkCache, ChunkKey, ChunkStreamingService, LODRing, LODSelector
+from engine.streaming.lod import lod0_distance, lod0_extent
+
+
+def _covered(keys):
+    tiles = []
+    for key in keys:
+        lat_min, lat_max, lon_min, lon_max = lod0_extent(key)
+        tiles.extend((lat, lon) for lat in range(lat_min, lat_max + 1) for lon in range(lon_min, lon_max + 1))
+    return tiles
+
+
+def test_selector_tiles_area_without_overlap_and_coarsens_with_distance():
+    selector = LODSelector(
+        [LODRing(radius=2, level_of_detail=0), LODRing(radius=6, level_of_detail=1), LODRing(radius=14, level_of_detail=3)]
+    )
+    center = ChunkKey(latitude=5, longitude=-3, level_of_detail=0)
+
+    keys = selector.select(center)
+    tiles = _covered(keys)
+
+    covered = set(tiles)
+    assert len(tiles) == len(covered)
+    for dlat in range(-14, 15):
+        for dlon in range(-14, 15):
+            assert (center.latitude + dlat, center.longitude + dlon) in covered
+    for key in keys:
+        assert key.level_of_detail <= selector.level_for_distance(lod0_distance(center, key))
+    assert keys[0] == center
+    finest = {(key.latitude, key.longitude) for key in keys if key.level_of_detail == 0}
+    assert all(
+        (center.latitude + dlat, center.longitude + dlon) in finest for dlat in range(-2, 3) for dlon in range(-2, 3)
+    )
+    assert len(keys) < 29 * 29 // 4
+
+
+def test_selector_rejects_rings_that_get_finer_outward():
+    try:
+        LODSelector([LODRing(radius=2, level_of_detail=1), LODRing(radius=6, level_of_detail=0)])
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("expected ValueError")
+
+
+def test_bounds_cover_the_level_zero_tiles_of_a_key():
+    assert ChunkKey(latitude=2, longitude=-1, level_of_detail=0).bounds() == (-1.5, 1.5, -0.5, 2.5)
+    coarse = ChunkKey(latitude=1, longitude=-1, level_of_detail=2)
+    assert coarse.bounds() == (-4.5, 3.5, -0.5, 7.5)
+
+    corners = [child.bounds() for child in coarse.children()]
+    assert min(bounds[0] for bounds in corners) == coarse.bounds()[0]
+    assert max(bounds[3] for bounds in corners) == coarse.bounds()[3]
+
+
+def test_coarse_tile_aggregates_resident_children():
+    service = ChunkStreamingService(lod_pyramid=True)
+    parent = ChunkKey(latitude=3, longitude=-2, level_of_detail=1)
+    children = service.request_many(parent.children())
+
+    coarse = service.request_chunk(parent)
+
+    assert coarse.payload["lod_source"] == "aggregated"
+    expected_elevation = round(sum(child.metadata["elevation"] for child in children) / 4, 3)
+    assert coarse.metadata["elevation"] == expected_elevation
+    densities = sorted(
+        (feature["resource_density"] for child in children for feature in child.payload["features"]), reverse=True
+    )
+    assert [feature["resource_density"] for feature in coarse.payload["features"]] == densities[:5]
+    assert [feature["id"] for feature in coarse.payload["features"]] == list(range(5))
+
+
+def test_aggregated_tiles_are_not_persisted(tmp_path):
+    cache = ChunkCache(tmp_path)
+    service = ChunkStreamingService(cache=cache, read_through=True, lod_pyramid=True)
+    parent = ChunkKey(latitude=1, longitude=1, level_of_detail=1)
+    service.request_many(parent.children())
+
+    assert service.request_chunk(parent).payload["lod_source"] == "aggregated"
+    assert not cache.contains(parent)
+
+    # A fresh service without the children generates the tile instead.
+    cold = ChunkStreamingService(cache=ChunkCache(tmp_path), read_through=True)
+    assert "lod_source" not in cold.request_chunk(parent).payload
+
+
+def test_coarse_tile_is_generated_when_children_are_missing():
+    service = ChunkStreamingService(lod_pyramid=True)
+    parent = ChunkKey(latitude=0, longitude=0, level_of_detail=2)
+    service.request_chunk(parent.children()[0])
+
+    coarse = service.request_chunk(parent)
+
+    assert "lod_source" not in coarse.payload
+    assert coarse.payload == ChunkStreamingService().generate_chunk(parent).payload
@@ -0,0 +1,195 @@
+import pytest
+
+from controls.input_profiles import InputEvent, MouseKeyboardProfile, StreamingTraversalController, WorkingSetPolicy
+from engine.streaming import ChunkCache, ChunkKey, ChunkStreamingService, StreamingScheduler
+from engine.streaming.scheduler import WORK_LOAD, WORK_UNLOAD, WORK_WRITE
+from engine.telemetry import MetricsRegistry
+
+
+def _key(lat, lon, lod=0):
+    return ChunkKey(latitude=lat, longitude=lon, level_of_detail=lod)
+
+
+class _FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _work(clock, log, name, cost=0.001):
+    def action():
+        clock.now += cost
+        log.append(name)
+        return name
+
+    return action
+
+
+def test_tick_respects_budget_and_reports_overruns():
+    clock = _FakeClock()
+    metrics = MetricsRegistry()
+    scheduler = StreamingScheduler(budget=0.002, clock=clock, metrics=metrics)
+    log = []
+    futures = [scheduler.submit(WORK_LOAD, _key(0, lon), _work(clock, log, lon)) for lon in range(5)]
+
+    assert scheduler.tick() == 2
+    assert scheduler.depth() == 3
+    assert scheduler.stats.overruns == 0
+    assert [future.result() for future in futures[:2]] == [0, 1]
+    assert not futures[2].done()
+
+    scheduler.submit(WORK_WRITE, _key(0, 9), _work(clock, log, "slow", cost=0.005))
+    assert scheduler.drain() == 4
+    assert scheduler.stats.overruns == 1
+    assert scheduler.stats.max_depth == 5
+    assert metrics.counter_value("scheduler_overruns_total") == 1
+    assert metrics.snapshot()["gauges"]
+
+
+def test_work_is_ordered_by_kind_and_distance_from_focus():
+    clock = _FakeClock()
+    scheduler = StreamingScheduler(budget=1.0, clock=clock)
+    scheduler.set_focus(_key(0, 0))
+    log = []
+    for lon in (3, 1, 2):
+        scheduler.submit(WORK_LOAD, _key(0, lon), _work(clock, log, f"load{lon}"))
+    scheduler.submit(WORK_WRITE, _key(0, 0), _work(clock, log, "write0"))
+    for lon in (5, 8):
+        scheduler.submit(WORK_UNLOAD, _key(0, lon), _work(clock, log, f"unload{lon}"))
+    # A level-1 tile covering the focus is as close as the focus itself.
+    scheduler.submit(WORK_LOAD, _key(0, 0, lod=1), _work(clock, log, "coarse"))
+
+    scheduler.tick()
+
+    assert log == ["unload8", "unload5", "coarse", "load1", "load2", "load3", "write0"]
+
+    scheduler.set_focus(_key(0, 3))
+    for lon in (0, 2):
+        scheduler.submit(WORK_LOAD, _key(0, lon), _work(clock, log, f"again{lon}"))
+    scheduler.tick()
+    assert log[-2:] == ["again2", "again0"]
+
+
+def test_stale_loads_are_dropped_and_duplicates_coalesced():
+    clock = _FakeClock()
+    scheduler = StreamingScheduler(budget=1.0, drop_distance=2, clock=clock)
+    scheduler.set_focus(_key(0, 0), owner="a")
+    scheduler.set_focus(_key(0, 10), owner="b")
+    log = []
+    near = scheduler.submit(WORK_LOAD, _key(0, 9), _work(clock, log, "first"))
+    assert scheduler.submit(WORK_LOAD, _key(0, 9), _work(clock, log, "second")) is near
+    far = scheduler.submit(WORK_LOAD, _key(0, 5), _work(clock, log, "far"))
+    unload = scheduler.submit(WORK_UNLOAD, _key(0, 1), _work(clock, log, "unload"))
+    scheduler.submit(WORK_LOAD, _key(0, 1), _work(clock, log, "reload"))
+
+    scheduler.tick()
+
+    assert log == ["second", "reload"]
+    assert far.cancelled() and unload.cancelled()
+    assert scheduler.stats.dropped == 1
+    assert scheduler.stats.coalesced == 1
+    assert scheduler.stats.cancelled == 1
+    with pytest.raises(ValueError):
+        scheduler.submit("explode", _key(0, 0), lambda: None)
+
+
+def _scheduled_controller():
+    service = ChunkStreamingService()
+    scheduler = StreamingScheduler(budget=1.0)
+    controller = StreamingTraversalController(
+        service,
+        _key(0, 0),
+        working_set=WorkingSetPolicy(radius=1, lookahead=0, hysteresis=0),
+        scheduler=scheduler,
+    )
+    return service, scheduler, controller
+
+
+def _resident(service):
+    return sorted((key.longitude, key.latitude) for key in service.get_loaded_chunks() if service.is_loaded(key))
+
+
+def test_controller_queues_loads_and_unloads_on_scheduler():
+    service, scheduler, controller = _scheduled_controller()
+    keyboard = MouseKeyboardProfile()
+
+    assert scheduler.depth(WORK_LOAD) == 8
+    assert not service.get_loaded_chunks()
+    scheduler.tick()
+
+    for _ in range(3):
+        controller.apply_event(keyboard, InputEvent("keyboard", "d"))
+    assert scheduler.depth(WORK_LOAD) == 9
+    assert scheduler.depth(WORK_UNLOAD) == 9
+    assert not controller.pending.done()
+
+    scheduler.tick()
+
+    assert controller.pending.result() is service.get_chunk(_key(0, 3))
+    # The origin was never requested, so only eight unloads find a chunk.
+    assert controller.metrics.unloads == 8
+    assert len(scheduler) == 0
+    assert _resident(service) == [(lon, lat) for lon in (2, 3, 4) for lat in (-1, 0, 1)]
+
+
+def test_controller_cancels_queued_work_when_turning_back():
+    service, scheduler, controller = _scheduled_controller()
+    keyboard = MouseKeyboardProfile()
+    scheduler.tick()
+
+    controller.apply_event(keyboard, InputEvent("keyboard", "d"))
+    assert controller.pending.done()  # Already resident.
+    controller.apply_event(keyboard, InputEvent("keyboard", "a"))
+
+    # The eastern column never loads and the western one is never unloaded.
+    assert controller.metrics.cancellations == 3
+    assert scheduler.depth(WORK_UNLOAD) == 0
+    scheduler.tick()
+    assert controller.metrics.unloads == 0
+    assert _resident(service) == [(lon, lat) for lon in (-1, 0, 1) for lat in (-1, 0, 1)]
+
+
+def test_shared_pending_load_survives_another_controller_leaving():
+    service = ChunkStreamingService()
+    scheduler = StreamingScheduler(budget=1.0)
+    policy = WorkingSetPolicy(radius=1, lookahead=0, hysteresis=0)
+    first = StreamingTraversalController(service, _key(0, 0), working_set=policy, scheduler=scheduler)
+    second = StreamingTraversalController(service, _key(0, 3), working_set=policy, scheduler=scheduler)
+    keyboard = MouseKeyboardProfile()
+
+    for _ in range(2):
+        first.apply_event(keyboard, InputEvent("keyboard", "d"))
+    # Both controllers now share the queued load of (0, 2); the second walks away.
+    for _ in range(2):
+        second.apply_event(keyboard, InputEvent("keyboard", "d"))
+    scheduler.tick()
+
+    assert not first.pending.cancelled()
+    assert first.pending.result() is service.get_chunk(_key(0, 2))
+    assert service.is_loaded(_key(0, 2))
+
+
+def test_cache_writes_are_queued_as_write_work(tmp_path):
+    cache = ChunkCache(tmp_path / "cache")
+    scheduler = StreamingScheduler(budget=1.0)
+    service = ChunkStreamingService(cache=cache, scheduler=scheduler)
+
+    service.request_chunk(_key(0, 0))
+
+    assert scheduler.depth(WORK_WRITE) == 1
+    assert not cache.contains(_key(0, 0))
+    scheduler.drain()
+    assert cache.contains(_key(0, 0))
+
+
+def test_tick_does_not_swallow_interrupts():
+    scheduler = StreamingScheduler(budget=1.0)
+
+    def interrupt():
+        raise KeyboardInterrupt
+
+    scheduler.submit(WORK_LOAD, _key(0, 0), interrupt)
+    with pytest.raises(KeyboardInterrupt):
+        scheduler.tick()
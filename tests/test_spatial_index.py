@@ -0,0 +1,62 @@
+import random
+
+from engine.streaming import ChunkKey, ChunkSpatialIndex, ChunkStreamingService
+from engine.streaming.spatial_index import morton_decode, morton_encode
+
+
+def _populated(seed=3, count=300, spread=40):
+    rng = random.Random(seed)
+    keys = {
+        ChunkKey(latitude=rng.randint(-spread, spread), longitude=rng.randint(-spread, spread), level_of_detail=0)
+        for _ in range(count)
+    }
+    index = ChunkSpatialIndex()
+    for key in keys:
+        index.add(key)
+    return index, keys
+
+
+def _dist(a, b):
+    return (a.latitude - b.latitude) ** 2 + (a.longitude - b.longitude) ** 2
+
+
+def test_morton_round_trip_preserves_coordinates():
+    for lat, lon in [(0, 0), (-1, 5), (123456, -98765), (-(2**31), 2**31 - 1)]:
+        assert morton_decode(morton_encode(lat, lon)) == (lat, lon)
+
+
+def test_box_and_radius_queries_match_brute_force():
+    index, keys = _populated()
+
+    for box in [(-5, 5, -5, 5), (-40, 40, 0, 40), (10, 10, -40, 40)]:
+        expected = {
+            key for key in keys if box[0] <= key.latitude <= box[1] and box[2] <= key.longitude <= box[3]
+        }
+        assert set(index.query_box(0, *box)) == expected
+
+    center = ChunkKey(latitude=3, longitude=-4, level_of_detail=0)
+    assert set(index.query_radius(center, 7.5)) == {key for key in keys if _dist(center, key) <= 56.25}
+
+
+def test_nearest_matches_brute_force():
+    index, keys = _populated(seed=11, count=60, spread=100)
+    center = ChunkKey(latitude=0, longitude=0, level_of_detail=0)
+
+    expected = sorted(keys, key=lambda key: (_dist(center, key), key.latitude, key.longitude))[:7]
+    assert index.nearest(center, 7) == expected
+    assert len(index.nearest(center, 500)) == len(keys)
+
+
+def test_service_keeps_index_in_sync_and_links_lods():
+    service = ChunkStreamingService()
+    child = ChunkKey(latitude=-3, longitude=5, level_of_detail=0)
+    parent = child.parent()
+
+    service.request_many([child, parent])
+    assert service.spatial_index.parent_of(child) == parent
+    assert service.spatial_index.children_of(parent) == [child]
+
+    service.unload_chunk(child)
+    assert child not in service.spatial_index
+    assert service.spatial_index.children_of(parent) == []
+    service.shutdown()
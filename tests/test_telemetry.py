@@ -0,0 +1,90 @@
+import json
+
+from controls.input_profiles import InputEvent, MouseKeyboardProfile, StreamingTraversalController
+from data_ingest.open_maps import DataIngestPipeline, RegionRequest
+from engine.streaming import ChunkCache, ChunkKey, ChunkStreamingService
+from engine.telemetry import InMemorySink, JsonLogSink, MetricsRegistry, PeriodicExporter, PrometheusTextSink
+
+
+def _key(lat, lon):
+    return ChunkKey(latitude=lat, longitude=lon, level_of_detail=0)
+
+
+def test_service_and_cache_record_requests_latency_and_bytes(tmp_path):
+    metrics = MetricsRegistry(trace_capacity=8)
+    cache = ChunkCache(tmp_path, metrics=metrics)
+    service = ChunkStreamingService(cache=cache, read_through=True, metrics=metrics)
+
+    service.request_chunk(_key(0, 0))
+    service.request_chunk(_key(0, 0))
+    ChunkStreamingService(cache=cache, read_through=True, metrics=metrics).request_chunk(_key(0, 0))
+
+    assert metrics.counter_value("chunk_requests_total", outcome="load") == 2
+    assert metrics.counter_value("chunk_requests_total", outcome="resident") == 1
+    assert metrics.counter_value("chunk_cache_lookups_total", result="miss") == 1
+    assert metrics.counter_value("chunk_cache_lookups_total", result="hit") == 1
+    assert metrics.histogram("chunk_generate_seconds").count == 1
+    assert metrics.histogram("chunk_cache_write_seconds").count == 1
+    written = metrics.counter_value("chunk_cache_bytes_written_total", codec="binary")
+    assert written == cache._path_for(_key(0, 0)).stat().st_size
+    assert metrics.counter_value("chunk_cache_bytes_read_total", codec="binary") == written
+    assert [span.name for span in metrics.spans()][:2] == ["chunk_cache_read_seconds", "chunk_generate_seconds"]
+
+
+def test_pipeline_records_every_stage(tmp_path):
+    metrics = MetricsRegistry()
+    pipeline = DataIngestPipeline(cache_dir=tmp_path / "chunks", package_dir=tmp_path / "packages", metrics=metrics)
+
+    pipeline.run(RegionRequest(name="metered", chunk_keys=[_key(0, 0), _key(0, 1)]))
+
+    for stage in ("download", "normalize", "populate", "package"):
+        assert metrics.histogram("pipeline_stage_seconds", stage=stage).count >= 1
+    assert metrics.counter_value("pipeline_stage_records_total", stage="download") == 6
+    assert metrics.counter_value("pipeline_stage_records_total", stage="normalize") == 6
+    assert metrics.counter_value("pipeline_stage_records_total", stage="populate") == 2
+    assert metrics.counter_value("chunk_cache_bytes_written_total", codec="binary") > 0
+
+
+def test_controller_frames_and_sinks(tmp_path):
+    metrics = MetricsRegistry()
+    service = ChunkStreamingService()
+    controller = StreamingTraversalController(service, _key(0, 0), telemetry=metrics)
+    keyboard = MouseKeyboardProfile()
+
+    controller.apply_event(keyboard, InputEvent("keyboard", "d"))
+    controller.apply_event(keyboard, InputEvent("keyboard", "q"))
+    controller.end_frame()
+    controller.end_frame()
+    controller.pending.result(timeout=5)
+    service.shutdown()
+
+    frames = metrics.histogram("traversal_events_per_frame")
+    assert frames.count == 2 and frames.total == 2
+    assert metrics.counter_value("traversal_chunk_requests_total", kind="crossing") == 1
+
+    memory = InMemorySink()
+    log = JsonLogSink(tmp_path / "metrics.jsonl")
+    prometheus = PrometheusTextSink(tmp_path / "owg.prom")
+    for sink in (memory, log, prometheus):
+        metrics.add_sink(sink)
+    with PeriodicExporter(metrics, interval=60):
+        pass
+
+    assert memory.latest["counters"]
+    assert json.loads((tmp_path / "metrics.jsonl").read_text().splitlines()[-1]) == memory.latest
+    text = (tmp_path / "owg.prom").read_text()
+    assert "# TYPE owg_traversal_events_per_frame histogram" in text
+    assert 'owg_traversal_events_per_frame_bucket{le="+Inf"} 2' in text
+    assert 'owg_traversal_chunk_requests_total{kind="crossing"} 1' in text
+
+
+def test_disabled_metrics_leave_behaviour_unchanged(tmp_path):
+    plain = ChunkStreamingService(cache=ChunkCache(tmp_path / "a")).request_chunk(_key(2, 3))
+    metered = ChunkStreamingService(cache=ChunkCache(tmp_path / "b", metrics=MetricsRegistry())).request_chunk(
+        _key(2, 3)
+    )
+
+    assert plain.payload == metered.payload
+    assert (tmp_path / "a" / "lat_2" / "lon_3" / "lod_0.chunk").read_bytes() == (
+        tmp_path / "b" / "lat_2" / "lon_3" / "lod_0.chunk"
+    ).read_bytes()
@@ -0,0 +1,120 @@
+from controls.input_profiles import (
+    InputEvent,
+    MouseKeyboardProfile,
+    StreamingTraversalController,
+    WorkingSetPolicy,
+    XboxControllerProfile,
+)
+from engine.streaming import ChunkKey, ChunkStreamingService
+
+
+def _key(lat, lon):
+    return ChunkKey(latitude=lat, longitude=lon, level_of_detail=0)
+
+
+def test_lookahead_follows_movement_direction():
+    policy = WorkingSetPolicy(radius=1, lookahead=2)
+
+    keys = policy.keys_around(_key(0, 0), [(0, 1)] * 4)
+
+    assert keys[0] == _key(0, 0)
+    assert keys[1:3] == [_key(0, 2), _key(0, 3)]
+    assert len(keys) == 11
+
+
+def test_prefetch_serves_crossings_warm_and_unloads_behind():
+    service = ChunkStreamingService()
+    controller = StreamingTraversalController(
+        service,
+        _key(0, 0),
+        working_set=WorkingSetPolicy(radius=1, lookahead=2, hysteresis=1),
+    )
+    keyboard = MouseKeyboardProfile()
+
+    for _ in range(6):
+        for future in list(service._inflight.values()):
+            future.result(timeout=5)
+        controller.apply_event(keyboard, InputEvent("keyboard", "d"))
+
+    metrics = controller.metrics
+    assert metrics.crossings == 6
+    assert metrics.warm_crossings == 6
+    assert metrics.unloads > 0
+    assert not service.is_loaded(_key(0, 0))
+    assert controller.current_key == _key(0, 6)
+    service.shutdown()
+
+
+def test_hysteresis_keeps_chunks_when_reversing():
+    policy = WorkingSetPolicy(radius=1, lookahead=0, hysteresis=1)
+    center = _key(0, 1)
+
+    assert not policy.should_unload(center, _key(0, -1))
+    assert policy.should_unload(center, _key(0, -2))
+
+
+class _RecordingService(ChunkStreamingService):
+    def __init__(self):
+        super().__init__()
+        self.batches = []
+
+    def request_chunk_async(self, key):
+        self.batches.append([key])
+        return super().request_chunk_async(key)
+
+    def request_many_async(self, keys):
+        keys = list(keys)
+        self.batches.append(keys)
+        return [ChunkStreamingService.request_chunk_async(self, key) for key in keys]
+
+
+def test_apply_events_requests_only_the_final_tile():
+    service = _RecordingService()
+    controller = StreamingTraversalController(service, _key(0, 0))
+    xbox = XboxControllerProfile()
+    burst = [InputEvent("xbox", "left_stick_right")] * 5
+    burst += [InputEvent("xbox", "a"), InputEvent("xbox", "left_stick_up")]
+
+    final = controller.apply_events(xbox, burst)
+
+    assert final == _key(1, 5)
+    assert service.batches == [[_key(1, 5)]]
+    assert controller.pending.result(timeout=5).key == _key(1, 5)
+    assert controller.metrics.crossings == 1
+    service.shutdown()
+
+
+def test_apply_events_batches_working_set_by_priority():
+    service = _RecordingService()
+    controller = StreamingTraversalController(
+        service, _key(0, 0), working_set=WorkingSetPolicy(radius=1, lookahead=2, hysteresis=1)
+    )
+    service.batches.clear()
+    keyboard = MouseKeyboardProfile()
+
+    controller.apply_events(keyboard, [InputEvent("keyboard", "d")] * 4)
+
+    assert len(service.batches) == 1
+    batch = service.batches[0]
+    assert batch[0] == _key(0, 4)
+    assert batch[1:3] == [_key(0, 6), _key(0, 7)]
+    # Tiles passed through are only requested when the new working set covers them.
+    assert _key(0, 3) in batch and _key(0, 2) not in batch
+    for future in service.request_many_async(batch):
+        future.result(timeout=5)
+    service.batches.clear()
+    assert controller.apply_events(keyboard, [InputEvent("keyboard", "d"), InputEvent("keyboard", "a")]) == _key(0, 4)
+    assert service.batches == []
+    service.shutdown()
+
+
+def test_apply_events_matches_single_event_path():
+    keyboard = MouseKeyboardProfile()
+    events = [InputEvent("keyboard", control) for control in "wwdsdd"]
+    single = StreamingTraversalController(ChunkStreamingService(), _key(2, 2))
+    for event in events:
+        single.apply_event(keyboard, event)
+    batched = StreamingTraversalController(ChunkStreamingService(), _key(2, 2))
+
+    assert batched.apply_events(keyboard, events) == single.current_key
+    assert list(batched._history) == list(single._history)